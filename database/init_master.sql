@@ -1,14 +1,25 @@
 -- database/init_master.sql
 
+-- Harvest queue. Indexes, triggers and status counters live in
+-- database/migrations/ – apply those in order after this file.
 CREATE TABLE IF NOT EXISTS web_map (
     id SERIAL PRIMARY KEY,
     url TEXT UNIQUE NOT NULL,
     source_origin TEXT,          -- Where did we find this URL?
+    source_note TEXT,
     tech_stack JSONB,            -- Detected technologies
-    priority_score INTEGER DEFAULT 1, 
-    status VARCHAR(20) DEFAULT 'queued', -- queued, scanning, completed, failed
+    priority_score DOUBLE PRECISION DEFAULT 1.0,
+    status VARCHAR(20) DEFAULT 'queued', -- queued, scanning, complete, failed
     last_scanned TIMESTAMP,
-    discovered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    discovered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    scanning_started_at TIMESTAMP,
+    completed_at TIMESTAMP,
+    failed_at TIMESTAMP,
+    harvested_count INTEGER DEFAULT 0,
+    error_message TEXT,
+    lease_expires_at TIMESTAMP,  -- Claim expiry; renewed by worker heartbeats
+    retry_count INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMP    -- Backoff after a reaped lease
 );
 
 CREATE TABLE IF NOT EXISTS inspirations (
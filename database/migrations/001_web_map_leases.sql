@@ -0,0 +1,28 @@
+-- database/migrations/001_web_map_leases.sql
+-- Lease / heartbeat columns for the harvest queue (ArtemisWorkload).
+-- Claimed jobs carry lease_expires_at; the reaper requeues expired ones with
+-- retry_count + 1 and holds them back until next_attempt_at.
+-- Safe to re-run.
+
+-- Columns ArtemisWorkload already writes but init_master.sql never declared
+ALTER TABLE web_map ADD COLUMN IF NOT EXISTS source_note TEXT;
+ALTER TABLE web_map ADD COLUMN IF NOT EXISTS scanning_started_at TIMESTAMP;
+ALTER TABLE web_map ADD COLUMN IF NOT EXISTS completed_at TIMESTAMP;
+ALTER TABLE web_map ADD COLUMN IF NOT EXISTS failed_at TIMESTAMP;
+ALTER TABLE web_map ADD COLUMN IF NOT EXISTS harvested_count INTEGER DEFAULT 0;
+ALTER TABLE web_map ADD COLUMN IF NOT EXISTS error_message TEXT;
+
+-- Lease model
+ALTER TABLE web_map ADD COLUMN IF NOT EXISTS lease_expires_at TIMESTAMP;
+ALTER TABLE web_map ADD COLUMN IF NOT EXISTS retry_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE web_map ADD COLUMN IF NOT EXISTS next_attempt_at TIMESTAMP;
+
+-- Jobs claimed before leases existed get one lease window from their start time
+UPDATE web_map
+SET lease_expires_at = COALESCE(scanning_started_at, NOW()) + INTERVAL '10 minutes'
+WHERE status = 'scanning' AND lease_expires_at IS NULL;
+
+-- Reaper scans only in-flight rows, oldest lease first
+CREATE INDEX IF NOT EXISTS idx_web_map_lease_expiry
+    ON web_map (lease_expires_at)
+    WHERE status = 'scanning';
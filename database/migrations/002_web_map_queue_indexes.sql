@@ -0,0 +1,81 @@
+-- database/migrations/002_web_map_queue_indexes.sql
+-- Queue indexes and O(1) status counters for web_map.
+-- Requires PostgreSQL 11+ (INCLUDE columns, statement triggers with transition tables).
+-- Run after 001_web_map_leases.sql. Safe to re-run.
+
+BEGIN;
+
+-- Fractional priorities (e.g. 8.5) were silently rounded by the INTEGER column.
+-- Note: rewrites the table once on existing installs.
+ALTER TABLE web_map ALTER COLUMN priority_score TYPE DOUBLE PRECISION;
+ALTER TABLE web_map ALTER COLUMN priority_score SET DEFAULT 1.0;
+
+-- Claim query: WHERE status = 'queued' ORDER BY priority_score DESC, discovered_at ASC.
+-- Only queued rows are indexed, so the index stays as small as the backlog and
+-- the claim walks it in order; next_attempt_at is carried in the leaf so
+-- backoff filtering does not touch the heap.
+CREATE INDEX IF NOT EXISTS idx_web_map_claim
+    ON web_map (priority_score DESC, discovered_at ASC)
+    INCLUDE (next_attempt_at)
+    WHERE status = 'queued';
+
+-- Status counters for get_queue_stats(). Each backend writes its own slot
+-- (pg_backend_pid() % 16) so concurrent claims do not serialize on one row;
+-- reading the stats sums at most 16 rows per status.
+CREATE TABLE IF NOT EXISTS web_map_status_counts (
+    status VARCHAR(20) NOT NULL,
+    slot SMALLINT NOT NULL,
+    n BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (status, slot)
+);
+
+CREATE OR REPLACE FUNCTION web_map_count_statuses() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO web_map_status_counts (status, slot, n)
+        SELECT COALESCE(status, 'unknown'), pg_backend_pid() % 16, COUNT(*)
+        FROM new_rows GROUP BY 1
+        ON CONFLICT (status, slot) DO UPDATE SET n = web_map_status_counts.n + EXCLUDED.n;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO web_map_status_counts (status, slot, n)
+        SELECT COALESCE(status, 'unknown'), pg_backend_pid() % 16, -COUNT(*)
+        FROM old_rows GROUP BY 1
+        ON CONFLICT (status, slot) DO UPDATE SET n = web_map_status_counts.n + EXCLUDED.n;
+    ELSE
+        -- Heartbeats and other non-status updates net to zero and write nothing
+        INSERT INTO web_map_status_counts (status, slot, n)
+        SELECT status, pg_backend_pid() % 16, SUM(delta)
+        FROM (
+            SELECT COALESCE(status, 'unknown') AS status, 1 AS delta FROM new_rows
+            UNION ALL
+            SELECT COALESCE(status, 'unknown'), -1 FROM old_rows
+        ) d
+        GROUP BY 1
+        HAVING SUM(delta) <> 0
+        ON CONFLICT (status, slot) DO UPDATE SET n = web_map_status_counts.n + EXCLUDED.n;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Backfill under a share lock so no write slips between the count and the triggers
+LOCK TABLE web_map IN SHARE MODE;
+TRUNCATE web_map_status_counts;
+INSERT INTO web_map_status_counts (status, slot, n)
+SELECT COALESCE(status, 'unknown'), 0, COUNT(*) FROM web_map GROUP BY 1;
+
+DROP TRIGGER IF EXISTS web_map_count_insert ON web_map;
+DROP TRIGGER IF EXISTS web_map_count_update ON web_map;
+DROP TRIGGER IF EXISTS web_map_count_delete ON web_map;
+
+CREATE TRIGGER web_map_count_insert AFTER INSERT ON web_map
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION web_map_count_statuses();
+CREATE TRIGGER web_map_count_update AFTER UPDATE ON web_map
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION web_map_count_statuses();
+CREATE TRIGGER web_map_count_delete AFTER DELETE ON web_map
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION web_map_count_statuses();
+
+COMMIT;
@@ -0,0 +1,53 @@
+-- database/migrations/003_canonicalize_web_map_urls.sql
+-- Rewrites existing web_map URLs into the form url_utils.normalize_url now
+-- enqueues: lowercase scheme and host, "/" for an empty path, no fragment and
+-- no empty "?". Without this, pages queued before the change are enqueued
+-- again under their new key.
+-- Rows that collapse onto the same canonical URL are merged: the row already
+-- in canonical form wins, else the oldest; inspirations are repointed to it.
+-- Only http(s) rows are touched. Requires PostgreSQL 10+ (regexp_match).
+-- Run after 002. Safe to re-run.
+
+BEGIN;
+
+-- Mirrors url_utils.normalize_url for http(s) URLs (see test_migrations.py)
+CREATE OR REPLACE FUNCTION web_map_canonical_url(raw TEXT) RETURNS TEXT AS $$
+    SELECT lower(m[1])
+           || CASE WHEN m[2] = '' THEN '/' ELSE m[2] END
+           || CASE WHEN COALESCE(m[3], '') = '' THEN '' ELSE '?' || m[3] END
+    FROM (SELECT regexp_match(btrim(raw), '^([A-Za-z][A-Za-z0-9+.-]*://[^/?#]*)([^?#]*)(?:\?([^#]*))?') AS m) parts
+$$ LANGUAGE sql IMMUTABLE STRICT;
+
+LOCK TABLE web_map IN SHARE ROW EXCLUSIVE MODE;
+
+CREATE TEMP TABLE web_map_canonical ON COMMIT DROP AS
+SELECT id, url, web_map_canonical_url(url) AS canonical
+FROM web_map
+WHERE url ~* '^\s*https?://';
+
+-- One survivor per canonical URL
+CREATE TEMP TABLE web_map_merge ON COMMIT DROP AS
+SELECT c.id, s.keep_id
+FROM web_map_canonical c
+JOIN (
+    SELECT DISTINCT ON (canonical) canonical, id AS keep_id
+    FROM web_map_canonical
+    ORDER BY canonical, (url = canonical) DESC, id
+) s ON s.canonical = c.canonical
+WHERE c.id <> s.keep_id;
+
+UPDATE inspirations i
+SET url_id = m.keep_id
+FROM web_map_merge m
+WHERE i.url_id = m.id;
+
+DELETE FROM web_map w
+USING web_map_merge m
+WHERE w.id = m.id;
+
+UPDATE web_map w
+SET url = c.canonical
+FROM web_map_canonical c
+WHERE w.id = c.id AND w.url <> c.canonical;
+
+COMMIT;
@@ -0,0 +1,447 @@
+# harvesting/async_workload_manager.py
+"""
+Artemis Async Workload Manager
+asyncio sibling of ArtemisWorkload on asyncpg, for async crawlers and FastAPI
+endpoints. Same queue semantics and SQL shape; batch operations send one
+statement per batch (array parameters) instead of one per row.
+"""
+
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+import asyncpg
+
+from seen_filter import BloomFilter
+from url_utils import normalize_url
+
+# Configure logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+handler = logging.StreamHandler()
+handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+logger.addHandler(handler)
+
+# Must match workload_manager.QUEUE_CHANNEL
+QUEUE_CHANNEL = "artemis_harvest_queue"
+
+
+class AsyncArtemisWorkload:
+    """
+    Manages the harvesting workload queue in PostgreSQL from asyncio code.
+    Create with `await AsyncArtemisWorkload.create(db_config)`.
+    """
+
+    def __init__(
+        self,
+        db_config: Dict[str, Any] = None,
+        min_size: int = 1,
+        max_size: int = 10,
+        seen_filter: Optional[BloomFilter] = None,
+        lease_seconds: int = 600
+    ):
+        """
+        Args:
+            db_config: Dict with keys: dbname, user, password, host, port
+                       (same shape as ArtemisWorkload). If None, asyncpg reads
+                       the PG* environment variables.
+            min_size: Minimum connections in pool
+            max_size: Maximum connections in pool
+            seen_filter: Optional Bloom filter of known URLs (see ArtemisWorkload)
+            lease_seconds: Lease length for claimed jobs
+        """
+        db_config = dict(db_config or {})
+        if "dbname" in db_config:
+            db_config["database"] = db_config.pop("dbname")
+        if db_config.get("port"):
+            db_config["port"] = int(db_config["port"])
+        self.db_config = {k: v for k, v in db_config.items() if v is not None}
+        self.min_size = min_size
+        self.max_size = max_size
+        self.seen_filter = seen_filter
+        self.lease_seconds = lease_seconds
+
+        self.pool: Optional[asyncpg.Pool] = None
+        self._listener: Optional[asyncpg.Connection] = None
+        self._work_event = asyncio.Event()
+
+    @classmethod
+    async def create(cls, db_config: Dict[str, Any] = None, **kwargs) -> "AsyncArtemisWorkload":
+        manager = cls(db_config, **kwargs)
+        await manager.connect()
+        return manager
+
+    async def connect(self):
+        self.pool = await asyncpg.create_pool(min_size=self.min_size, max_size=self.max_size, **self.db_config)
+        logger.info("Async workload manager initialized with pool (min=%d, max=%d)", self.min_size, self.max_size)
+
+    async def close(self):
+        """Close the listener and all pooled connections (call on shutdown)."""
+        if self._listener is not None:
+            await self._listener.close()
+            self._listener = None
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+        logger.info("Connection pool closed")
+
+    async def __aenter__(self):
+        if self.pool is None:
+            await self.connect()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    # ── Enqueue ────────────────────────────────────
+
+    async def add_to_harvest(
+        self,
+        url: str,
+        origin: str = "harvester",
+        priority_score: float = 1.0,
+        source_note: str = None
+    ) -> bool:
+        """
+        Add a URL to the harvest queue if it doesn't already exist.
+
+        Returns True if inserted, False if already present.
+        """
+        url = self._normalize_url(url)
+        if self.seen_filter is not None and url in self.seen_filter:
+            return False
+
+        query = """
+        INSERT INTO web_map (url, source_origin, priority_score, source_note, status)
+        VALUES ($1, $2, $3, $4, 'queued')
+        ON CONFLICT (url) DO NOTHING
+        RETURNING id;
+        """
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                inserted = await conn.fetchval(query, url, origin, priority_score, source_note) is not None
+                if inserted:
+                    await self._notify(conn, 1)
+        if self.seen_filter is not None:
+            self.seen_filter.add(url)
+        logger.debug("URL %s %s", url, "inserted" if inserted else "already exists")
+        return inserted
+
+    async def add_many_to_harvest(
+        self,
+        urls: Iterable[str],
+        origin: str = "harvester",
+        priority_score: float = 1.0,
+        source_note: str = None,
+        chunk_size: int = 1000
+    ) -> Dict[str, int]:
+        """
+        Bulk-enqueue URLs in one transaction, `chunk_size` URLs per statement.
+
+        Returns counts: {"inserted": n, "duplicates": n, "invalid": n}.
+        """
+        batch: List[str] = []
+        seen = set()
+        invalid = duplicates = 0
+        for url in urls:
+            try:
+                url = self._normalize_url(url)
+            except ValueError:
+                invalid += 1
+                continue
+            if url in seen or (self.seen_filter is not None and url in self.seen_filter):
+                duplicates += 1
+                continue
+            seen.add(url)
+            batch.append(url)
+
+        if not batch:
+            return {"inserted": 0, "duplicates": duplicates, "invalid": invalid}
+
+        query = """
+        INSERT INTO web_map (url, source_origin, priority_score, source_note, status)
+        SELECT u, $2, $3, $4, 'queued' FROM unnest($1::text[]) AS u
+        ON CONFLICT (url) DO NOTHING
+        RETURNING id;
+        """
+        inserted = 0
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                for start in range(0, len(batch), chunk_size):
+                    chunk = batch[start:start + chunk_size]
+                    inserted += len(await conn.fetch(query, chunk, origin, priority_score, source_note))
+                if inserted:
+                    await self._notify(conn, inserted)
+
+        if self.seen_filter is not None:
+            self.seen_filter.update(batch)
+        duplicates += len(batch) - inserted
+        logger.info("Bulk enqueue: %d inserted, %d duplicates, %d invalid", inserted, duplicates, invalid)
+        return {"inserted": inserted, "duplicates": duplicates, "invalid": invalid}
+
+    @staticmethod
+    async def _notify(conn: asyncpg.Connection, count: int):
+        await conn.execute("SELECT pg_notify($1, $2);", QUEUE_CHANNEL, str(count))
+
+    @staticmethod
+    def _normalize_url(url: str) -> str:
+        normalized = normalize_url(url) if isinstance(url, str) else None
+        if normalized is None:
+            raise ValueError(f"Invalid URL format: {url}")
+        return normalized
+
+    async def warm_seen_filter(self, batch_size: int = 10000) -> int:
+        """Stream every URL in web_map into the seen filter. Returns the count loaded."""
+        if self.seen_filter is None:
+            raise RuntimeError("No seen filter configured")
+
+        loaded = 0
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                async for record in conn.cursor("SELECT url FROM web_map;", prefetch=batch_size):
+                    self.seen_filter.add(record["url"])
+                    loaded += 1
+        logger.info("Seen filter warmed with %d URLs", loaded)
+        return loaded
+
+    async def wait_for_work(self, timeout: float = 30.0) -> bool:
+        """
+        Wait until new work is announced on QUEUE_CHANNEL or `timeout` passes.
+        Returns True if woken by a notification.
+        """
+        if self._listener is None:
+            try:
+                self._listener = await asyncpg.connect(**self.db_config)
+                await self._listener.add_listener(QUEUE_CHANNEL, lambda *_: self._work_event.set())
+            except (OSError, asyncpg.PostgresError) as e:
+                logger.warning("Queue listener failed, falling back to polling: %s", e)
+                self._listener = None
+                await asyncio.sleep(timeout)
+                return False
+
+        try:
+            await asyncio.wait_for(self._work_event.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._work_event.clear()
+
+    # ── Claim & leases ─────────────────────────────
+
+    async def get_next_job(self) -> Optional[Dict[str, Any]]:
+        """Atomically claim the highest-priority queued job, or None."""
+        jobs = await self.get_next_jobs(1)
+        return jobs[0] if jobs else None
+
+    async def get_next_jobs(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Atomically claim up to `limit` queued jobs in one statement (see ArtemisWorkload)."""
+        if limit < 1:
+            raise ValueError("Lease size must be at least 1")
+
+        query = """
+        WITH claimed AS (
+            SELECT id FROM web_map
+            WHERE status = 'queued'
+              AND (next_attempt_at IS NULL OR next_attempt_at <= NOW())
+            ORDER BY priority_score DESC, discovered_at ASC
+            LIMIT $1
+            FOR UPDATE SKIP LOCKED
+        )
+        UPDATE web_map AS w
+        SET status = 'scanning',
+            scanning_started_at = NOW(),
+            lease_expires_at = NOW() + make_interval(secs => $2)
+        FROM claimed
+        WHERE w.id = claimed.id
+        RETURNING w.id, w.url, w.priority_score, w.source_origin, w.retry_count, w.discovered_at;
+        """
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(query, limit, float(self.lease_seconds))
+
+        jobs = sorted((dict(r) for r in rows), key=lambda j: (-j['priority_score'], j['discovered_at']))
+        for job in jobs:
+            job.pop('discovered_at', None)
+        if jobs:
+            logger.info("Claimed %d job(s), top: %s (priority %.1f)",
+                        len(jobs), jobs[0]['url'], jobs[0]['priority_score'])
+        return jobs
+
+    async def iter_jobs(self, lease_size: int = 10) -> AsyncIterator[Dict[str, Any]]:
+        """Yield claimed jobs, draining a local lease before claiming the next one."""
+        while True:
+            lease = await self.get_next_jobs(lease_size)
+            if not lease:
+                return
+            for job in lease:
+                yield job
+
+    async def extend_lease(self, job_ids: Iterable[int], lease_seconds: Optional[int] = None) -> int:
+        """Heartbeat: renew leases for in-flight jobs. Returns how many are still held."""
+        job_ids = list(job_ids)
+        if not job_ids:
+            return 0
+        seconds = lease_seconds if lease_seconds is not None else self.lease_seconds
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch("""
+                UPDATE web_map
+                SET lease_expires_at = NOW() + make_interval(secs => $1)
+                WHERE id = ANY($2::int[]) AND status = 'scanning'
+                RETURNING id;
+            """, float(seconds), job_ids)
+        return len(rows)
+
+    async def release_jobs(self, job_ids: Iterable[int]) -> int:
+        """Return claimed-but-unstarted jobs to the queue. Returns the number released."""
+        job_ids = list(job_ids)
+        if not job_ids:
+            return 0
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                rows = await conn.fetch("""
+                    UPDATE web_map
+                    SET status = 'queued', scanning_started_at = NULL, lease_expires_at = NULL
+                    WHERE id = ANY($1::int[]) AND status = 'scanning'
+                    RETURNING id;
+                """, job_ids)
+                if rows:
+                    await self._notify(conn, len(rows))
+        return len(rows)
+
+    async def reap_expired_leases(
+        self,
+        max_retries: int = 3,
+        backoff_base: float = 60.0,
+        backoff_cap: float = 3600.0,
+        limit: int = 1000
+    ) -> Dict[str, int]:
+        """Requeue (or fail) jobs whose lease expired. See ArtemisWorkload.reap_expired_leases."""
+        query = """
+        WITH expired AS (
+            SELECT id FROM web_map
+            WHERE status = 'scanning' AND lease_expires_at < NOW()
+            ORDER BY lease_expires_at
+            LIMIT $1
+            FOR UPDATE SKIP LOCKED
+        )
+        UPDATE web_map AS w
+        SET status = CASE WHEN w.retry_count >= $2 THEN 'failed' ELSE 'queued' END,
+            retry_count = w.retry_count + 1,
+            next_attempt_at = NOW() + make_interval(
+                secs => LEAST($4::float8, $3::float8 * power(2, w.retry_count))),
+            failed_at = CASE WHEN w.retry_count >= $2 THEN NOW() ELSE w.failed_at END,
+            error_message = CASE WHEN w.retry_count >= $2
+                                 THEN 'Lease expired after ' || (w.retry_count + 1) || ' attempts'
+                                 ELSE w.error_message END,
+            lease_expires_at = NULL
+        FROM expired
+        WHERE w.id = expired.id
+        RETURNING w.status;
+        """
+        async with self.pool.acquire() as conn:
+            statuses = [r['status'] for r in await conn.fetch(query, limit, max_retries, backoff_base, backoff_cap)]
+
+        result = {"requeued": statuses.count("queued"), "failed": statuses.count("failed")}
+        if statuses:
+            logger.warning("Reaped %d expired lease(s): %d requeued, %d failed",
+                           len(statuses), result["requeued"], result["failed"])
+        return result
+
+    # ── Acknowledgements ───────────────────────────
+
+    async def mark_complete(self, job_id: int, harvested_count: int = 0) -> bool:
+        """Mark a scanning job as complete."""
+        return (await self.mark_many_complete([(job_id, harvested_count)]))[job_id]
+
+    async def mark_failed(self, job_id: int, error_message: str = None) -> bool:
+        """Mark a scanning job as failed."""
+        return (await self.mark_many_failed([(job_id, error_message)]))[job_id]
+
+    async def mark_many_complete(self, results: Iterable[Tuple[int, int]]) -> Dict[int, bool]:
+        """
+        Complete many jobs in one statement: results is (job_id, harvested_count) pairs.
+        Returns {job_id: updated}; False means the job was no longer scanning.
+        """
+        results = list(results)
+        if not results:
+            return {}
+        ids, counts = zip(*results)
+        query = """
+        UPDATE web_map AS w
+        SET status = 'complete', completed_at = NOW(), harvested_count = v.harvested_count
+        FROM unnest($1::int[], $2::int[]) AS v(id, harvested_count)
+        WHERE w.id = v.id AND w.status = 'scanning'
+        RETURNING w.id;
+        """
+        return await self._ack(query, ids, list(ids), list(counts))
+
+    async def mark_many_failed(self, failures: Iterable[Tuple[int, Optional[str]]]) -> Dict[int, bool]:
+        """Fail many jobs in one statement: failures is (job_id, error_message) pairs."""
+        failures = list(failures)
+        if not failures:
+            return {}
+        ids, errors = zip(*failures)
+        query = """
+        UPDATE web_map AS w
+        SET status = 'failed', error_message = v.error_message, failed_at = NOW()
+        FROM unnest($1::int[], $2::text[]) AS v(id, error_message)
+        WHERE w.id = v.id AND w.status = 'scanning'
+        RETURNING w.id;
+        """
+        return await self._ack(query, ids, list(ids), list(errors))
+
+    async def _ack(self, query: str, ids: Tuple[int, ...], *args) -> Dict[int, bool]:
+        try:
+            async with self.pool.acquire() as conn:
+                updated = {r['id'] for r in await conn.fetch(query, *args)}
+        except (OSError, asyncpg.PostgresError) as e:
+            logger.error("Status update failed for %d job(s): %s", len(ids), e)
+            return {job_id: False for job_id in ids}
+
+        missing = len(ids) - len(updated)
+        if missing:
+            logger.warning("%d job(s) not found or not in scanning state", missing)
+        return {job_id: job_id in updated for job_id in ids}
+
+    # ── Stats ──────────────────────────────────────
+
+    async def get_queue_stats(self, exact: bool = False) -> Dict[str, int]:
+        """Queue statistics from the status counters (or a full scan with exact=True)."""
+        async with self.pool.acquire() as conn:
+            if not exact:
+                try:
+                    rows = await conn.fetch(
+                        "SELECT status, SUM(n)::bigint AS n FROM web_map_status_counts GROUP BY status;"
+                    )
+                    counts = {r['status']: r['n'] for r in rows}
+                    return {status: counts.get(status, 0)
+                            for status in ("queued", "scanning", "complete", "failed")}
+                except asyncpg.UndefinedTableError:
+                    logger.warning("Status counters missing (run migration 002); scanning web_map")
+            row = await conn.fetchrow("""
+                SELECT
+                    COUNT(*) FILTER (WHERE status = 'queued') AS queued,
+                    COUNT(*) FILTER (WHERE status = 'scanning') AS scanning,
+                    COUNT(*) FILTER (WHERE status = 'complete') AS complete,
+                    COUNT(*) FILTER (WHERE status = 'failed') AS failed
+                FROM web_map;
+            """)
+            return dict(row)
+
+
+# ────────────────────────────────────────────────
+# Example usage / test
+# ────────────────────────────────────────────────
+if __name__ == "__main__":
+    from config import get_config
+
+    async def demo():
+        async with AsyncArtemisWorkload(get_config()['db']) as manager:
+            print("Bulk:", await manager.add_many_to_harvest(
+                ["https://example.com/research", "https://example.org/blog"], origin="example"
+            ))
+            jobs = await manager.get_next_jobs(5)
+            print("Acks:", await manager.mark_many_complete((job['id'], 0) for job in jobs))
+            print("Queue stats:", await manager.get_queue_stats())
+
+    asyncio.run(demo())
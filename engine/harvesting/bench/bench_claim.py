@@ -0,0 +1,158 @@
+# harvesting/bench/bench_claim.py
+"""
+Benchmark: single-row claims (get_next_job) vs batched leases (get_next_jobs).
+
+Runs against a SQLite stand-in by default, which mirrors the claim statements
+without row locking. Pass --postgres to run the real ArtemisWorkload against
+the database in config.get_config() – use a scratch database, the benchmark
+seeds and deletes its own rows but will also claim anything already queued.
+
+Run: python bench/bench_claim.py --rows 20000 --lease 50
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+BENCH_PREFIX = "https://bench.invalid/claim/"
+
+SQLITE_SCHEMA = """
+CREATE TABLE web_map (
+    id INTEGER PRIMARY KEY,
+    url TEXT UNIQUE NOT NULL,
+    source_origin TEXT,
+    priority_score REAL DEFAULT 1,
+    status TEXT DEFAULT 'queued',
+    scanning_started_at TIMESTAMP,
+    lease_expires_at TIMESTAMP,
+    next_attempt_at TIMESTAMP,
+    discovered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX idx_web_map_claim ON web_map (priority_score DESC, discovered_at ASC, next_attempt_at)
+    WHERE status = 'queued';
+"""
+
+SQLITE_CLAIM = """
+UPDATE web_map
+SET status = 'scanning', scanning_started_at = CURRENT_TIMESTAMP,
+    lease_expires_at = datetime('now', '+600 seconds')
+WHERE id IN (
+    SELECT id FROM web_map
+    WHERE status = 'queued'
+      AND (next_attempt_at IS NULL OR next_attempt_at <= CURRENT_TIMESTAMP)
+    ORDER BY priority_score DESC, discovered_at ASC
+    LIMIT ?
+)
+RETURNING id, url, priority_score, source_origin;
+"""
+
+
+def _seed_sqlite(rows: int) -> sqlite3.Connection:
+    conn = sqlite3.connect(":memory:", isolation_level=None)
+    conn.executescript(SQLITE_SCHEMA)
+    conn.execute("BEGIN")
+    conn.executemany(
+        "INSERT INTO web_map (url, source_origin, priority_score) VALUES (?, 'bench', ?)",
+        ((f"{BENCH_PREFIX}{i}", (i * 7919) % 100 / 10.0) for i in range(rows))
+    )
+    conn.execute("COMMIT")
+    return conn
+
+
+def _drain_sqlite(conn: sqlite3.Connection, lease: int):
+    """Claim until the queue is empty. Returns (jobs, round_trips, seconds)."""
+    jobs = trips = 0
+    start = time.perf_counter()
+    while True:
+        conn.execute("BEGIN IMMEDIATE")
+        claimed = conn.execute(SQLITE_CLAIM, (lease,)).fetchall()
+        conn.execute("COMMIT")
+        trips += 1
+        if not claimed:
+            break
+        jobs += len(claimed)
+    return jobs, trips, time.perf_counter() - start
+
+
+def bench_sqlite(rows: int, lease: int):
+    results = {}
+    for label, size in (("single", 1), (f"lease={lease}", lease)):
+        conn = _seed_sqlite(rows)
+        results[label] = _drain_sqlite(conn, size)
+        conn.close()
+    return results
+
+
+def bench_postgres(rows: int, lease: int):
+    from psycopg2.extras import execute_values
+    from config import get_config
+    from workload_manager import ArtemisWorkload
+
+    manager = ArtemisWorkload(get_config()['db'])
+
+    def seed():
+        conn = manager._get_connection()
+        try:
+            with conn.cursor() as cur:
+                cur.execute("DELETE FROM web_map WHERE url LIKE %s", (BENCH_PREFIX + "%",))
+                execute_values(
+                    cur,
+                    "INSERT INTO web_map (url, source_origin, priority_score, status) VALUES %s",
+                    [(f"{BENCH_PREFIX}{i}", "bench", (i * 7919) % 100 / 10.0, "queued")
+                     for i in range(rows)],
+                    page_size=1000
+                )
+            conn.commit()
+        finally:
+            manager._put_connection(conn)
+
+    results = {}
+    try:
+        for label, size in (("single", 1), (f"lease={lease}", lease)):
+            seed()
+            jobs = trips = 0
+            start = time.perf_counter()
+            while True:
+                claimed = manager.get_next_jobs(size)
+                trips += 1
+                if not claimed:
+                    break
+                jobs += len(claimed)
+            results[label] = (jobs, trips, time.perf_counter() - start)
+    finally:
+        conn = manager._get_connection()
+        try:
+            with conn.cursor() as cur:
+                cur.execute("DELETE FROM web_map WHERE url LIKE %s", (BENCH_PREFIX + "%",))
+            conn.commit()
+        finally:
+            manager._put_connection(conn)
+        manager.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark single vs batched job claims")
+    parser.add_argument("--rows", type=int, default=20000, help="Queued rows to drain")
+    parser.add_argument("--lease", type=int, default=50, help="Lease size for batched claims")
+    parser.add_argument("--postgres", action="store_true", help="Use the configured Postgres database")
+    args = parser.parse_args()
+
+    import logging
+    logging.getLogger("workload_manager").setLevel(logging.WARNING)
+
+    backend = "postgres" if args.postgres else "sqlite stand-in"
+    results = (bench_postgres if args.postgres else bench_sqlite)(args.rows, args.lease)
+
+    print(f"\n=== Claim benchmark ({backend}, {args.rows} rows) ===")
+    print(f"{'mode':<12} {'jobs':>8} {'round-trips':>12} {'seconds':>9} {'jobs/s':>10} {'trips/job':>10}")
+    for label, (jobs, trips, secs) in results.items():
+        print(f"{label:<12} {jobs:>8} {trips:>12} {secs:>9.3f} {jobs / secs:>10.0f} {trips / max(jobs, 1):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# harvesting/bench/bench_import.py
+"""
+Benchmark: cold start of a content_analyzer worker.
+
+Each sample is a fresh interpreter that imports content_analyzer and cleans
+one page (ParsedPage.text) – all a text-cleaning worker needs. Reports the
+median import time, time to first clean text, and whether any heavy NLP
+module (nltk, spacy, torch) was imported along the way. Neither should
+happen: models load on first use, and data is fetched only by
+`content_analyzer.py setup`.
+
+Run: python bench/bench_import.py --samples 20
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HARVESTING_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+HEAVY_MODULES = ("nltk", "spacy", "torch", "transformers")
+
+PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import content_analyzer
+t1 = time.perf_counter()
+text = content_analyzer.ParsedPage("<html><body><nav>x</nav><p>Hello world</p></body></html>").text
+t2 = time.perf_counter()
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1000,
+    "first_text_ms": (t2 - t0) * 1000,
+    "heavy": sorted(m for m in %r if m in sys.modules),
+}))
+""" % (HEAVY_MODULES,)
+
+
+def sample() -> dict:
+    out = subprocess.run([sys.executable, "-c", PROBE], cwd=HARVESTING_DIR, capture_output=True,
+                         text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark content_analyzer cold start")
+    parser.add_argument("--samples", type=int, default=20, help="Fresh interpreters to time")
+    args = parser.parse_args()
+
+    runs = [sample() for _ in range(args.samples)]
+    heavy = sorted({m for run in runs for m in run["heavy"]})
+    print(f"\n=== content_analyzer cold start ({args.samples} processes) ===")
+    print(f"import p50:           {statistics.median(r['import_ms'] for r in runs):8.1f} ms")
+    print(f"first clean text p50: {statistics.median(r['first_text_ms'] for r in runs):8.1f} ms")
+    print(f"heavy modules loaded: {', '.join(heavy) if heavy else 'none'}")
+
+
+if __name__ == "__main__":
+    main()
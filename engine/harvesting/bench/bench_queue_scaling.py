@@ -0,0 +1,188 @@
+# harvesting/bench/bench_queue_scaling.py
+"""
+Benchmark: claim and stats latency as web_map grows (migration 002).
+
+Grows the table step by step (90% complete, 10% queued, like a long-running
+crawl) and measures the median single-job claim and the cost of queue stats
+read from the status counters vs a full COUNT(*) FILTER scan. Claim latency
+should stay flat with the partial index; run with --no-index to compare
+(on Postgres the index is dropped for the run and recreated afterwards).
+
+Runs against a SQLite stand-in by default. Pass --postgres to use the
+database in config.get_config() (a scratch database with migrations applied).
+
+Run: python bench/bench_queue_scaling.py --sizes 10000 100000 1000000
+"""
+
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bench_claim import SQLITE_CLAIM  # noqa: E402
+
+BENCH_PREFIX = "https://bench.invalid/scale/"
+CLAIM_SAMPLES = 200
+
+SQLITE_TABLE = """
+CREATE TABLE web_map (
+    id INTEGER PRIMARY KEY,
+    url TEXT UNIQUE NOT NULL,
+    source_origin TEXT,
+    priority_score REAL DEFAULT 1,
+    status TEXT DEFAULT 'queued',
+    scanning_started_at TIMESTAMP,
+    lease_expires_at TIMESTAMP,
+    next_attempt_at TIMESTAMP,
+    discovered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE web_map_status_counts (status TEXT PRIMARY KEY, n INTEGER NOT NULL);
+CREATE TRIGGER web_map_count_insert AFTER INSERT ON web_map BEGIN
+    INSERT INTO web_map_status_counts VALUES (NEW.status, 1)
+    ON CONFLICT (status) DO UPDATE SET n = n + 1;
+END;
+CREATE TRIGGER web_map_count_update AFTER UPDATE OF status ON web_map
+WHEN OLD.status IS NOT NEW.status BEGIN
+    UPDATE web_map_status_counts SET n = n - 1 WHERE status = OLD.status;
+    INSERT INTO web_map_status_counts VALUES (NEW.status, 1)
+    ON CONFLICT (status) DO UPDATE SET n = n + 1;
+END;
+"""
+SQLITE_INDEX = """
+CREATE INDEX idx_web_map_claim ON web_map (priority_score DESC, discovered_at ASC, next_attempt_at)
+    WHERE status = 'queued';
+"""
+SCAN_STATS = """
+SELECT
+    COUNT(*) FILTER (WHERE status = 'queued'),
+    COUNT(*) FILTER (WHERE status = 'scanning'),
+    COUNT(*) FILTER (WHERE status = 'complete'),
+    COUNT(*) FILTER (WHERE status = 'failed')
+FROM web_map;
+"""
+COUNTER_STATS = "SELECT status, SUM(n) FROM web_map_status_counts GROUP BY status;"
+
+
+def _timed(fn, repeat: int = 1) -> float:
+    """Median wall time of fn() in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def _row(i: int):
+    return (f"{BENCH_PREFIX}{i}", (i * 7919) % 100 / 10.0, "queued" if i % 10 == 0 else "complete")
+
+
+def bench_sqlite(sizes, with_index: bool):
+    conn = sqlite3.connect(":memory:", isolation_level=None)
+    conn.executescript(SQLITE_TABLE)
+    if with_index:
+        conn.executescript(SQLITE_INDEX)
+
+    def claim():
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(SQLITE_CLAIM, (1,)).fetchall()
+        conn.execute("COMMIT")
+
+    filled = 0
+    for size in sizes:
+        conn.execute("BEGIN")
+        conn.executemany(
+            "INSERT INTO web_map (url, source_origin, priority_score, status) VALUES (?, 'bench', ?, ?)",
+            (_row(i) for i in range(filled, size))
+        )
+        conn.execute("COMMIT")
+        filled = size
+        conn.execute("ANALYZE")
+
+        yield (size,
+               _timed(claim, CLAIM_SAMPLES),
+               _timed(lambda: conn.execute(COUNTER_STATS).fetchall(), 20),
+               _timed(lambda: conn.execute(SCAN_STATS).fetchall(), 3))
+    conn.close()
+
+
+def bench_postgres(sizes, with_index: bool):
+    from config import get_config
+    from workload_manager import ArtemisWorkload
+
+    manager = ArtemisWorkload(get_config()['db'])
+
+    def execute(sql, params=None):
+        conn = manager._get_connection()
+        try:
+            with conn.cursor() as cur:
+                cur.execute(sql, params)
+                row = cur.fetchone() if cur.description else None
+            conn.commit()
+            return row
+        finally:
+            manager._put_connection(conn)
+
+    def claim():
+        jobs = manager.get_next_jobs(1)
+        if jobs:
+            manager.release_jobs([jobs[0]['id']])
+
+    dropped_index = None
+    filled = 0
+    try:
+        if not with_index:
+            # Keep the exact definition so the index is restored however the run ends
+            row = execute("SELECT pg_get_indexdef('idx_web_map_claim'::regclass);")
+            execute("DROP INDEX idx_web_map_claim;")
+            dropped_index = row[0]
+        for size in sizes:
+            execute("""
+                INSERT INTO web_map (url, source_origin, priority_score, status)
+                SELECT %s || g, 'bench', (g * 7919 %% 100) / 10.0,
+                       CASE WHEN g %% 10 = 0 THEN 'queued' ELSE 'complete' END
+                FROM generate_series(%s, %s) AS g
+                ON CONFLICT (url) DO NOTHING;
+            """, (BENCH_PREFIX, filled, size - 1))
+            filled = size
+            execute("ANALYZE web_map;")
+            yield (size,
+                   _timed(claim, CLAIM_SAMPLES),
+                   _timed(manager.get_queue_stats, 20),
+                   _timed(lambda: manager.get_queue_stats(exact=True), 3))
+    finally:
+        try:
+            execute("DELETE FROM web_map WHERE url LIKE %s;", (BENCH_PREFIX + "%",))
+        finally:
+            if dropped_index:
+                execute(dropped_index + ";")
+                print("Recreated idx_web_map_claim")
+            manager.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark queue latency as web_map grows")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000],
+                        help="Table sizes to measure at (e.g. 10000 ... 10000000)")
+    parser.add_argument("--no-index", action="store_true", help="Measure without the partial claim index")
+    parser.add_argument("--postgres", action="store_true", help="Use the configured Postgres database")
+    args = parser.parse_args()
+
+    import logging
+    logging.getLogger("workload_manager").setLevel(logging.WARNING)
+
+    backend = "postgres" if args.postgres else "sqlite stand-in"
+    index = "without" if args.no_index else "with"
+    print(f"\n=== Queue scaling ({backend}, {index} partial claim index) ===")
+    print(f"{'rows':>10} {'claim p50 ms':>13} {'stats (counters) ms':>20} {'stats (scan) ms':>16}")
+    runner = bench_postgres if args.postgres else bench_sqlite
+    for size, claim_ms, counter_ms, scan_ms in runner(sorted(args.sizes), not args.no_index):
+        print(f"{size:>10} {claim_ms:>13.3f} {counter_ms:>20.3f} {scan_ms:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
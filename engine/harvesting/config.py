@@ -14,7 +14,23 @@ def get_config():
             'port': os.getenv('DB_PORT', '5432'),
         },
         'max_depth': int(os.getenv('HARVEST_MAX_DEPTH', 3)),
-        'polite_delay': float(os.getenv('HARVEST_DELAY_MS', 1.2)),
+        # Seconds between requests to one host; HARVEST_DELAY_MS (milliseconds) is still honoured
+        'polite_delay': float(os.getenv('HARVEST_DELAY_S') or float(os.getenv('HARVEST_DELAY_MS', 1200)) / 1000),
         'user_agent': os.getenv('HARVEST_USER_AGENT', 'Artemis-Harvester/1.0'),
         'blocked_domains': ['facebook.com', 'twitter.com', 'instagram.com'],  # example
+        'scheduler': {
+            'concurrency': int(os.getenv('HARVEST_CONCURRENCY', 4)),
+            'command': os.getenv('HARVEST_COMMAND', 'node recursive-harvest.js'),
+            'job_timeout': float(os.getenv('HARVEST_JOB_TIMEOUT', 300)),
+            'idle_sleep': float(os.getenv('HARVEST_IDLE_SLEEP', 30)),
+            'lease_seconds': int(os.getenv('HARVEST_LEASE_SECONDS', 600)),
+            'domain_concurrency': int(os.getenv('HARVEST_DOMAIN_CONCURRENCY', 1)),
+            'domain_burst': float(os.getenv('HARVEST_DOMAIN_BURST', 1)),
+        },
+        'seen_filter': {
+            'enabled': os.getenv('HARVEST_SEEN_FILTER', '0') == '1',
+            'capacity': int(os.getenv('HARVEST_SEEN_FILTER_CAPACITY', 5_000_000)),
+            'error_rate': float(os.getenv('HARVEST_SEEN_FILTER_ERROR_RATE', 0.001)),
+            'path': os.getenv('HARVEST_SEEN_FILTER_PATH', 'data/seen_urls.bloom'),
+        },
     }
@@ -5,102 +5,339 @@ Extracts meaningful content signals from harvested HTML:
 - Keywords / topics
 - Basic sentiment polarity
 - Named entities (people, orgs, locations)
+
+Importing this module loads no models and touches no network: NLTK data and
+the spaCy model are looked up on first use. Fetch them once per machine with
+`python content_analyzer.py setup`.
 """
 
 import logging
-from typing import Dict, List, Optional, Any
+import os
+from concurrent.futures import FIRST_COMPLETED, wait
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Any, Tuple, Union
 
-import nltk
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
-from bs4 import BeautifulSoup
+from keywords import KeywordExtractor
+from near_dup import NearDupIndex
+from parsed_page import ParsedPage
 
-# Optional heavier dependencies (comment out if not installed)
-try:
-    import spacy
-    NLP = spacy.load("en_core_web_sm", disable=["parser", "ner"])  # fast mode
-except ImportError:
-    NLP = None
-    logging.warning("spaCy not available – entity extraction disabled")
+logger = logging.getLogger(__name__)
 
-nltk.download('vader_lexicon', quiet=True)
-nltk.download('punkt', quiet=True)
-nltk.download('stopwords', quiet=True)
+SPACY_MODEL = "en_core_web_sm"
+
+# NLTK data used at run time: download name -> nltk.data path
+NLTK_RESOURCES = {"vader_lexicon": "sentiment/vader_lexicon.zip"}
+
+
+def missing_resources(spacy_model: str = SPACY_MODEL) -> List[str]:
+    """Resources (NLTK data, spaCy model) not installed locally. Never downloads."""
+    missing = []
+    try:
+        import nltk
+        for name, path in NLTK_RESOURCES.items():
+            try:
+                nltk.data.find(path)
+            except LookupError:
+                missing.append(name)
+    except ImportError:
+        missing.append("nltk")
+    try:
+        import spacy.util
+        if not spacy.util.is_package(spacy_model):
+            missing.append(spacy_model)
+    except ImportError:
+        missing.append("spacy")
+    return missing
+
+
+def setup_resources(spacy_model: str = SPACY_MODEL) -> List[str]:
+    """Download missing NLTK data and the spaCy model. Returns what is still missing."""
+    for name in missing_resources(spacy_model):
+        if name in NLTK_RESOURCES:
+            import nltk
+            nltk.download(name, quiet=True)
+        elif name == spacy_model:
+            from spacy.cli import download
+            download(spacy_model)
+    return missing_resources(spacy_model)
+
+# Loaded spaCy pipelines by model name (None = unavailable), see load_nlp()
+_NLP_CACHE: Dict[str, Any] = {}
+
+
+def load_nlp(model: str = SPACY_MODEL):
+    """
+    spaCy pipeline for entity extraction, loaded on first use and cached per process.
+    Only NER (and the tok2vec it reads) runs. Returns None if spaCy or the model is missing.
+    """
+    if model not in _NLP_CACHE:
+        try:
+            import spacy
+            _NLP_CACHE[model] = spacy.load(model, disable=["tagger", "parser", "attribute_ruler", "lemmatizer"])
+        except (ImportError, OSError) as e:
+            logger.warning("spaCy model %s not available – entity extraction disabled (%s)", model, e)
+            _NLP_CACHE[model] = None
+    return _NLP_CACHE[model]
+
+
+def chunk_text(text: str, max_chars: int = 100_000) -> List[Tuple[int, str]]:
+    """
+    Split `text` into (offset, chunk) pieces of at most `max_chars`,
+    breaking after a sentence end where possible, else at whitespace.
+    """
+    chunks = []
+    start = 0
+    while len(text) - start > max_chars:
+        window = text[start:start + max_chars]
+        cut = max(window.rfind(". "), window.rfind("! "), window.rfind("? "))
+        if cut < max_chars // 2:
+            cut = window.rfind(" ")
+        end = start + cut + 1 if cut > 0 else start + max_chars
+        chunks.append((start, text[start:end]))
+        start = end
+    chunks.append((start, text[start:]))
+    return chunks
+
+
+# Per-process analyzer for analyze_many(), built once by the pool initializer
+_WORKER_ANALYZER: Optional["ContentAnalyzer"] = None
+
+
+def _init_worker(options: Dict[str, Any]):
+    from multiprocessing.util import Finalize
+
+    global _WORKER_ANALYZER
+    _WORKER_ANALYZER = ContentAnalyzer(**options)
+    _WORKER_ANALYZER.nlp  # load the model now, not inside the first chunk
+    Finalize(_WORKER_ANALYZER, _WORKER_ANALYZER.close, exitpriority=10)  # flush keyword DF on worker exit
+
+
+def _analyze_chunk(chunk: List[Tuple[int, str, str]]) -> List[Tuple[int, Dict[str, Any]]]:
+    results = _WORKER_ANALYZER.analyze_batch([(html, url) for _, html, url in chunk])
+    return [(index, result) for (index, _, _), result in zip(chunk, results)]
 
-logger = logging.getLogger(__name__)
 
 class ContentAnalyzer:
-    def __init__(self):
-        self.sentiment_analyzer = SentimentIntensityAnalyzer()
+    def __init__(
+        self,
+        spacy_model: str = SPACY_MODEL,
+        ner_batch_size: int = 32,
+        ner_n_process: int = 1,
+        ner_chunk_chars: int = 100_000,
+        keyword_df_path: Optional[str] = None,
+        near_dup_path: Optional[str] = None,
+        duplicate_outlink_factor: float = 0.1
+    ):
+        """
+        Args:
+            spacy_model: spaCy pipeline used for entities (loaded on first use)
+            ner_batch_size: Texts per nlp.pipe batch
+            ner_n_process: Processes nlp.pipe may use (keep 1 inside analyze_many workers)
+            ner_chunk_chars: Long pages are split into chunks of this size for NER
+            keyword_df_path: SQLite file of corpus document frequencies for TF-IDF
+                             keywords (None = this process's pages only)
+            near_dup_path: SQLite SimHash index for near-duplicate detection
+                           (None = this process's pages only)
+            duplicate_outlink_factor: outlink_priority_factor reported for near
+                                      duplicates; scale their outlinks' priority_score by it
+        """
+        self._sentiment_analyzer = None
+        self._sentiment_unavailable = False
+        self.spacy_model = spacy_model
+        self.ner_batch_size = ner_batch_size
+        self.ner_n_process = ner_n_process
+        self.ner_chunk_chars = ner_chunk_chars
+        self.keyword_df_path = keyword_df_path
+        self.keywords = KeywordExtractor(keyword_df_path)
+        self.near_dup_path = near_dup_path
+        self.near_dups = NearDupIndex(near_dup_path or ":memory:")
+        self.duplicate_outlink_factor = duplicate_outlink_factor
 
-    def analyze(self, html: str, url: str) -> Dict[str, Any]:
+    def close(self):
+        self.keywords.close()
+        self.near_dups.close()
+
+    @property
+    def sentiment_analyzer(self):
+        """VADER, built on first use. None if NLTK or its lexicon is not installed."""
+        if self._sentiment_analyzer is None and not self._sentiment_unavailable:
+            try:
+                from nltk.sentiment.vader import SentimentIntensityAnalyzer
+                self._sentiment_analyzer = SentimentIntensityAnalyzer()
+            except (ImportError, LookupError) as e:
+                self._sentiment_unavailable = True
+                logger.warning("VADER not available – sentiment disabled; run `content_analyzer.py setup` (%s)",
+                               str(e).strip().splitlines()[0] if str(e).strip() else type(e).__name__)
+        return self._sentiment_analyzer
+
+    @property
+    def nlp(self):
+        return load_nlp(self.spacy_model)
+
+    def analyze(self, html: Union[str, ParsedPage], url: str) -> Dict[str, Any]:
         """
         Main analysis entry point.
+        Accepts raw HTML or a ParsedPage shared with other pipeline stages.
         Returns structured dict with extracted signals.
         """
-        try:
-            soup = BeautifulSoup(html, "lxml")
-            text = self._clean_text(soup)
-
-            result = {
-                "url": url,
-                "clean_text_length": len(text),
-                "keywords": self._extract_keywords(text),
-                "sentiment": self._get_sentiment(text),
-                "entities": self._extract_entities(text) if NLP else [],
-                "has_contact_form": bool(soup.find(attrs={"action": True, "method": "post"})),
-                "has_newsletter": "newsletter" in text.lower() or "subscribe" in text.lower(),
+        return self.analyze_batch([(html, url)])[0]
+
+    def analyze_batch(self, pages: List[Tuple[Union[str, ParsedPage], str]]) -> List[Dict[str, Any]]:
+        """
+        Analyze several pages, running NER over all of them in one nlp.pipe pass.
+        Near duplicates of an already analyzed page skip sentiment and NER, and
+        report it as `near_duplicate_of`.
+        """
+        results: List[Dict[str, Any]] = []
+        texts: Dict[int, str] = {}
+        for html, url in pages:
+            try:
+                page = ParsedPage.of(html, url)
+                text = page.text
+                duplicate_of = self.near_dups.check(url, text)
+                if duplicate_of is None:
+                    texts[len(results)] = text
+                results.append({
+                    "url": url,
+                    "clean_text_length": len(text),
+                    "keywords": self._extract_keywords(text, update=duplicate_of is None),
+                    "sentiment": self._get_sentiment(text) if duplicate_of is None else None,
+                    "entities": [],
+                    "has_contact_form": page.has_post_form,
+                    "has_newsletter": "newsletter" in text.lower() or "subscribe" in text.lower(),
+                    "near_duplicate_of": duplicate_of,
+                    "outlink_priority_factor": 1.0 if duplicate_of is None else self.duplicate_outlink_factor,
+                })
+            except Exception as e:
+                logger.error("Content analysis failed for %s: %s", url, e, exc_info=True)
+                results.append({"url": url, "error": str(e)})
+
+        if texts:
+            try:
+                for index, entities in zip(texts, self.extract_entities_many(list(texts.values()))):
+                    results[index]["entities"] = entities
+            except Exception as e:
+                logger.error("Entity extraction failed for %d pages: %s", len(texts), e, exc_info=True)
+
+        logger.debug("Content analysis complete for %d pages", len(results))
+        return results
+
+    def analyze_many(
+        self,
+        pages: Iterable[Tuple[Union[str, ParsedPage], str]],
+        workers: Optional[int] = None,
+        chunk_size: int = 16,
+        ordered: bool = True,
+        max_in_flight: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Analyze (html, url) pairs on a process pool, yielding results as they finish.
+        Each worker loads its models once; pages are sent in chunks of `chunk_size`
+        and at most `max_in_flight` chunks (default 2 per worker) are outstanding.
+        In ordered mode results waiting on a slower earlier chunk count against
+        the same window, so memory stays bounded and `pages` may be an unbounded
+        generator.
+
+        Workers share one near-duplicate index: near_dup_path, or a temporary
+        SQLite file for the duration of the call. Two copies of a page analyzed
+        at the same moment by different workers may both be kept.
+
+        Args:
+            workers: Worker processes (default: CPU count; 1 = analyze in-process)
+            ordered: Yield in input order (True) or completion order (False)
+        """
+        workers = workers or os.cpu_count() or 1
+        pairs = ((page.html if isinstance(page, ParsedPage) else page, url) for page, url in pages)
+        indexed = ((index, html, url) for index, (html, url) in enumerate(pairs))
+        chunks = iter(lambda: list(islice(indexed, chunk_size)), [])
+        if workers == 1:
+            for chunk in chunks:
+                yield from self.analyze_batch([(html, url) for _, html, url in chunk])
+            return
+
+        max_in_flight = max_in_flight or 2 * workers
+        window = max_in_flight * chunk_size  # pages submitted but not yet yielded (ordered mode)
+        done: Dict[int, Dict[str, Any]] = {}
+        next_index = 0
+        submitted = 0
+
+        import tempfile
+        from concurrent.futures import ProcessPoolExecutor
+
+        with tempfile.TemporaryDirectory(prefix="artemis-near-dup-") as scratch:
+            options = {
+                "spacy_model": self.spacy_model,
+                "ner_batch_size": self.ner_batch_size,
+                "ner_n_process": 1,  # the pool already uses every core
+                "ner_chunk_chars": self.ner_chunk_chars,
+                "keyword_df_path": self.keyword_df_path,
+                "near_dup_path": self.near_dup_path or os.path.join(scratch, "near_dup.sqlite3"),
+                "duplicate_outlink_factor": self.duplicate_outlink_factor,
             }
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(options,)) as pool:
+                pending = set()
+                while True:
+                    while len(pending) < max_in_flight and (not ordered or submitted - next_index < window):
+                        chunk = next(chunks, None)
+                        if not chunk:
+                            break
+                        pending.add(pool.submit(_analyze_chunk, chunk))
+                        submitted += len(chunk)
+                    if not pending:
+                        break
 
-            logger.debug("Content analysis complete for %s", url)
-            return result
-
-        except Exception as e:
-            logger.error("Content analysis failed for %s: %s", url, e, exc_info=True)
-            return {"url": url, "error": str(e)}
-
-    def _clean_text(self, soup: BeautifulSoup) -> str:
-        """Remove scripts, styles, boilerplate."""
-        for tag in soup(["script", "style", "noscript", "header", "footer", "nav"]):
-            tag.decompose()
-
-        text = soup.get_text(separator=" ", strip=True)
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        return " ".join(chunk for chunk in chunks if chunk)
-
-    def _extract_keywords(self, text: str, top_n: int = 10) -> List[str]:
-        """Simple TF-IDF like keyword extraction (no external model)."""
-        from collections import Counter
-        from nltk.corpus import stopwords
-        from nltk.tokenize import word_tokenize
-
-        stop_words = set(stopwords.words("english"))
-        tokens = [
-            w.lower() for w in word_tokenize(text)
-            if w.isalpha() and w.lower() not in stop_words and len(w) > 2
-        ]
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        for index, result in future.result():
+                            if ordered:
+                                done[index] = result
+                            else:
+                                yield result
 
-        counter = Counter(tokens)
-        return [word for word, _ in counter.most_common(top_n)]
+                    while next_index in done:
+                        yield done.pop(next_index)
+                        next_index += 1
 
-    def _get_sentiment(self, text: str) -> Dict[str, float]:
-        """VADER sentiment scores."""
+    def _extract_keywords(self, text: str, top_n: int = 10, update: bool = True) -> List[str]:
+        """TF-IDF keywords against the corpus seen so far (see keywords.py)."""
+        return self.keywords.extract(text, top_n, update=update)
+
+    def _get_sentiment(self, text: str) -> Optional[Dict[str, float]]:
+        """VADER sentiment scores (None if VADER is not installed)."""
         if len(text) < 20:
             return {"compound": 0.0, "pos": 0.0, "neu": 1.0, "neg": 0.0}
 
+        if self.sentiment_analyzer is None:
+            return None
         scores = self.sentiment_analyzer.polarity_scores(text)
         return scores
 
-    def _extract_entities(self, text: str) -> List[Dict[str, str]]:
+    def _extract_entities(self, text: str) -> List[Dict[str, Any]]:
         """Named entity recognition with spaCy (if available)."""
-        if not NLP:
-            return []
+        return self.extract_entities_many([text])[0]
 
-        doc = NLP(text[:1000000])  # safety limit
-        return [
-            {"text": ent.text, "label": ent.label_, "start": ent.start_char, "end": ent.end_char}
-            for ent in doc.ents
+    def extract_entities_many(self, texts: List[str]) -> List[List[Dict[str, Any]]]:
+        """
+        Entities for each text via one nlp.pipe pass. Long texts are chunked
+        (not truncated) and entity offsets mapped back onto the full text.
+        """
+        entities: List[List[Dict[str, Any]]] = [[] for _ in texts]
+        nlp = self.nlp
+        if nlp is None:
+            return entities
+
+        pieces = [
+            (index, offset, chunk)
+            for index, text in enumerate(texts)
+            for offset, chunk in chunk_text(text, self.ner_chunk_chars)
         ]
+        docs = nlp.pipe((chunk for _, _, chunk in pieces), batch_size=self.ner_batch_size, n_process=self.ner_n_process)
+        for (index, offset, _), doc in zip(pieces, docs):
+            entities[index].extend(
+                {"text": ent.text, "label": ent.label_, "start": offset + ent.start_char, "end": offset + ent.end_char}
+                for ent in doc.ents
+            )
+        return entities
 
 
 # Quick test / CLI usage
@@ -109,8 +346,17 @@ if __name__ == "__main__":
 
     if len(sys.argv) < 2:
         print("Usage: python content_analyzer.py <html_file_or_url>")
+        print("       python content_analyzer.py setup    # download NLTK data and the spaCy model")
         sys.exit(1)
 
+    if sys.argv[1] == "setup":
+        still_missing = setup_resources()
+        if still_missing:
+            print("Still missing:", ", ".join(still_missing))
+            sys.exit(1)
+        print("All analyzer resources installed.")
+        sys.exit(0)
+
     analyzer = ContentAnalyzer()
 
     if sys.argv[1].startswith("http"):
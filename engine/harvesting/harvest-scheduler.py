@@ -1,32 +1,300 @@
 # harvesting/harvest-scheduler.py
-import time
-import subprocess
+"""
+Artemis Harvest Scheduler
+Keeps up to N recursive harvests in flight as asyncio subprocesses, fed from a
+local lease of queued jobs. Jobs start in priority order among hosts that are
+currently eligible under the per-domain politeness policy. SIGTERM/SIGINT stop
+claiming, let running harvests finish and hand undrained jobs back to the queue.
+Run: python harvest-scheduler.py [--concurrency N] [seed_url ...]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import re
+import shlex
+import signal
+from collections import deque
+from typing import Any, Dict, Optional
+
 from workload_manager import ArtemisWorkload
 from config import get_config
+from politeness import DomainPoliteness
 
-config = get_config()
+logger = logging.getLogger("harvest_scheduler")
 
-manager = ArtemisWorkload(config['db'])
+_COUNT_PATTERNS = (
+    re.compile(r'"?harvested_count"?\s*[:=]\s*(\d+)', re.IGNORECASE),
+    re.compile(r'"?pages"?\s*[:=]\s*(\d+)', re.IGNORECASE),
+)
+_RETRY_AFTER = re.compile(r'retry-after[\'"]?\s*[:=]\s*[\'"]?([^\'"\r\n,}]+)', re.IGNORECASE)
 
-while True:
-    job = manager.get_next_job()
-    if not job:
-        print("Queue empty. Sleeping 30s...")
-        time.sleep(30)
-        continue
 
-    url = job['url']
-    print(f"Processing job {job['id']}: {url}")
+def parse_harvested_count(output: str) -> int:
+    """
+    Extract the harvested page count from a harvester's stdout.
+    Prefers the last JSON object line ({"stats": {"pages": N}} or
+    {"harvested_count": N}); falls back to the last `pages: N` style match.
+    """
+    for line in reversed(output.strip().splitlines()):
+        line = line.strip()
+        if not line.startswith("{"):
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError:
+            continue
+        if not isinstance(data, dict):
+            continue
+        for source in (data, data.get("stats")):
+            if not isinstance(source, dict):
+                continue
+            for key in ("harvested_count", "pages"):
+                value = source.get(key)
+                if isinstance(value, int) and not isinstance(value, bool):
+                    return value
+        if isinstance(data.get("harvested"), list):
+            return len(data["harvested"])
 
-    try:
-        # Option A: Call Node.js recursive harvest
-        result = subprocess.run(
-            ["node", "recursive-harvest.js", url],
-            capture_output=True, text=True, timeout=300
+    for pattern in _COUNT_PATTERNS:
+        matches = pattern.findall(output)
+        if matches:
+            return int(matches[-1])
+    return 0
+
+
+class HarvestScheduler:
+    """Runs queued harvest jobs concurrently with a fixed in-flight limit."""
+
+    def __init__(
+        self,
+        manager: ArtemisWorkload,
+        command: str = "node recursive-harvest.js",
+        concurrency: int = 4,
+        job_timeout: float = 300.0,
+        idle_sleep: float = 30.0,
+        reap_interval: float = 60.0,
+        politeness: Optional[DomainPoliteness] = None
+    ):
+        self.manager = manager
+        self.command = shlex.split(command)
+        self.concurrency = concurrency
+        self.job_timeout = job_timeout
+        self.idle_sleep = idle_sleep
+        self.reap_interval = reap_interval
+        self.lease_size = concurrency * 2
+        self.max_pending = concurrency * 8
+        self.politeness = politeness or DomainPoliteness()
+
+        self._pending: deque = deque()              # claimed, not yet started
+        self._in_flight: Dict[asyncio.Task, Dict[str, Any]] = {}
+        self._work_waiter: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+
+    def stop(self):
+        if not self._stopping.is_set():
+            logger.info("Shutdown requested – finishing %d in-flight job(s)", len(self._in_flight))
+            self._stopping.set()
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except NotImplementedError:  # Windows
+                pass
+
+        housekeeping = asyncio.create_task(self._housekeeping())
+        try:
+            while not self._stopping.is_set():
+                while len(self._in_flight) < self.concurrency:
+                    job = await self._next_job()
+                    if job is None:
+                        break
+                    task = asyncio.create_task(self._run_job(job))
+                    self._in_flight[task] = job
+
+                if self._in_flight:
+                    waiting_on = list(self._in_flight)
+                    if len(self._in_flight) < self.concurrency and not self._pending:
+                        # Free slots and nothing leased: also wake when new work is enqueued
+                        waiting_on.append(self._work_signal())
+                    done, _ = await asyncio.wait(
+                        waiting_on,
+                        timeout=self._ready_in(),
+                        return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in done:
+                        self._in_flight.pop(task, None)
+                elif self._pending:
+                    await self._sleep(min(self.idle_sleep, self._ready_in() or self.idle_sleep))
+                else:
+                    logger.info("Queue empty. Waiting up to %.0fs for new work...", self.idle_sleep)
+                    await self._work_signal()
+
+            if self._in_flight:
+                await asyncio.wait(list(self._in_flight))
+        finally:
+            housekeeping.cancel()
+            if self._work_waiter is not None:
+                self._work_waiter.cancel()
+            if self._pending:
+                await asyncio.to_thread(self.manager.release_jobs, [j['id'] for j in self._pending])
+                self._pending.clear()
+
+    async def _next_job(self) -> Optional[Dict[str, Any]]:
+        """
+        Take the highest-priority leased job whose host is eligible now.
+        When every leased job is waiting on its host, lease more (up to
+        max_pending) so other domains can make progress meanwhile.
+        """
+        job = await self._pick_eligible()
+        if job is None and len(self._pending) < self.max_pending and not self._stopping.is_set():
+            fresh = await asyncio.to_thread(self.manager.get_next_jobs, self.lease_size)
+            self._pending.extend(fresh)
+            if fresh:
+                job = await self._pick_eligible()
+        return job
+
+    async def _pick_eligible(self) -> Optional[Dict[str, Any]]:
+        blocked = [j for j in self._pending if self.politeness.is_blocked(j['url'])]
+        for job in blocked:
+            self._pending.remove(job)
+            self.manager.fail_later(job['id'], "Domain blocked by harvest policy")
+
+        for job in self._pending:
+            if self.politeness.acquire(job['url']):
+                self._pending.remove(job)
+                return job
+        return None
+
+    def _ready_in(self) -> Optional[float]:
+        """Seconds until a leased job's host frees up, or None if nothing is waiting."""
+        if not self._pending:
+            return None
+        wait = self.politeness.next_ready_in(j['url'] for j in self._pending)
+        return None if wait == float("inf") else max(wait, 0.05)
+
+    async def _sleep(self, seconds: float):
+        """Sleep that wakes early on shutdown."""
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    def _work_signal(self) -> asyncio.Task:
+        """
+        Task that finishes when new work is announced or idle_sleep passes.
+        One waiter is shared by both wait paths, so the listener is never
+        blocked on twice at once.
+        """
+        if self._work_waiter is None or self._work_waiter.done():
+            self._work_waiter = asyncio.create_task(self._wait_for_work(self.idle_sleep))
+        return self._work_waiter
+
+    async def _wait_for_work(self, timeout: float):
+        """
+        Block on the queue's LISTEN channel so new jobs start within milliseconds,
+        checking for shutdown every second. Falls back to a plain timeout when
+        the listener is unavailable.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while not self._stopping.is_set():
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            if await asyncio.to_thread(self.manager.wait_for_work, min(1.0, remaining)):
+                return
+
+    async def _housekeeping(self):
+        """Renew leases for everything this worker holds and reap dead workers' jobs."""
+        interval = min(self.reap_interval, self.manager.lease_seconds / 3)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                held = [j['id'] for j in self._in_flight.values()] + [j['id'] for j in self._pending]
+                await asyncio.to_thread(self.manager.extend_lease, held)
+                await asyncio.to_thread(self.manager.reap_expired_leases)
+            except Exception as e:
+                logger.error("Lease housekeeping failed: %s", e)
+
+    async def _run_job(self, job: Dict[str, Any]):
+        logger.info("Processing job %s: %s", job['id'], job['url'])
+        try:
+            await self._harvest(job)
+        finally:
+            self.politeness.release(job['url'])
+
+    async def _harvest(self, job: Dict[str, Any]):
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *self.command, job['url'],
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            try:
+                stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=self.job_timeout)
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+                raise TimeoutError(f"Harvest timed out after {self.job_timeout:.0f}s")
+
+            retry_after = _RETRY_AFTER.findall(stdout.decode("utf-8", errors="replace")
+                                               + stderr.decode("utf-8", errors="replace"))
+            if retry_after:
+                self.politeness.defer(job['url'], retry_after[-1].strip())
+
+            if proc.returncode == 0:
+                count = parse_harvested_count(stdout.decode("utf-8", errors="replace"))
+                await asyncio.wrap_future(self.manager.complete_later(job['id'], count))
+                logger.info("Job %s complete – %d pages", job['id'], count)
+            else:
+                error = stderr.decode("utf-8", errors="replace").strip() or f"exit code {proc.returncode}"
+                await asyncio.wrap_future(self.manager.fail_later(job['id'], error[-2000:]))
+        except Exception as e:
+            logger.error("Job %s failed: %s", job['id'], e)
+            await asyncio.wrap_future(self.manager.fail_later(job['id'], str(e)))
+
+
+def main():
+    config = get_config()
+    sched_config = config['scheduler']
+    parser = argparse.ArgumentParser(description="Artemis Harvest Scheduler")
+    parser.add_argument("seeds", nargs="*", help="URLs to enqueue before starting")
+    parser.add_argument("--concurrency", type=int, default=sched_config['concurrency'],
+                        help="Maximum harvests in flight")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    manager = ArtemisWorkload.from_config(
+        config,
+        maxconn=args.concurrency + 2,
+        lease_seconds=sched_config['lease_seconds']
+    )
+    if args.seeds:
+        manager.add_many_to_harvest(args.seeds, origin="seed")
+
+    scheduler = HarvestScheduler(
+        manager,
+        command=sched_config['command'],
+        concurrency=args.concurrency,
+        job_timeout=sched_config['job_timeout'],
+        idle_sleep=sched_config['idle_sleep'],
+        politeness=DomainPoliteness(
+            delay=config['polite_delay'],
+            burst=sched_config['domain_burst'],
+            max_concurrent=sched_config['domain_concurrency'],
+            blocked_domains=config['blocked_domains']
         )
-        if result.returncode == 0:
-            manager.mark_complete(job['id'], harvested_count=42)  # parse real count
-        else:
-            manager.mark_failed(job['id'], result.stderr)
-    except Exception as e:
-        manager.mark_failed(job['id'], str(e))
+    )
+    try:
+        asyncio.run(scheduler.run())
+    finally:
+        manager.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+# harvesting/http_cache.py
+"""
+Persistent HTTP validator cache for re-crawls.
+Stores ETag / Last-Modified / Cache-Control expiry per URL (and, for pages,
+a compressed copy of the body) in SQLite. Fresh entries are served without a
+request; stale ones are revalidated with If-None-Match / If-Modified-Since,
+and a 304 counts as a hit.
+"""
+
+import logging
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+_MAX_AGE = re.compile(r"(?:^|,)\s*(?:s-)?max-age\s*=\s*\"?(\d+)", re.IGNORECASE)
+
+
+class CacheEntry(NamedTuple):
+    url: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    expires_at: float
+    body: Optional[bytes]
+    content_type: Optional[str]
+
+
+class CachedResponse(NamedTuple):
+    """Minimal response returned by cached_get (from the network or the cache)."""
+    url: str
+    status_code: int
+    content: bytes
+    headers: Dict[str, str]
+    from_cache: bool
+
+    @property
+    def text(self) -> str:
+        charset = re.search(r"charset=([\w-]+)", self.headers.get("content-type", ""), re.IGNORECASE)
+        return self.content.decode(charset.group(1) if charset else "utf-8", errors="replace")
+
+
+def freshness_lifetime(headers) -> Optional[float]:
+    """
+    Seconds a response may be reused without revalidation, from Cache-Control.
+    Returns None for no-store (do not cache); 0 for no-cache or no max-age.
+    """
+    cache_control = headers.get("cache-control", "") or ""
+    lowered = cache_control.lower()
+    if "no-store" in lowered:
+        return None
+    if "no-cache" in lowered:
+        return 0.0
+    match = _MAX_AGE.search(cache_control)
+    return float(match.group(1)) if match else 0.0
+
+
+class HttpCache:
+    """Thread-safe SQLite-backed store of HTTP validators and page bodies."""
+
+    def __init__(self, path: Union[str, Path] = "data/http_cache.sqlite3", max_body_bytes: int = 5_000_000):
+        """
+        Args:
+            path: SQLite file
+            max_body_bytes: Larger bodies keep validators only
+        """
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.max_body_bytes = max_body_bytes
+        self.hits = self.revalidated = self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS http_cache (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                expires_at REAL NOT NULL,
+                body BLOB,
+                content_type TEXT
+            )
+        """)
+        self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT url, etag, last_modified, expires_at, body, content_type FROM http_cache WHERE url = ?",
+                (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        body = zlib.decompress(row[4]) if row[4] is not None else None
+        return CacheEntry(row[0], row[1], row[2], row[3], body, row[5])
+
+    @staticmethod
+    def is_fresh(entry: CacheEntry) -> bool:
+        return entry.expires_at > time.time()
+
+    @staticmethod
+    def conditional_headers(entry: Optional[CacheEntry]) -> Dict[str, str]:
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def store(self, url: str, headers, body: Optional[bytes] = None):
+        """Record validators (and optionally the body) from a 200 response."""
+        lifetime = freshness_lifetime(headers)
+        if lifetime is None:
+            self.forget(url)
+            return
+        etag, last_modified = headers.get("etag"), headers.get("last-modified")
+        if not (etag or last_modified or lifetime):
+            return  # nothing that would let us skip or shorten the next fetch
+        if body is not None and len(body) > self.max_body_bytes:
+            body = None
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO http_cache VALUES (?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, time.time() + lifetime,
+                 zlib.compress(body) if body is not None else None, headers.get("content-type"))
+            )
+            self._db.commit()
+
+    def touch(self, url: str, headers):
+        """Apply a 304: extend freshness and take any updated validators."""
+        lifetime = freshness_lifetime(headers) or 0.0
+        with self._lock:
+            self._db.execute(
+                """UPDATE http_cache
+                   SET expires_at = ?, etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified)
+                   WHERE url = ?""",
+                (time.time() + lifetime, headers.get("etag"), headers.get("last-modified"), url)
+            )
+            self._db.commit()
+
+    def forget(self, url: str):
+        with self._lock:
+            self._db.execute("DELETE FROM http_cache WHERE url = ?", (url,))
+            self._db.commit()
+
+    def record(self, outcome: str):
+        """Count a lookup outcome: "hits", "revalidated" or "misses". Safe from worker threads."""
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "revalidated": self.revalidated, "misses": self.misses}
+
+
+def cached_get(session, url: str, cache: HttpCache, timeout: float = 10, **kwargs) -> CachedResponse:
+    """
+    GET `url` through `cache` with a requests-compatible session.
+    Fresh entries return without a request; stale ones are revalidated and a
+    304 is answered from the cached body. Other statuses pass through uncached.
+    """
+    entry = cache.get(url)
+    if entry is not None and entry.body is not None:
+        cached_headers = {"content-type": entry.content_type or ""}
+        if cache.is_fresh(entry):
+            cache.record("hits")
+            return CachedResponse(url, 200, entry.body, cached_headers, True)
+        headers = dict(kwargs.pop("headers", None) or {})
+        headers.update(cache.conditional_headers(entry))
+        kwargs["headers"] = headers
+
+    response = session.get(url, timeout=timeout, **kwargs)
+    if response.status_code == 304 and entry is not None and entry.body is not None:
+        cache.touch(url, response.headers)
+        cache.record("revalidated")
+        return CachedResponse(url, 200, entry.body, cached_headers, True)
+
+    cache.record("misses")
+    if response.status_code == 200:
+        cache.store(url, response.headers, response.content)
+    return CachedResponse(url, response.status_code, response.content, response.headers, False)
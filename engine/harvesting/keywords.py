@@ -0,0 +1,126 @@
+# harvesting/keywords.py
+"""
+TF-IDF keyword extraction for harvested pages.
+Tokenizes with one precompiled regex against a built-in stopword set (no
+NLTK corpora or Punkt at run time), and keeps corpus document frequencies
+in memory, flushed incrementally to SQLite so IDF improves across crawls.
+"""
+
+import logging
+import math
+import re
+import sqlite3
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# NLTK's English stopword list, embedded so no corpus download is needed
+STOPWORDS = frozenset("""
+a about above after again against ain all am an and any are aren aren't as at be because been before
+being below between both but by can couldn couldn't d did didn didn't do does doesn doesn't doing don
+don't down during each few for from further had hadn hadn't has hasn hasn't have haven haven't having
+he her here hers herself him himself his how i if in into is isn isn't it it's its itself just ll m ma
+me mightn mightn't more most mustn mustn't my myself needn needn't no nor not now o of off on once only
+or other our ours ourselves out over own re s same shan shan't she she's should should've shouldn
+shouldn't so some such t than that that'll the their theirs them themselves then there these they this
+those through to too under until up ve very was wasn wasn't we were weren weren't what when where which
+while who whom why will with won won't wouldn wouldn't y you you'd you'll you're you've your yours
+yourself yourselves
+""".split())
+
+# Alphabetic runs of 3+ letters (any script), matching the old isalpha() and len > 2 filter
+_TOKEN = re.compile(r"[^\W\d_]{3,}")
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class KeywordExtractor:
+    def __init__(self, df_path: Optional[Union[str, Path]] = None, flush_every: int = 100):
+        """
+        Args:
+            df_path: SQLite file holding corpus document frequencies (None = in-memory only)
+            flush_every: Documents between incremental writes of new frequencies
+        """
+        self.df_path = Path(df_path) if df_path else None
+        self.flush_every = max(1, flush_every)
+        self.doc_count = 0
+        self._df: Counter = Counter()
+        self._pending: Counter = Counter()
+        self._pending_docs = 0
+        self._lock = threading.Lock()
+        self._db = None
+
+        if self.df_path:
+            self.df_path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(self.df_path), timeout=30, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript("""
+                CREATE TABLE IF NOT EXISTS term_df (term TEXT PRIMARY KEY, df INTEGER NOT NULL);
+                CREATE TABLE IF NOT EXISTS corpus (id INTEGER PRIMARY KEY CHECK (id = 1), docs INTEGER NOT NULL);
+                INSERT OR IGNORE INTO corpus (id, docs) VALUES (1, 0);
+            """)
+            self._db.commit()
+            self.doc_count = self._db.execute("SELECT docs FROM corpus").fetchone()[0]
+            self._df.update(dict(self._db.execute("SELECT term, df FROM term_df")))
+            logger.info("Loaded document frequencies: %d terms over %d docs", len(self._df), self.doc_count)
+
+    def add_document(self, terms: Iterable[str]):
+        """Count one document containing `terms` (each distinct term once)."""
+        distinct = set(terms)
+        with self._lock:
+            self.doc_count += 1
+            self._df.update(distinct)
+            self._pending.update(distinct)
+            self._pending_docs += 1
+            due = self._db is not None and self._pending_docs >= self.flush_every
+        if due:
+            self.flush()
+
+    def idf(self, term: str) -> float:
+        """Smoothed inverse document frequency."""
+        return math.log((1 + self.doc_count) / (1 + self._df.get(term, 0))) + 1.0
+
+    def scores(self, text: str, update: bool = True) -> Dict[str, float]:
+        """TF-IDF score of every term in `text`. With update=True the text joins the corpus first."""
+        counts = Counter(tokenize(text))
+        if not counts:
+            return {}
+        if update:
+            self.add_document(counts)
+        total = sum(counts.values())
+        return {term: (count / total) * self.idf(term) for term, count in counts.items()}
+
+    def extract(self, text: str, top_n: int = 10, update: bool = True) -> List[str]:
+        """Top `top_n` keywords of `text` by TF-IDF."""
+        scores = self.scores(text, update=update)
+        return sorted(scores, key=scores.get, reverse=True)[:top_n]
+
+    def flush(self):
+        """Add frequencies counted since the last flush to the SQLite store."""
+        if self._db is None:
+            return
+        with self._lock:
+            if not self._pending_docs:
+                return
+            pending, docs = self._pending, self._pending_docs
+            self._pending, self._pending_docs = Counter(), 0
+            # Increments, not absolutes, so several processes can share one file
+            self._db.executemany(
+                "INSERT INTO term_df (term, df) VALUES (?, ?) ON CONFLICT(term) DO UPDATE SET df = df + excluded.df",
+                pending.items()
+            )
+            self._db.execute("UPDATE corpus SET docs = docs + ? WHERE id = 1", (docs,))
+            self._db.commit()
+        logger.debug("Flushed document frequencies for %d docs", docs)
+
+    def close(self):
+        self.flush()
+        if self._db is not None:
+            with self._lock:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,128 @@
+# harvesting/media_admission.py
+"""
+Streaming admission checks for media downloads.
+Decides from response headers and the first bytes (magic numbers) whether a
+body is media worth keeping, and enforces a size cap while it streams, so a
+download is abandoned as soon as it is known to be wrong – never buffered.
+"""
+
+from typing import Iterable, Iterator, Optional, Tuple
+
+SNIFF_BYTES = 512
+
+# (offset, signature, mime type)
+_SIGNATURES: Tuple[Tuple[int, bytes, str], ...] = (
+    (0, b"\x89PNG\r\n\x1a\n", "image/png"),
+    (0, b"\xff\xd8\xff", "image/jpeg"),
+    (0, b"GIF87a", "image/gif"),
+    (0, b"GIF89a", "image/gif"),
+    (8, b"WEBP", "image/webp"),
+    (0, b"BM", "image/bmp"),
+    (0, b"II*\x00", "image/tiff"),
+    (0, b"MM\x00*", "image/tiff"),
+    (0, b"\x00\x00\x01\x00", "image/x-icon"),
+    (0, b"%PDF-", "application/pdf"),
+    (0, b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "application/msword"),  # OLE2: .doc/.xls/.ppt
+    (0, b"PK\x03\x04", "application/zip"),                          # .docx/.xlsx/.pptx
+    (4, b"ftyp", "video/mp4"),
+    (0, b"\x1a\x45\xdf\xa3", "video/webm"),
+    (0, b"ID3", "audio/mpeg"),
+    (0, b"OggS", "audio/ogg"),
+)
+
+_HTML_MARKERS = (b"<!doctype html", b"<html", b"<head", b"<body", b"<script")
+
+DEFAULT_ALLOWED = ("image/", "video/", "audio/", "application/pdf", "application/msword",
+                   "application/zip", "application/vnd.openxmlformats-officedocument.")
+
+
+class AdmissionRejected(Exception):
+    """Raised mid-stream when a download fails an admission check."""
+
+
+def sniff(head: bytes) -> Optional[str]:
+    """MIME type from magic numbers, or None if unrecognised."""
+    for offset, signature, mime in _SIGNATURES:
+        if head[offset:offset + len(signature)] == signature:
+            return mime
+    stripped = head.lstrip()[:256].lower()
+    if stripped.startswith(b"<svg") or (stripped.startswith(b"<?xml") and b"<svg" in head[:SNIFF_BYTES].lower()):
+        return "image/svg+xml"
+    return None
+
+
+def looks_like_html(head: bytes) -> bool:
+    start = head.lstrip()[:SNIFF_BYTES].lower()
+    return any(start.startswith(marker) for marker in _HTML_MARKERS) or b"<html" in start
+
+
+class AdmissionPolicy:
+    def __init__(self, max_bytes: int = 50 * 1024 * 1024, allowed_types: Tuple[str, ...] = DEFAULT_ALLOWED):
+        """
+        Args:
+            max_bytes: Largest body accepted (declared or actual)
+            allowed_types: MIME types or prefixes ("image/") worth keeping
+        """
+        self.max_bytes = max_bytes
+        self.allowed_types = allowed_types
+
+    def _allowed(self, mime: str) -> bool:
+        return any(mime.startswith(t) for t in self.allowed_types)
+
+    def check_headers(self, headers) -> Optional[str]:
+        """Reason to reject before reading any body, or None."""
+        content_type = (headers.get("content-type") or "").split(";")[0].strip().lower()
+        if content_type in ("text/html", "application/xhtml+xml"):
+            return f"content-type {content_type}"
+        length = headers.get("content-length")
+        if length and length.isdigit() and int(length) > self.max_bytes:
+            return f"content-length {length} exceeds {self.max_bytes}"
+        return None
+
+    def check_head(self, head: bytes, declared_type: str = "") -> Optional[str]:
+        """Reason to reject from the first bytes, or None."""
+        if looks_like_html(head):
+            return "body is HTML"
+        sniffed = sniff(head)
+        if sniffed:
+            return None if self._allowed(sniffed) else f"sniffed type {sniffed}"
+        declared = (declared_type or "").split(";")[0].strip().lower()
+        if declared and self._allowed(declared) and not declared.startswith("text/"):
+            return None
+        return f"unrecognised content (declared {declared or 'none'})"
+
+    def admit_stream(self, chunks: Iterable[bytes], declared_type: str = "") -> Iterator[bytes]:
+        """
+        Pass chunks through once the first SNIFF_BYTES pass check_head(),
+        raising AdmissionRejected as soon as a check fails or the size cap is hit,
+        or at the end if the body was empty.
+        Holds at most one chunk plus the sniff window in memory.
+        """
+        head = b""
+        total = 0
+        admitted = False
+        for chunk in chunks:
+            if not chunk:
+                continue
+            total += len(chunk)
+            if total > self.max_bytes:
+                raise AdmissionRejected(f"body exceeds {self.max_bytes} bytes")
+            if admitted:
+                yield chunk
+                continue
+            head += chunk
+            if len(head) < SNIFF_BYTES:
+                continue
+            reason = self.check_head(head, declared_type)
+            if reason:
+                raise AdmissionRejected(reason)
+            admitted = True
+            yield head
+
+        if not total:
+            raise AdmissionRejected("empty body")
+        if not admitted:
+            reason = self.check_head(head, declared_type)
+            if reason:
+                raise AdmissionRejected(reason)
+            yield head
@@ -1,59 +1,93 @@
 # harvesting/media_downloader.py
 """
 Downloads media assets (images, PDFs, videos) found during harvest.
-Saves to organized domain-based folders.
+Saves into a content-addressed store (see media_store.py), so identical
+bytes are kept once however many URLs serve them.
+Assets of a page are fetched concurrently, with a per-host connection limit
+and an optional global bandwidth cap shared by all workers.
 """
 
 import logging
 import mimetypes
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Tuple
-from urllib.parse import urljoin, urlparse
+from typing import Dict, List, Optional, Tuple, Union
+from urllib.parse import urlparse
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException
 
+from http_cache import HttpCache
+from media_admission import AdmissionPolicy, AdmissionRejected
+from media_store import ContentStore
+from parsed_page import ParsedPage
+from politeness import TokenBucket
+
 logger = logging.getLogger(__name__)
 
 class MediaDownloader:
-    def __init__(self, base_dir: str = "data/media"):
+    def __init__(
+        self,
+        base_dir: str = "data/media",
+        max_workers: int = 8,
+        per_host_limit: int = 2,
+        max_bytes_per_sec: Optional[float] = None,
+        http_cache: Optional[HttpCache] = None,
+        admission: Optional[AdmissionPolicy] = None
+    ):
+        """
+        Args:
+            base_dir: Root folder for downloaded media
+            max_workers: Assets fetched in parallel per page (1 = sequential)
+            per_host_limit: Simultaneous connections to any one host
+            max_bytes_per_sec: Global bandwidth cap across all workers (None = unlimited)
+            http_cache: Validator cache for revalidating stored assets
+                        (default: <base_dir>/http_cache.sqlite3)
+            admission: Size/type checks applied while streaming (default: 50 MB cap)
+        """
         self.base_dir = Path(base_dir)
         self.base_dir.mkdir(parents=True, exist_ok=True)
+        self.store = ContentStore(self.base_dir)
+        self.http_cache = http_cache or HttpCache(self.base_dir / "http_cache.sqlite3")
+        self.admission = admission or AdmissionPolicy()
+        self.max_workers = max(1, max_workers)
+        self.per_host_limit = max(1, per_host_limit)
+        self.bandwidth = TokenBucket(max_bytes_per_sec, burst=max_bytes_per_sec) if max_bytes_per_sec else None
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_lock = threading.Lock()
+
         self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
         self.session.headers.update({
             "User-Agent": "Artemis-Media-Downloader/1.0"
         })
 
-    def download_from_html(self, html: str, page_url: str) -> List[Tuple[str, Path]]:
+    def download_from_html(self, html: Union[str, ParsedPage], page_url: str) -> List[Tuple[str, Path]]:
         """
-        Find & download images, PDFs, etc. from HTML content.
-        Returns list of (original_url, saved_path) tuples.
+        Find & download images, PDFs, etc. from HTML content (raw or already parsed).
+        Returns list of (original_url, saved_path) tuples in page order.
         """
-        from bs4 import BeautifulSoup
-
-        soup = BeautifulSoup(html, "lxml")
-        downloaded = []
-
-        # Images
-        for img in soup.find_all("img"):
-            src = img.get("src") or img.get("data-src") or img.get("data-lazy-src")
-            if not src:
-                continue
-            full_url = urljoin(page_url, src)
-            path = self._download_asset(full_url, page_url)
-            if path:
-                downloaded.append((full_url, path))
-
-        # PDFs & other documents
-        for a in soup.find_all("a", href=True):
-            href = a["href"]
-            if href.lower().endswith((".pdf", ".doc", ".docx")):
-                full_url = urljoin(page_url, href)
-                path = self._download_asset(full_url, page_url)
-                if path:
-                    downloaded.append((full_url, path))
-
-        return downloaded
+        urls = ParsedPage.of(html, page_url).media
+        if self.max_workers == 1 or len(urls) < 2:
+            paths = [self._fetch(url, page_url) for url in urls]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls))) as pool:
+                paths = list(pool.map(lambda url: self._fetch(url, page_url), urls))
+
+        return [(url, path) for url, path in zip(urls, paths) if path]
+
+    def _fetch(self, url: str, referer: str) -> Optional[Path]:
+        """Download one asset while holding a connection slot for its host."""
+        host = urlparse(url).netloc
+        with self._host_lock:
+            slot = self._host_slots.setdefault(host, threading.BoundedSemaphore(self.per_host_limit))
+        with slot:
+            return self._download_asset(url, referer)
 
     def _download_asset(self, url: str, referer: str) -> Optional[Path]:
         """Download single asset with safety checks."""
@@ -62,34 +96,51 @@ class MediaDownloader:
             if not parsed.scheme in ("http", "https"):
                 return None
 
-            ext = mimetypes.guess_extension(parsed.path) or ".bin"
+            ext = Path(parsed.path).suffix.lower()
             if ext in (".html", ".htm", ".php", ".asp"):
                 return None  # avoid downloading pages
 
-            domain = urlparse(referer).netloc.replace(".", "_")
-            filename = Path(parsed.path).name or f"asset_{hash(url):x}{ext}"
-            save_dir = self.base_dir / domain
-            save_dir.mkdir(exist_ok=True)
-            save_path = save_dir / filename
-
-            if save_path.exists():
-                logger.debug("Already downloaded: %s", save_path)
-                return save_path
-
-            with self.session.get(url, timeout=12, stream=True, headers={"Referer": referer}) as r:
+            # Known asset: reuse while fresh, otherwise revalidate with its validators.
+            # Assets stored before validators were recorded are reused as-is.
+            stored = self.store.lookup(url)
+            entry = self.http_cache.get(url) if stored else None
+            if stored and (entry is None or self.http_cache.is_fresh(entry)):
+                logger.debug("Already downloaded: %s", stored)
+                self.http_cache.record("hits")
+                return stored
+
+            headers = {"Referer": referer}
+            headers.update(self.http_cache.conditional_headers(entry))
+            with self.session.get(url, timeout=12, stream=True, headers=headers) as r:
+                if r.status_code == 304 and stored:
+                    self.http_cache.touch(url, r.headers)
+                    self.http_cache.record("revalidated")
+                    logger.debug("Not modified: %s", url)
+                    return stored
                 r.raise_for_status()
+                self.http_cache.record("misses")
                 content_type = r.headers.get("content-type", "")
-                if "html" in content_type or "text" in content_type and len(r.content) < 50000:
-                    logger.warning("Skipping suspicious content-type: %s", content_type)
+                reason = self.admission.check_headers(r.headers)
+                if reason:
+                    logger.warning("Skipping %s: %s", url, reason)
                     return None
 
-                with open(save_path, "wb") as f:
-                    for chunk in r.iter_content(chunk_size=8192):
-                        f.write(chunk)
+                # Streams into a temp file; a rejected body is discarded on exit.
+                with self.store.writer() as blob:
+                    for chunk in self.admission.admit_stream(r.iter_content(chunk_size=8192), content_type):
+                        blob.write(chunk)
+                        if self.bandwidth:
+                            time.sleep(self.bandwidth.consume(len(chunk)))
+                    ext = ext or mimetypes.guess_extension(content_type.split(";")[0].strip()) or ".bin"
+                    save_path = blob.commit(url, content_type, ext)
+                self.http_cache.store(url, r.headers)
 
             logger.info("Downloaded media: %s → %s", url, save_path)
             return save_path
 
+        except AdmissionRejected as e:
+            logger.warning("Skipping %s: %s", url, e)
+            return None
         except RequestException as e:
             logger.warning("Media download failed %s: %s", url, e)
             return None
@@ -0,0 +1,144 @@
+# harvesting/media_store.py
+"""
+Content-addressed store for harvested media.
+Bytes live once under objects/<aa>/<bb>/<sha256><ext>; a small SQLite index
+maps every URL to the digest it served, so the same file fetched from many
+URLs or domains takes disk space once, and a known URL is never fetched again.
+Object paths are rebuilt from digest + ext, so the store works from any cwd.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+class PendingObject:
+    """
+    A blob being written. Bytes are hashed as they stream into a temp file;
+    commit() moves the file into place (or drops it if the content is known).
+    Used as a context manager, an uncommitted write is discarded on exit.
+    """
+
+    def __init__(self, store: "ContentStore", tmp_path: Path):
+        self.store = store
+        self.tmp_path = tmp_path
+        self.size = 0
+        self._hash = hashlib.sha256()
+        self._file = open(tmp_path, "wb")
+        self._done = False
+
+    def write(self, chunk: bytes):
+        self._file.write(chunk)
+        self._hash.update(chunk)
+        self.size += len(chunk)
+
+    def commit(self, url: str, content_type: str = None, ext: str = "") -> Path:
+        """Store the blob and index `url` against it. Returns the object path."""
+        self._file.close()
+        self._done = True
+        return self.store._commit(self.tmp_path, self._hash.hexdigest(), self.size, url, content_type, ext)
+
+    def discard(self):
+        if not self._done:
+            self._file.close()
+            self._done = True
+            self.tmp_path.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.discard()
+
+
+class ContentStore:
+    """Thread-safe content-addressed blob store with a URL → digest index."""
+
+    def __init__(self, base_dir: Union[str, Path] = "data/media"):
+        self.base_dir = Path(base_dir)
+        self.objects_dir = self.base_dir / "objects"
+        self.tmp_dir = self.base_dir / "tmp"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.base_dir / "index.sqlite3", check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS objects (
+                digest TEXT PRIMARY KEY,
+                ext TEXT NOT NULL DEFAULT '',
+                size INTEGER NOT NULL,
+                content_type TEXT
+            );
+            CREATE TABLE IF NOT EXISTS urls (
+                url TEXT PRIMARY KEY,
+                digest TEXT NOT NULL REFERENCES objects(digest),
+                fetched_at REAL NOT NULL
+            );
+        """)
+        self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def object_path(self, digest: str, ext: str = "") -> Path:
+        return self.objects_dir / digest[:2] / digest[2:4] / f"{digest}{ext}"
+
+    def lookup(self, url: str) -> Optional[Path]:
+        """Path of the blob `url` last served, if it is still on disk."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT o.digest, o.ext FROM urls u JOIN objects o ON o.digest = u.digest WHERE u.url = ?", (url,)
+            ).fetchone()
+        if row:
+            path = self.object_path(*row)
+            if path.exists():
+                return path
+        return None
+
+    def digest_for(self, url: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute("SELECT digest FROM urls WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else None
+
+    def writer(self) -> PendingObject:
+        return PendingObject(self, self.tmp_dir / f"{uuid.uuid4().hex}.part")
+
+    def _commit(self, tmp_path: Path, digest: str, size: int, url: str, content_type: str, ext: str) -> Path:
+        with self._lock:
+            row = self._db.execute("SELECT ext FROM objects WHERE digest = ?", (digest,)).fetchone()
+            if row and self.object_path(digest, row[0]).exists():
+                tmp_path.unlink(missing_ok=True)
+                path = self.object_path(digest, row[0])
+                logger.debug("Duplicate content %s for %s", digest[:12], url)
+            else:
+                path = self.object_path(digest, ext)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(tmp_path, path)
+                self._db.execute(
+                    "INSERT OR REPLACE INTO objects (digest, ext, size, content_type) VALUES (?, ?, ?, ?)",
+                    (digest, ext, size, content_type)
+                )
+            self._db.execute(
+                "INSERT OR REPLACE INTO urls (url, digest, fetched_at) VALUES (?, ?, ?)",
+                (url, digest, time.time())
+            )
+            self._db.commit()
+        return path
+
+    def stats(self) -> Dict[str, int]:
+        """URLs indexed, distinct objects and bytes on disk."""
+        with self._lock:
+            urls = self._db.execute("SELECT COUNT(*) FROM urls").fetchone()[0]
+            objects, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM objects").fetchone()
+        return {"urls": urls, "objects": objects, "bytes": size}
@@ -0,0 +1,148 @@
+# harvesting/near_dup.py
+"""
+Near-duplicate page detection.
+A 64-bit SimHash of word shingles from the cleaned text is looked up in an
+LSH index of 4 bands × 16 bits: any two signatures within Hamming distance 3
+share at least one band exactly, so a lookup is four indexed probes plus a
+popcount on the few candidates. The index lives in SQLite (":memory:" by
+default), is updated one page at a time, and can be shared by processes.
+"""
+
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+BANDS = 4
+BAND_BITS = 16
+_BAND_MASK = (1 << BAND_BITS) - 1
+_WORD = re.compile(r"\w+")
+
+
+def _shingle_hash(shingle: str) -> int:
+    return int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def simhash(text: str, shingle_size: int = 3) -> int:
+    """64-bit SimHash over lowercased word shingles of `text`."""
+    words = _WORD.findall(text.lower())
+    if len(words) >= shingle_size:
+        shingles = [" ".join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1)]
+    else:
+        shingles = [" ".join(words)] if words else []
+    if not shingles:
+        return 0
+
+    # Bit i is set when most shingle hashes have it set; counting per column of
+    # the bit strings keeps the 64 x shingles work inside C loops.
+    rows = [format(_shingle_hash(shingle), "064b") for shingle in shingles]
+    half = len(rows) / 2
+    signature = 0
+    for position, column in enumerate(zip(*rows)):
+        if column.count("1") > half:
+            signature |= 1 << (63 - position)
+    return signature
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def bands(signature: int) -> List[int]:
+    return [(signature >> (band * BAND_BITS)) & _BAND_MASK for band in range(BANDS)]
+
+
+def _to_sql(signature: int) -> int:
+    """SQLite integers are signed 64-bit."""
+    return signature - (1 << 64) if signature >= 1 << 63 else signature
+
+
+class NearDupIndex:
+    def __init__(self, path: Union[str, Path] = ":memory:", max_distance: int = 3, min_words: int = 30):
+        """
+        Args:
+            path: SQLite file for the index (":memory:" = this process only)
+            max_distance: Largest Hamming distance counted as a near duplicate (<= 3 for 4 bands)
+            min_words: Pages with fewer words are never matched – SimHash on a
+                       handful of words flags unrelated short pages
+        """
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.max_distance = min(max_distance, BANDS - 1)
+        self.min_words = min_words
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS pages (url TEXT PRIMARY KEY, signature INTEGER NOT NULL);
+            CREATE TABLE IF NOT EXISTS bands (
+                band INTEGER NOT NULL,
+                value INTEGER NOT NULL,
+                url TEXT NOT NULL,
+                PRIMARY KEY (band, value, url)
+            ) WITHOUT ROWID;
+        """)
+        self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def find(self, signature: int, exclude_url: Optional[str] = None) -> Optional[Tuple[str, int]]:
+        """Closest indexed (url, distance) within max_distance of `signature`, or None."""
+        probes = " OR ".join("(b.band = ? AND b.value = ?)" for _ in range(BANDS))
+        params = [p for band, value in enumerate(bands(signature)) for p in (band, value)]
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT DISTINCT p.url, p.signature FROM bands b JOIN pages p ON p.url = b.url WHERE {probes}",
+                params
+            ).fetchall()
+
+        best = None
+        for url, stored in rows:
+            if url == exclude_url:
+                continue
+            distance = hamming(signature, stored & ((1 << 64) - 1))
+            if distance <= self.max_distance and (best is None or distance < best[1]):
+                best = (url, distance)
+        return best
+
+    def add(self, url: str, signature: int):
+        """Index `url` (replacing any earlier signature for it)."""
+        with self._lock:
+            old = self._db.execute("SELECT signature FROM pages WHERE url = ?", (url,)).fetchone()
+            if old:
+                self._db.executemany(
+                    "DELETE FROM bands WHERE band = ? AND value = ? AND url = ?",
+                    [(band, value, url) for band, value in enumerate(bands(old[0] & ((1 << 64) - 1)))]
+                )
+            self._db.execute("INSERT OR REPLACE INTO pages (url, signature) VALUES (?, ?)", (url, _to_sql(signature)))
+            self._db.executemany(
+                "INSERT OR IGNORE INTO bands (band, value, url) VALUES (?, ?, ?)",
+                [(band, value, url) for band, value in enumerate(bands(signature))]
+            )
+            self._db.commit()
+
+    def check(self, url: str, text: str) -> Optional[str]:
+        """
+        URL of an indexed near duplicate of `text`, or None. Pages that are not
+        duplicates are added to the index, so the first copy seen stays canonical.
+        """
+        if len(_WORD.findall(text)) < self.min_words:
+            return None
+        signature = simhash(text)
+        match = self.find(signature, exclude_url=url)
+        if match:
+            logger.debug("Near duplicate: %s ~ %s (distance %d)", url, match[0], match[1])
+            return match[0]
+        self.add(url, signature)
+        return None
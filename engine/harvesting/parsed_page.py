@@ -0,0 +1,131 @@
+# harvesting/parsed_page.py
+"""
+One parse per harvested page.
+ParsedPage parses the HTML once with lxml.html and computes each extraction
+view (text, links, media, meta, forms) lazily on first access, so the
+analyzer, media downloader and basic harvest share a single tree. No view
+mutates the tree.
+"""
+
+from functools import cached_property
+from typing import Dict, List, Optional, Union
+from urllib.parse import urljoin
+
+import lxml.html
+from lxml import etree
+
+# Elements whose text is boilerplate rather than page content
+BOILERPLATE_TAGS = frozenset({"script", "style", "noscript", "header", "footer", "nav", "template"})
+
+DOCUMENT_EXTENSIONS = (".pdf", ".doc", ".docx")
+
+
+class ParsedPage:
+    def __init__(self, html: Union[str, bytes], url: str = ""):
+        """
+        Args:
+            html: Page markup (str or raw bytes)
+            url: Page URL, used to resolve relative links
+        """
+        self.html = html
+        self.url = url
+
+    @classmethod
+    def of(cls, page: Union["ParsedPage", str, bytes], url: str = "") -> "ParsedPage":
+        """Pass a ParsedPage through unchanged; parse raw markup."""
+        return page if isinstance(page, cls) else cls(page, url)
+
+    @cached_property
+    def root(self):
+        try:
+            return lxml.html.document_fromstring(self.html)
+        except ValueError:
+            # str with an XML encoding declaration – let lxml decode the bytes
+            return lxml.html.document_fromstring(self.html.encode("utf-8"))
+        except etree.ParserError:
+            return lxml.html.document_fromstring("<html><body></body></html>")
+
+    def _absolute(self, href: str) -> str:
+        return urljoin(self.url, href.strip()) if self.url else href.strip()
+
+    @cached_property
+    def title(self) -> Optional[str]:
+        title = self.root.findtext(".//title")
+        return title.strip() if title and title.strip() else None
+
+    @cached_property
+    def text(self) -> str:
+        """Visible text without scripts, styles and navigation boilerplate, whitespace collapsed."""
+        parts: List[str] = []
+        stack: list = [self.root]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                parts.append(node)
+                continue
+            if not isinstance(node.tag, str) or node.tag.lower() in BOILERPLATE_TAGS:
+                continue  # comments, processing instructions, boilerplate (tails are pushed by the parent)
+            if node.text:
+                parts.append(node.text)
+            for child in reversed(node):
+                if child.tail:
+                    stack.append(child.tail)
+                stack.append(child)
+        return " ".join(" ".join(parts).split())
+
+    @cached_property
+    def links(self) -> List[str]:
+        """Absolute http(s) link targets, de-duplicated, in page order."""
+        found = []
+        for href in self.root.xpath("//a/@href"):
+            absolute = self._absolute(href)
+            if absolute.startswith(("http://", "https://")):
+                found.append(absolute)
+        return list(dict.fromkeys(found))
+
+    @cached_property
+    def emails(self) -> List[str]:
+        found = [href.strip()[len("mailto:"):].split("?")[0].strip()
+                 for href in self.root.xpath("//a/@href") if href.strip().lower().startswith("mailto:")]
+        return list(dict.fromkeys(e for e in found if e))
+
+    @cached_property
+    def media(self) -> List[str]:
+        """Absolute URLs of images and document links, de-duplicated, in page order."""
+        found = []
+        for img in self.root.iter("img"):
+            src = img.get("src") or img.get("data-src") or img.get("data-lazy-src")
+            if src:
+                found.append(self._absolute(src))
+        for href in self.root.xpath("//a/@href"):
+            if href.strip().lower().endswith(DOCUMENT_EXTENSIONS):
+                found.append(self._absolute(href))
+        return list(dict.fromkeys(found))
+
+    @cached_property
+    def meta(self) -> Dict[str, str]:
+        """<meta name|property=... content=...> pairs, keys lowercased, first occurrence wins."""
+        meta: Dict[str, str] = {}
+        for tag in self.root.iter("meta"):
+            key = tag.get("name") or tag.get("property")
+            content = tag.get("content")
+            if key and content is not None:
+                meta.setdefault(key.strip().lower(), content.strip())
+        return meta
+
+    @cached_property
+    def forms(self) -> List[Dict[str, object]]:
+        """Forms with their action (absolute), lowercased method and named inputs."""
+        forms = []
+        for form in self.root.iter("form"):
+            action = form.get("action")
+            forms.append({
+                "action": self._absolute(action) if action is not None else None,
+                "method": (form.get("method") or "get").strip().lower(),
+                "inputs": [el.get("name") for el in form.iter("input", "textarea", "select") if el.get("name")],
+            })
+        return forms
+
+    @property
+    def has_post_form(self) -> bool:
+        return any(f["method"] == "post" and f["action"] is not None for f in self.forms)
@@ -0,0 +1,194 @@
+# harvesting/politeness.py
+"""
+Per-domain politeness for concurrent harvesting.
+A token bucket per host limits request rate, a counter caps concurrent work
+per host, and Retry-After responses push a host's next slot into the future.
+"""
+
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Iterable, Optional
+from urllib.parse import urlparse
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """
+    Convert a Retry-After header (delta-seconds or HTTP-date) into seconds to wait.
+    Returns None if the value is missing or unparseable.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when - (time.time() if now is None else now))
+
+
+def domain_of(url: str) -> str:
+    """Host part of a URL, lowercased, without port."""
+    return (urlparse(url).hostname or "").lower()
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, holding at most `burst`.
+    """
+
+    def __init__(self, rate: float, burst: float = 1.0, clock: Callable[[], float] = time.monotonic):
+        if rate <= 0:
+            raise ValueError("Rate must be positive")
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self._clock = clock
+        self._tokens = self.burst
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Take `tokens` if available right now."""
+        with self._lock:
+            self._refill(self._clock())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def wait_time(self, tokens: float = 1.0) -> float:
+        """Seconds until `tokens` could be taken (0 if available now)."""
+        with self._lock:
+            self._refill(self._clock())
+            return max(0.0, (min(tokens, self.burst) - self._tokens) / self.rate)
+
+    def consume(self, tokens: float) -> float:
+        """
+        Take `tokens` unconditionally, going into debt if needed.
+        Returns how long the caller should sleep to honour the rate.
+        Used for byte budgets where the amount is only known after the fact.
+        """
+        with self._lock:
+            self._refill(self._clock())
+            self._tokens -= tokens
+            return max(0.0, -self._tokens / self.rate)
+
+    @property
+    def is_full(self) -> bool:
+        with self._lock:
+            self._refill(self._clock())
+            return self._tokens >= self.burst
+
+
+class _DomainState:
+    __slots__ = ("bucket", "active", "blocked_until")
+
+    def __init__(self, bucket: TokenBucket):
+        self.bucket = bucket
+        self.active = 0
+        self.blocked_until = 0.0
+
+
+class DomainPoliteness:
+    """
+    Tracks rate, concurrency and back-off per host.
+
+    acquire() reserves a slot for a URL if its host is eligible now; every
+    successful acquire() must be paired with release() when the work ends.
+    """
+
+    MAX_IDLE_DOMAINS = 10000
+
+    def __init__(
+        self,
+        delay: float = 1.0,
+        burst: float = 1.0,
+        max_concurrent: int = 1,
+        blocked_domains: Iterable[str] = (),
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            delay: Seconds between starts on the same host (1/rate)
+            burst: Starts allowed back-to-back after an idle period
+            max_concurrent: Simultaneous jobs allowed per host
+            blocked_domains: Hosts (and their subdomains) never to harvest
+        """
+        self.rate = 1.0 / delay if delay > 0 else float("inf")
+        self.burst = burst
+        self.max_concurrent = max_concurrent
+        self.blocked_domains = {d.lower() for d in blocked_domains}
+        self._clock = clock
+        self._domains: Dict[str, _DomainState] = {}
+        self._lock = threading.Lock()
+
+    def _state(self, domain: str) -> _DomainState:
+        state = self._domains.get(domain)
+        if state is None:
+            if len(self._domains) >= self.MAX_IDLE_DOMAINS:
+                self._prune()
+            rate = self.rate if self.rate != float("inf") else 1e9
+            state = self._domains[domain] = _DomainState(TokenBucket(rate, self.burst, self._clock))
+        return state
+
+    def _prune(self):
+        """Forget hosts with no active work, no back-off and a full bucket."""
+        now = self._clock()
+        idle = [d for d, s in self._domains.items()
+                if s.active == 0 and s.blocked_until <= now and s.bucket.is_full]
+        for d in idle:
+            del self._domains[d]
+
+    def is_blocked(self, url: str) -> bool:
+        host = domain_of(url)
+        return any(host == d or host.endswith("." + d) for d in self.blocked_domains)
+
+    def acquire(self, url: str) -> bool:
+        """Reserve a slot for `url` if its host is eligible now."""
+        with self._lock:
+            state = self._state(domain_of(url))
+            if state.active >= self.max_concurrent or state.blocked_until > self._clock():
+                return False
+            if not state.bucket.try_acquire():
+                return False
+            state.active += 1
+            return True
+
+    def release(self, url: str):
+        with self._lock:
+            state = self._domains.get(domain_of(url))
+            if state and state.active > 0:
+                state.active -= 1
+
+    def defer(self, url: str, retry_after: Optional[str]):
+        """Honour a Retry-After value for the URL's host."""
+        seconds = parse_retry_after(retry_after)
+        if seconds is None:
+            return
+        with self._lock:
+            state = self._state(domain_of(url))
+            state.blocked_until = max(state.blocked_until, self._clock() + seconds)
+
+    def next_ready_in(self, urls: Iterable[str]) -> float:
+        """
+        Seconds until at least one of `urls` might become eligible.
+        Hosts at their concurrency cap only free up when work finishes,
+        so they are ignored here.
+        """
+        now = self._clock()
+        waits = []
+        with self._lock:
+            for url in urls:
+                state = self._domains.get(domain_of(url))
+                if state is None:
+                    return 0.0
+                if state.active >= self.max_concurrent:
+                    continue
+                waits.append(max(state.blocked_until - now, state.bucket.wait_time()))
+        return min(waits) if waits else float("inf")
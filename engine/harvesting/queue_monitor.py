@@ -52,11 +52,17 @@ def main():
     parser = argparse.ArgumentParser(description="Artemis Harvest Queue Monitor")
     parser.add_argument("--stats", action="store_true", help="Show queue statistics")
     parser.add_argument("--top", type=int, default=10, help="Show top N jobs by priority")
+    parser.add_argument("--reap", action="store_true", help="Requeue jobs whose lease has expired")
+    parser.add_argument("--max-retries", type=int, default=3, help="Reaped jobs past this many retries are failed")
     args = parser.parse_args()
 
     config = get_config()
     manager = ArtemisWorkload(config['db'])
 
+    if args.reap:
+        reaped = manager.reap_expired_leases(max_retries=args.max_retries)
+        print(f"Reaped leases: {reaped['requeued']} requeued, {reaped['failed']} failed")
+
     if args.stats:
         show_stats(manager)
 
@@ -0,0 +1,119 @@
+# harvesting/seen_filter.py
+"""
+Probabilistic seen-URL set (Bloom filter) kept in front of web_map inserts.
+Membership answers are "definitely new" or "probably seen"; a false positive
+drops a new URL, so size the filter for the expected URL count.
+"""
+
+import hashlib
+import math
+import os
+import struct
+from pathlib import Path
+from typing import Iterable, Tuple, Union
+
+_MAGIC = b"ARTBLM1\0"
+_HEADER = struct.Struct("<8sQQQ")  # magic, bit count, hash count, items added
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter using double hashing over a single blake2b digest.
+
+    Concurrent add() calls from several threads may occasionally lose a bit;
+    that only turns a later lookup into a miss (one extra INSERT), never into
+    a false positive.
+    """
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.01):
+        """
+        Args:
+            capacity: Expected number of distinct URLs
+            error_rate: Target false-positive rate at capacity (0 < p < 1)
+        """
+        if capacity < 1:
+            raise ValueError("Capacity must be at least 1")
+        if not 0 < error_rate < 1:
+            raise ValueError("Error rate must be between 0 and 1")
+
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1, h2 = struct.unpack("<QQ", digest)
+        h2 |= 1  # odd step so positions never collapse onto one bit
+        m = self.num_bits
+        return ((h1 + i * h2) % m for i in range(self.num_hashes))
+
+    def add(self, item: str) -> None:
+        bits = self._bits
+        for pos in self._positions(item):
+            bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def update(self, items: Iterable[str]) -> None:
+        for item in items:
+            self.add(item)
+
+    def __contains__(self, item: str) -> bool:
+        bits = self._bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def __len__(self) -> int:
+        """Number of add() calls (not distinct items)."""
+        return self.count
+
+    @property
+    def estimated_error_rate(self) -> float:
+        """False-positive rate expected at the current fill level."""
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Write the filter to disk atomically (temp file + rename)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, self.num_bits, self.num_hashes, self.count))
+            f.write(self._bits)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "BloomFilter":
+        with open(path, "rb") as f:
+            magic, num_bits, num_hashes, count = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != _MAGIC:
+                raise ValueError(f"Not a Bloom filter file: {path}")
+            bits = bytearray(f.read())
+        if len(bits) != (num_bits + 7) // 8:
+            raise ValueError(f"Truncated Bloom filter file: {path}")
+
+        bf = cls.__new__(cls)
+        bf.num_bits = num_bits
+        bf.num_hashes = num_hashes
+        bf.count = count
+        # Recover the sizing parameters the file was built with
+        bf.capacity = max(1, round(num_bits * math.log(2) / num_hashes))
+        bf.error_rate = math.exp(-num_bits * (math.log(2) ** 2) / bf.capacity)
+        bf._bits = bits
+        return bf
+
+    @classmethod
+    def load_or_create(
+        cls,
+        path: Union[str, Path],
+        capacity: int = 1_000_000,
+        error_rate: float = 0.01
+    ) -> Tuple["BloomFilter", bool]:
+        """
+        Load a saved filter from `path`, or build an empty one if none exists.
+        Returns (filter, loaded) so callers know whether it still needs warming.
+        """
+        if Path(path).exists():
+            return cls.load(path), True
+        return cls(capacity, error_rate), False
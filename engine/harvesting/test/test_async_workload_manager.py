@@ -0,0 +1,108 @@
+# harvesting/test/test_async_workload_manager.py
+import asyncio
+import datetime as dt
+
+import pytest
+
+asyncpg = pytest.importorskip("asyncpg")
+
+from async_workload_manager import AsyncArtemisWorkload
+
+
+class FakeConnection:
+    """asyncpg connection stand-in: fetch() answers from `respond(query, args)`."""
+
+    def __init__(self, respond):
+        self.respond = respond
+        self.calls = []
+
+    async def fetch(self, query, *args):
+        self.calls.append((query, args))
+        result = self.respond(query, args)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def execute(self, query, *args):
+        self.calls.append((query, args))
+
+    def transaction(self):
+        return _NullContext()
+
+
+class _NullContext:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakePool:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def acquire(self):
+        conn = self.conn
+
+        class _Acquire(_NullContext):
+            async def __aenter__(self):
+                return conn
+
+        return _Acquire()
+
+
+def _manager(respond):
+    manager = AsyncArtemisWorkload()
+    manager.pool = FakePool(FakeConnection(respond))
+    return manager
+
+
+def test_bulk_insert_counts_invalid_duplicate_and_new():
+    existing = {"https://example.com/old"}
+
+    def respond(query, args):
+        return [{"id": i} for i, url in enumerate(args[0]) if url not in existing]
+
+    manager = _manager(respond)
+    urls = ["https://example.com/new", "not a url", "HTTPS://Example.com/new", "https://example.com/old",
+            None, "https://example.org/"]
+    counts = asyncio.run(manager.add_many_to_harvest(urls, chunk_size=2))
+
+    assert counts == {"inserted": 2, "duplicates": 2, "invalid": 2}
+    inserts = [args for query, args in manager.pool.conn.calls if "INSERT INTO web_map" in query]
+    assert [args[0] for args in inserts] == [["https://example.com/new", "https://example.com/old"],
+                                             ["https://example.org/"]]
+    notify = [args for query, args in manager.pool.conn.calls if "pg_notify" in query]
+    assert notify == [("artemis_harvest_queue", "2")]
+
+
+def test_get_next_jobs_restores_priority_order():
+    t0 = dt.datetime(2024, 1, 1)
+    rows = [
+        {"id": 1, "url": "https://a/", "priority_score": 1.0, "source_origin": "x", "retry_count": 0,
+         "discovered_at": t0},
+        {"id": 2, "url": "https://b/", "priority_score": 9.0, "source_origin": "x", "retry_count": 0,
+         "discovered_at": t0 + dt.timedelta(seconds=5)},
+        {"id": 3, "url": "https://c/", "priority_score": 9.0, "source_origin": "x", "retry_count": 0,
+         "discovered_at": t0},
+    ]
+    manager = _manager(lambda query, args: rows)
+    manager.lease_seconds = 120
+    jobs = asyncio.run(manager.get_next_jobs(3))
+
+    assert [job["id"] for job in jobs] == [3, 2, 1]
+    assert all("discovered_at" not in job for job in jobs)
+    assert manager.pool.conn.calls[0][1] == (3, 120.0)
+
+
+def test_ack_reports_per_job_results():
+    manager = _manager(lambda query, args: [{"id": 1}, {"id": 3}])
+    result = asyncio.run(manager.mark_many_complete([(1, 10), (2, 0), (3, 4)]))
+    assert result == {1: True, 2: False, 3: True}
+    assert manager.pool.conn.calls[0][1] == ([1, 2, 3], [10, 0, 4])
+
+
+def test_ack_reports_failure_for_every_job_on_database_error():
+    manager = _manager(lambda query, args: asyncpg.PostgresError("connection lost"))
+    assert asyncio.run(manager.mark_many_failed([(5, "boom"), (6, None)])) == {5: False, 6: False}
@@ -0,0 +1,94 @@
+# harvesting/test/test_content_analyzer.py
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("lxml")
+
+from content_analyzer import ContentAnalyzer, chunk_text
+
+HARVESTING_DIR = Path(__file__).resolve().parent.parent
+
+
+def test_import_loads_no_models_and_downloads_nothing():
+    probe = ("import sys, content_analyzer; "
+             "print(sorted(m for m in ('nltk', 'spacy', 'torch') if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", probe], cwd=HARVESTING_DIR, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
+
+
+def test_chunk_text_covers_text_with_correct_offsets():
+    text = "Alpha beta. Gamma delta epsilon! Zeta eta theta iota kappa lambda mu."
+    chunks = chunk_text(text, 20)
+    assert "".join(chunk for _, chunk in chunks) == text
+    assert all(text[offset:offset + len(chunk)] == chunk and len(chunk) <= 20 for offset, chunk in chunks)
+    assert chunk_text("short", 20) == [(0, "short")]
+
+
+def _page(words):
+    return f"<html><body><p>{' '.join(words)}</p></body></html>"
+
+
+def test_analyze_many_bounds_the_reorder_window_and_shares_near_dups():
+    original = [f"word{i}" for i in range(60)]
+    pages = [(_page(original), "https://a.example/original")]
+    pages += [(_page([f"filler{n}x{i}" for i in range(60)]), f"https://a.example/{n}") for n in range(6)]
+    pages.append((_page(original), "https://b.example/copy"))
+
+    pulled = []
+
+    def feed():
+        for page in pages:
+            pulled.append(page)
+            yield page
+
+    analyzer = ContentAnalyzer()
+    results = []
+    for result in analyzer.analyze_many(feed(), workers=2, chunk_size=1, max_in_flight=2):
+        assert len(pulled) - len(results) <= 2
+        results.append(result)
+
+    assert [r["url"] for r in results] == [url for _, url in pages]
+    assert results[-1]["near_duplicate_of"] == "https://a.example/original"
+    assert all(r["near_duplicate_of"] is None for r in results[:-1])
+
+
+class FakeEnt:
+    def __init__(self, text, label, start_char):
+        self.text, self.label_ = text, label
+        self.start_char, self.end_char = start_char, start_char + len(text)
+
+
+class FakeNlp:
+    """Tags every occurrence of the given words, offsets relative to each piece it is fed."""
+
+    def __init__(self, words):
+        self.words = words
+        self.pieces = []
+
+    def pipe(self, texts, batch_size=None, n_process=None):
+        for text in texts:
+            self.pieces.append(text)
+            yield type("Doc", (), {"ents": [
+                FakeEnt(word, "ORG", i)
+                for word in self.words
+                for i in range(len(text)) if text.startswith(word, i)
+            ]})()
+
+
+def test_entities_in_later_chunks_get_offsets_in_the_full_text(monkeypatch):
+    text = "Acme opened today. " + "Filler words here. " * 10 + "Later Globex bought it."
+    nlp = FakeNlp(["Acme", "Globex"])
+    analyzer = ContentAnalyzer(ner_chunk_chars=60)
+    monkeypatch.setattr(ContentAnalyzer, "nlp", nlp)
+
+    entities = analyzer.extract_entities_many(["short Acme", text])
+
+    assert len(nlp.pieces) > 2  # the long text really was chunked
+    assert entities[0] == [{"text": "Acme", "label": "ORG", "start": 6, "end": 10}]
+    globex = [e for e in entities[1] if e["text"] == "Globex"]
+    assert globex and text[globex[0]["start"]:globex[0]["end"]] == "Globex"
+    assert globex[0]["start"] == text.index("Globex")
+    assert [e["start"] for e in entities[1] if e["text"] == "Acme"] == [0]
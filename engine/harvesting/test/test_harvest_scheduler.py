@@ -0,0 +1,115 @@
+# harvesting/test/test_harvest_scheduler.py
+import asyncio
+import importlib.util
+import shlex
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("psycopg2")
+pytest.importorskip("dotenv")
+
+from politeness import DomainPoliteness
+
+_spec = importlib.util.spec_from_file_location(
+    "harvest_scheduler", Path(__file__).resolve().parent.parent / "harvest-scheduler.py"
+)
+harvest_scheduler = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(harvest_scheduler)
+
+# Sleeps for the number of seconds in the URL's last path segment
+SLEEP_COMMAND = f"{shlex.quote(sys.executable)} -c \"import sys, time; time.sleep(float(sys.argv[1].rsplit('/', 1)[1]))\""
+
+
+class FakeQueue:
+    """In-memory stand-in for ArtemisWorkload's job-queue interface."""
+
+    lease_seconds = 600
+
+    def __init__(self):
+        self.queued = []
+        self.started = {}
+        self.completed = []
+        self._notify = threading.Event()
+        self._lock = threading.Lock()
+
+    def enqueue(self, job_id, url):
+        with self._lock:
+            self.queued.append({"id": job_id, "url": url})
+        self._notify.set()
+
+    def get_next_jobs(self, limit):
+        with self._lock:
+            jobs, self.queued = self.queued[:limit], self.queued[limit:]
+        for job in jobs:
+            self.started[job["id"]] = time.monotonic()
+        return jobs
+
+    def wait_for_work(self, timeout):
+        woken = self._notify.wait(timeout)
+        self._notify.clear()
+        return woken
+
+    def _done(self):
+        future = Future()
+        future.set_result(True)
+        return future
+
+    def complete_later(self, job_id, harvested_count=0):
+        self.completed.append(job_id)
+        return self._done()
+
+    def fail_later(self, job_id, error_message=None):
+        return self._done()
+
+    def release_jobs(self, job_ids):
+        return 0
+
+    def extend_lease(self, job_ids):
+        return 0
+
+    def reap_expired_leases(self):
+        return 0
+
+
+@pytest.mark.parametrize("output, expected", [
+    ('{"stats": {"pages": 7}}', 7),
+    ('{"harvested_count": 3}', 3),
+    ('Harvesting...\n{"harvested_count": 4, "stats": {"pages": 4, "emails": 1}, "reason": null}\n', 4),
+    ('{"harvested": ["a", "b"]}', 2),
+    ('{"stats": [1]}', 0),
+    ('{"pages": true}', 0),
+    ('{"stats": {"pages": false}}', 0),
+    ('[1, 2, 3]', 0),
+    ('crawling...\npages: 12\n', 12),
+    ('', 0),
+])
+def test_parse_harvested_count(output, expected):
+    assert harvest_scheduler.parse_harvested_count(output) == expected
+
+
+def test_free_slots_pick_up_work_enqueued_while_a_job_runs():
+    queue = FakeQueue()
+    queue.enqueue(1, "https://slow.example/3")
+    scheduler = harvest_scheduler.HarvestScheduler(
+        queue, command=SLEEP_COMMAND, concurrency=2, idle_sleep=30, politeness=DomainPoliteness(delay=0)
+    )
+
+    async def scenario():
+        runner = asyncio.create_task(scheduler.run())
+        await asyncio.sleep(0.5)
+        queue.enqueue(2, "https://fast.example/0")
+        enqueued = time.monotonic()
+        while 2 not in queue.completed and time.monotonic() - enqueued < 10:
+            await asyncio.sleep(0.05)
+        scheduler.stop()
+        await runner
+        return enqueued
+
+    enqueued = asyncio.run(scenario())
+    assert queue.started[2] - enqueued < 1.5
+    assert queue.completed.index(2) < queue.completed.index(1)
@@ -0,0 +1,54 @@
+# harvesting/test/test_http_cache.py
+from http_cache import HttpCache, cached_get, freshness_lifetime
+
+
+class FakeResponse:
+    def __init__(self, status_code, content=b"", headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+
+class FakeSession:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, timeout=None, headers=None, **kwargs):
+        self.requests.append(headers or {})
+        return self.responses.pop(0)
+
+
+def test_revalidates_with_etag_and_serves_304_from_cache(tmp_path):
+    cache = HttpCache(tmp_path / "cache.sqlite3")
+    session = FakeSession(
+        FakeResponse(200, b"<html>v1</html>", {"etag": '"abc"', "content-type": "text/html"}),
+        FakeResponse(304, headers={"etag": '"abc"'}),
+    )
+    first = cached_get(session, "https://a.com/", cache)
+    second = cached_get(session, "https://a.com/", cache)
+
+    assert not first.from_cache and second.from_cache
+    assert second.text == "<html>v1</html>"
+    assert session.requests[1]["If-None-Match"] == '"abc"'
+    assert cache.stats() == {"hits": 0, "revalidated": 1, "misses": 1}
+
+
+def test_fresh_entry_skips_network(tmp_path):
+    cache = HttpCache(tmp_path / "cache.sqlite3")
+    session = FakeSession(FakeResponse(200, b"page", {"cache-control": "public, max-age=600"}))
+    cached_get(session, "https://a.com/", cache)
+    assert cached_get(session, "https://a.com/", cache).content == b"page"
+    assert len(session.requests) == 1
+
+
+def test_no_store_is_not_cached(tmp_path):
+    cache = HttpCache(tmp_path / "cache.sqlite3")
+    cache.store("https://a.com/", {"cache-control": "no-store", "etag": '"x"'}, b"secret")
+    assert cache.get("https://a.com/") is None
+
+
+def test_freshness_lifetime():
+    assert freshness_lifetime({"cache-control": "max-age=60"}) == 60
+    assert freshness_lifetime({"cache-control": "no-cache, max-age=60"}) == 0
+    assert freshness_lifetime({}) == 0
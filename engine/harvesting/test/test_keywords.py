@@ -0,0 +1,26 @@
+# harvesting/test/test_keywords.py
+from keywords import KeywordExtractor, tokenize
+
+
+def test_tokenize_drops_stopwords_short_and_numeric_tokens():
+    assert tokenize("The Café was open 24h, and it's GREAT to be at 42 Main") == ["café", "open", "great", "main"]
+
+
+def test_common_terms_rank_below_distinctive_ones():
+    extractor = KeywordExtractor()
+    for i in range(20):
+        extractor.extract(f"music festival tickets page {i}")
+    assert extractor.extract("music festival synthesizer synthesizer", top_n=1) == ["synthesizer"]
+
+
+def test_document_frequencies_persist_incrementally(tmp_path):
+    path = tmp_path / "df.sqlite3"
+    extractor = KeywordExtractor(path, flush_every=2)
+    extractor.extract("alpha beta")
+    extractor.extract("alpha gamma")  # second document triggers a flush
+    reopened = KeywordExtractor(path)
+    assert reopened.doc_count == 2 and reopened.idf("alpha") < reopened.idf("beta")
+
+    extractor.extract("alpha delta")
+    extractor.close()
+    assert KeywordExtractor(path).doc_count == 3
@@ -0,0 +1,57 @@
+# harvesting/test/test_media_admission.py
+import pytest
+
+from media_admission import AdmissionPolicy, AdmissionRejected, sniff
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 1000
+
+
+def _chunks(data, size=100):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+def test_sniff_magic_numbers():
+    assert sniff(PNG) == "image/png"
+    assert sniff(b"%PDF-1.7\n") == "application/pdf"
+    assert sniff(b"RIFF\x00\x00\x00\x00WEBPVP8 ") == "image/webp"
+    assert sniff(b"plain words") is None
+
+
+def test_admits_media_unchanged():
+    policy = AdmissionPolicy()
+    assert b"".join(policy.admit_stream(_chunks(PNG), "image/png")) == PNG
+
+
+def test_html_body_is_rejected_despite_image_content_type():
+    policy = AdmissionPolicy()
+    body = b"<!DOCTYPE html><html><body>login</body></html>"
+    with pytest.raises(AdmissionRejected):
+        list(policy.admit_stream(_chunks(body), "image/png"))
+
+
+def test_oversized_body_aborts_mid_stream():
+    policy = AdmissionPolicy(max_bytes=500)
+    consumed = []
+
+    def source():
+        for chunk in _chunks(PNG * 10):
+            consumed.append(chunk)
+            yield chunk
+
+    with pytest.raises(AdmissionRejected):
+        list(policy.admit_stream(source(), "image/png"))
+    assert len(consumed) == 6  # stopped just past the cap, not at the end
+
+
+@pytest.mark.parametrize("chunks", [[], [b""], [b"", b""]])
+def test_empty_body_is_rejected(chunks):
+    with pytest.raises(AdmissionRejected, match="empty"):
+        list(AdmissionPolicy().admit_stream(iter(chunks), "image/png"))
+
+
+def test_header_checks():
+    policy = AdmissionPolicy(max_bytes=1000)
+    assert policy.check_headers({"content-type": "text/html; charset=utf-8"})
+    assert policy.check_headers({"content-type": "image/png", "content-length": "5000"})
+    assert policy.check_headers({"content-type": "image/png", "content-length": "500"}) is None
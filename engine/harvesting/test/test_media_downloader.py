@@ -0,0 +1,119 @@
+# harvesting/test/test_media_downloader.py
+import threading
+import time
+from collections import Counter
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("lxml")
+
+from media_downloader import MediaDownloader
+
+PNG_MAGIC = b"\x89PNG\r\n\x1a\n"
+
+
+class FakeResponse:
+    def __init__(self, session, url, body):
+        self.session = session
+        self.url = url
+        self.body = body
+        self.status_code = 200
+        self.headers = {"content-type": "image/png", "content-length": str(len(body))}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.session._finish(self.url)
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size=8192):
+        for i in range(0, len(self.body), chunk_size):
+            yield self.body[i:i + chunk_size]
+
+
+class FakeSession:
+    """requests.Session stand-in serving a distinct PNG per URL and tracking concurrency."""
+
+    def __init__(self, delay=0.05, size=64):
+        self.delay = delay
+        self.size = size
+        self.lock = threading.Lock()
+        self.active = Counter()
+        self.max_active = Counter()
+        self.max_total = 0
+
+    @staticmethod
+    def host(url):
+        return url.split("/")[2]
+
+    def body_for(self, url):
+        return PNG_MAGIC + url.encode().ljust(self.size, b"\0")
+
+    def get(self, url, timeout=None, stream=False, headers=None):
+        host = self.host(url)
+        with self.lock:
+            self.active[host] += 1
+            self.max_active[host] = max(self.max_active[host], self.active[host])
+            self.max_total = max(self.max_total, sum(self.active.values()))
+        time.sleep(self.delay)
+        return FakeResponse(self, url, self.body_for(url))
+
+    def _finish(self, url):
+        with self.lock:
+            self.active[self.host(url)] -= 1
+
+
+def _page(urls):
+    return "<html><body>" + "".join(f'<img src="{url}">' for url in urls) + "</body></html>"
+
+
+def _downloader(tmp_path, session, **kwargs):
+    downloader = MediaDownloader(base_dir=str(tmp_path), **kwargs)
+    downloader.session = session
+    return downloader
+
+
+def test_results_in_page_order_with_bounded_concurrency(tmp_path):
+    urls = [f"https://img{n % 3}.example/{n}.png" for n in range(12)]
+    session = FakeSession()
+    downloader = _downloader(tmp_path, session, max_workers=4, per_host_limit=1)
+
+    results = downloader.download_from_html(_page(urls), "https://site.example/")
+
+    assert [url for url, _ in results] == urls
+    assert all(path.read_bytes() == session.body_for(url) for url, path in results)
+    assert session.max_total <= 4
+    assert max(session.max_active.values()) == 1
+    assert downloader.http_cache.stats()["misses"] == 12
+
+
+def test_per_host_limit_caps_one_busy_host(tmp_path):
+    urls = [f"https://cdn.example/{n}.png" for n in range(8)]
+    session = FakeSession()
+    downloader = _downloader(tmp_path, session, max_workers=8, per_host_limit=2)
+
+    assert len(downloader.download_from_html(_page(urls), "https://site.example/")) == 8
+    assert session.max_active["cdn.example"] == 2
+
+
+def test_bandwidth_cap_is_shared_by_workers(tmp_path):
+    urls = [f"https://img{n}.example/{n}.png" for n in range(3)]
+    session = FakeSession(delay=0, size=10_000)
+    downloader = _downloader(tmp_path, session, max_workers=3, max_bytes_per_sec=20_000)
+
+    started = time.monotonic()
+    assert len(downloader.download_from_html(_page(urls), "https://site.example/")) == 3
+    # ~30 kB through a 20 kB/s bucket holding a 20 kB burst: at least ~0.5s
+    assert time.monotonic() - started >= 0.4
+
+
+def test_known_assets_are_counted_as_hits(tmp_path):
+    urls = [f"https://img{n}.example/{n}.png" for n in range(4)]
+    downloader = _downloader(tmp_path, FakeSession(delay=0), max_workers=4)
+    downloader.download_from_html(_page(urls), "https://site.example/")
+    downloader.download_from_html(_page(urls), "https://site.example/")
+    assert downloader.http_cache.stats() == {"hits": 4, "revalidated": 0, "misses": 4}
@@ -0,0 +1,58 @@
+# harvesting/test/test_media_store.py
+import hashlib
+
+from media_store import ContentStore
+
+
+def _store(store, url, data, ext=".png"):
+    with store.writer() as blob:
+        blob.write(data)
+        return blob.commit(url, "image/png", ext)
+
+
+def test_identical_bytes_are_stored_once(tmp_path):
+    store = ContentStore(tmp_path)
+    first = _store(store, "https://a.com/logo.png", b"same-bytes")
+    second = _store(store, "https://cdn.b.org/img/logo.png", b"same-bytes")
+
+    assert first == second
+    assert first.name == hashlib.sha256(b"same-bytes").hexdigest() + ".png"
+    assert store.stats() == {"urls": 2, "objects": 1, "bytes": 10}
+    assert not list(store.tmp_dir.iterdir())
+
+
+def test_same_basename_different_content_do_not_collide(tmp_path):
+    store = ContentStore(tmp_path)
+    a = _store(store, "https://a.com/image.png", b"aaa")
+    b = _store(store, "https://b.com/image.png", b"bbb")
+    assert a != b
+    assert a.read_bytes() == b"aaa" and b.read_bytes() == b"bbb"
+
+
+def test_lookup_by_url(tmp_path):
+    store = ContentStore(tmp_path)
+    path = _store(store, "https://a.com/x.png", b"x")
+    assert store.lookup("https://a.com/x.png") == path
+    assert store.lookup("https://a.com/missing.png") is None
+
+
+def test_uncommitted_write_is_discarded(tmp_path):
+    store = ContentStore(tmp_path)
+    with store.writer() as blob:
+        blob.write(b"partial")
+    assert not list(store.tmp_dir.iterdir())
+    assert store.stats()["objects"] == 0
+
+
+def test_lookup_does_not_depend_on_working_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    store = ContentStore("media")
+    _store(store, "https://a.com/x.png", b"x")
+    store.close()
+
+    elsewhere = tmp_path / "elsewhere"
+    elsewhere.mkdir()
+    monkeypatch.chdir(elsewhere)
+    reopened = ContentStore(tmp_path / "media")
+    path = reopened.lookup("https://a.com/x.png")
+    assert path is not None and path.read_bytes() == b"x"
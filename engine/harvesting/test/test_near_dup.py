@@ -0,0 +1,38 @@
+# harvesting/test/test_near_dup.py
+import random
+
+from near_dup import NearDupIndex, hamming, simhash
+
+random.seed(7)
+VOCAB = [f"word{i}" for i in range(500)]
+
+
+def _page(n=400):
+    return " ".join(random.choice(VOCAB) for _ in range(n))
+
+
+def test_small_edits_keep_simhash_close():
+    text = _page()
+    edited = text.replace(text.split()[10], "tracking", 1) + " page 2 of 9"
+    assert hamming(simhash(text), simhash(edited)) <= 3
+    assert hamming(simhash(text), simhash(_page())) > 10
+
+
+def test_index_flags_near_duplicates_and_keeps_first_copy(tmp_path):
+    index = NearDupIndex(tmp_path / "simhash.sqlite3")
+    text = _page()
+    assert index.check("https://a.com/post", text) is None
+    assert index.check("https://mirror.org/post?utm_source=x", text + " share") == "https://a.com/post"
+    assert index.check("https://a.com/other", _page()) is None
+    assert index.check("https://a.com/post", text) is None  # a re-crawl is not its own duplicate
+    index.close()
+
+    reopened = NearDupIndex(tmp_path / "simhash.sqlite3")
+    assert len(reopened) == 2
+    assert reopened.check("https://copy.net/", text) == "https://a.com/post"
+
+
+def test_short_pages_are_never_matched():
+    index = NearDupIndex(min_words=30)
+    assert index.check("https://a.com/1", "Login to continue") is None
+    assert index.check("https://b.com/1", "Login to continue") is None
@@ -0,0 +1,39 @@
+# harvesting/test/test_parsed_page.py
+import pytest
+
+pytest.importorskip("lxml")
+
+from parsed_page import ParsedPage
+
+HTML = """<?xml version="1.0" encoding="utf-8"?>
+<html><head><title> Demo </title>
+<meta name="Description" content="A page"><style>.x{}</style></head>
+<body><nav>Menu</nav><p>Hello <b>world</b>!</p><script>var x = 1;</script>
+<img src="/a.png"><img data-src="b.jpg"><a href="/doc.PDF">doc</a>
+<a href="mailto:hi@example.com?subject=x">mail</a><a href="https://other.org/">o</a>
+<form action="/contact" method="POST"><input name="email"></form>
+<footer>Footer</footer></body></html>"""
+
+
+def test_views():
+    page = ParsedPage(HTML, "https://site.com/dir/")
+    assert page.title == "Demo"
+    assert page.text == "Demo Hello world ! doc mail o"
+    assert page.meta == {"description": "A page"}
+    assert page.media == ["https://site.com/a.png", "https://site.com/dir/b.jpg", "https://site.com/doc.PDF"]
+    assert page.emails == ["hi@example.com"]
+    assert "https://other.org/" in page.links
+    assert page.forms == [{"action": "https://site.com/contact", "method": "post", "inputs": ["email"]}]
+    assert page.has_post_form
+
+
+def test_views_do_not_mutate_the_tree():
+    page = ParsedPage(HTML, "https://site.com/")
+    page.text
+    assert page.root.find(".//script") is not None
+
+
+def test_of_reuses_parsed_page_and_handles_empty_input():
+    page = ParsedPage("", "https://site.com/")
+    assert ParsedPage.of(page) is page
+    assert page.text == "" and page.media == []
@@ -0,0 +1,61 @@
+# harvesting/test/test_politeness.py
+import pytest
+from politeness import DomainPoliteness, TokenBucket, parse_retry_after
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_refills_at_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, burst=2.0, clock=clock)
+    assert bucket.try_acquire() and bucket.try_acquire()
+    assert not bucket.try_acquire()
+    assert bucket.wait_time() == pytest.approx(0.5)
+    clock.now = 0.5
+    assert bucket.try_acquire()
+
+
+def test_token_bucket_consume_reports_debt():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=100.0, burst=100.0, clock=clock)
+    assert bucket.consume(300) == pytest.approx(2.0)
+
+
+def test_domain_rate_and_concurrency_cap():
+    clock = FakeClock()
+    polite = DomainPoliteness(delay=1.0, max_concurrent=1, clock=clock)
+    assert polite.acquire("https://a.com/1")
+    assert not polite.acquire("https://a.com/2")      # concurrency cap
+    assert polite.acquire("https://b.com/1")          # other hosts unaffected
+    polite.release("https://a.com/1")
+    assert not polite.acquire("https://a.com/2")      # rate limit
+    assert polite.next_ready_in(["https://a.com/2"]) == pytest.approx(1.0)
+    clock.now = 1.0
+    assert polite.acquire("https://a.com/2")
+
+
+def test_retry_after_defers_domain():
+    clock = FakeClock()
+    polite = DomainPoliteness(delay=0.1, clock=clock)
+    polite.defer("https://a.com/", "30")
+    clock.now = 10.0
+    assert not polite.acquire("https://a.com/x")
+    clock.now = 30.0
+    assert polite.acquire("https://a.com/x")
+
+
+def test_blocked_domains_include_subdomains():
+    polite = DomainPoliteness(blocked_domains=["facebook.com"])
+    assert polite.is_blocked("https://www.facebook.com/page")
+    assert not polite.is_blocked("https://notfacebook.com/")
+
+
+def test_parse_retry_after_http_date():
+    assert parse_retry_after("Thu, 01 Jan 1970 00:01:40 GMT", now=40.0) == pytest.approx(60.0)
+    assert parse_retry_after("soon") is None
@@ -0,0 +1,42 @@
+# harvesting/test/test_seen_filter.py
+import pytest
+from seen_filter import BloomFilter
+
+
+def test_added_urls_are_always_found():
+    bf = BloomFilter(capacity=1000, error_rate=0.01)
+    urls = [f"https://example.com/page/{i}" for i in range(1000)]
+    bf.update(urls)
+    assert all(url in bf for url in urls)
+    assert len(bf) == 1000
+
+
+def test_false_positive_rate_near_target():
+    bf = BloomFilter(capacity=5000, error_rate=0.01)
+    bf.update(f"https://seen.example/{i}" for i in range(5000))
+    hits = sum(f"https://new.example/{i}" in bf for i in range(20000))
+    assert hits / 20000 < 0.03
+
+
+def test_save_and_load_roundtrip(tmp_path):
+    bf = BloomFilter(capacity=100, error_rate=0.05)
+    bf.add("https://example.com/")
+    path = tmp_path / "seen.bloom"
+    bf.save(path)
+
+    loaded, was_loaded = BloomFilter.load_or_create(path)
+    assert was_loaded
+    assert "https://example.com/" in loaded
+    assert (loaded.num_bits, loaded.num_hashes, loaded.count) == (bf.num_bits, bf.num_hashes, 1)
+
+
+def test_load_or_create_without_file(tmp_path):
+    bf, was_loaded = BloomFilter.load_or_create(tmp_path / "missing.bloom", capacity=10)
+    assert not was_loaded
+    assert "https://example.com/" not in bf
+
+
+@pytest.mark.parametrize("capacity, error_rate", [(0, 0.01), (10, 0), (10, 1.5)])
+def test_rejects_bad_sizing(capacity, error_rate):
+    with pytest.raises(ValueError):
+        BloomFilter(capacity, error_rate)
@@ -9,6 +9,8 @@ from url_utils import normalize_url  # assume you have this helper
         ("https://other.com", "https://example.com/", "https://other.com/"),
         ("https://example.com/page#fragment", "https://example.com/", "https://example.com/page"),
         ("invalid", "https://example.com/", None),
+        ("HTTPS://Example.COM", None, "https://example.com/"),
+        ("mailto:someone@example.com", "https://example.com/", None),
     ]
 )
 def test_normalize_url(input_url, base, expected):
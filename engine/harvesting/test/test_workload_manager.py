@@ -0,0 +1,329 @@
+# harvesting/test/test_workload_manager.py
+import datetime as dt
+import time
+
+import pytest
+
+pytest.importorskip("psycopg2")
+
+import workload_manager
+from workload_manager import AckBuffer, ArtemisWorkload
+
+KNOWN_URLS = ["https://example.com/", "https://example.org/about"]
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+        self.itersize = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        assert query.strip().startswith("SELECT url FROM web_map")
+
+    def __iter__(self):
+        return iter(self.rows)
+
+
+class FakeConnection:
+    def cursor(self, name=None):
+        return FakeCursor([(url,) for url in KNOWN_URLS])
+
+    def commit(self):
+        pass
+
+
+class FakePool:
+    """Connection pool stand-in that serves web_map's URLs and counts checkouts."""
+
+    def __init__(self, minconn, maxconn, **db_config):
+        self.checkouts = 0
+
+    def getconn(self):
+        self.checkouts += 1
+        return FakeConnection()
+
+    def putconn(self, conn):
+        pass
+
+    def closeall(self):
+        pass
+
+
+@pytest.fixture
+def fake_pool(monkeypatch):
+    monkeypatch.setattr(workload_manager.psycopg2.pool, "ThreadedConnectionPool", FakePool)
+
+
+def seen_filter_config(path, enabled=True):
+    return {
+        'db': {},
+        'seen_filter': {'enabled': enabled, 'capacity': 1000, 'error_rate': 0.01, 'path': str(path)},
+    }
+
+
+def test_from_config_warms_filter_and_skips_known_urls(fake_pool, tmp_path):
+    path = tmp_path / "seen.bloom"
+    manager = ArtemisWorkload.from_config(seen_filter_config(path))
+    assert all(url in manager.seen_filter for url in KNOWN_URLS)
+    checkouts = manager.pool.checkouts
+
+    counts = manager.add_many_to_harvest(KNOWN_URLS)
+    assert counts == {"inserted": 0, "duplicates": 2, "invalid": 0}
+    assert manager.pool.checkouts == checkouts  # answered without touching the database
+
+    manager.close()
+    assert path.exists()
+
+
+def test_from_config_reuses_saved_filter_without_warming(fake_pool, tmp_path):
+    path = tmp_path / "seen.bloom"
+    ArtemisWorkload.from_config(seen_filter_config(path)).close()
+
+    manager = ArtemisWorkload.from_config(seen_filter_config(path))
+    assert manager.pool.checkouts == 0
+    assert KNOWN_URLS[0] in manager.seen_filter
+    manager.close()
+
+
+def test_from_config_without_seen_filter(fake_pool, tmp_path):
+    manager = ArtemisWorkload.from_config(seen_filter_config(tmp_path / "seen.bloom", enabled=False))
+    assert manager.seen_filter is None and manager.pool.checkouts == 0
+    manager.close()
+
+
+class FakeAckTarget:
+    """Records the batches AckBuffer applies; acks for job ids in `missing` report False."""
+
+    def __init__(self, missing=(), fail_first=False):
+        self.batches = []
+        self.missing = set(missing)
+        self.fail_first = fail_first
+
+    def _apply_acks(self, acks):
+        self.batches.append(list(acks))
+        if self.fail_first and len(self.batches) == 1:
+            raise RuntimeError("database went away")
+        return {ack[0]: ack[0] not in self.missing for ack in acks}
+
+
+def test_ack_buffer_flushes_when_full():
+    target = FakeAckTarget(missing={2})
+    acks = AckBuffer(target, max_items=3, flush_ms=60_000)
+    futures = [acks.add(job_id, "complete", 1) for job_id in (1, 2, 3)]
+    assert [f.result(timeout=2) for f in futures] == [True, False, True]
+    assert len(target.batches) == 1
+    acks.close()
+
+
+def test_ack_buffer_flushes_after_interval():
+    target = FakeAckTarget()
+    acks = AckBuffer(target, max_items=100, flush_ms=50)
+    started = time.monotonic()
+    assert acks.add(7, "failed", 0, "boom").result(timeout=2) is True
+    assert time.monotonic() - started >= 0.04
+    assert target.batches == [[(7, "failed", 0, "boom")]]
+    acks.close()
+
+
+def test_later_ack_supersedes_earlier_one():
+    target = FakeAckTarget()
+    acks = AckBuffer(target, max_items=100, flush_ms=60_000)
+    first = acks.add(5, "failed", 0, "transient")
+    second = acks.add(5, "complete", 9)
+    acks.close()
+    assert target.batches == [[(5, "complete", 9, None)]]
+    assert first.result(timeout=1) is True and second.result(timeout=1) is True
+
+
+def test_close_drains_pending_acks():
+    target = FakeAckTarget()
+    acks = AckBuffer(target, max_items=100, flush_ms=60_000)
+    futures = [acks.add(job_id, "complete") for job_id in range(5)]
+    acks.close()
+    assert all(f.done() and f.result() for f in futures)
+    assert sorted(ack[0] for ack in target.batches[0]) == list(range(5))
+    with pytest.raises(RuntimeError):
+        acks.add(6, "complete")
+
+
+def test_cancelled_ack_does_not_stop_the_flusher():
+    target = FakeAckTarget()
+    acks = AckBuffer(target, max_items=2, flush_ms=50)
+    cancelled = acks.add(1, "complete")
+    assert cancelled.cancel()
+    other = acks.add(2, "complete")
+    assert other.result(timeout=2) is True
+
+    # The timer thread is still alive and flushing
+    assert acks.add(3, "complete").result(timeout=2) is True
+    assert acks._thread.is_alive()
+    acks.close()
+
+
+def test_failed_batch_is_reported_and_flusher_survives():
+    target = FakeAckTarget(fail_first=True)
+    acks = AckBuffer(target, max_items=1, flush_ms=50)
+    with pytest.raises(RuntimeError, match="went away"):
+        acks.add(1, "complete").result(timeout=2)
+    assert acks.add(2, "complete").result(timeout=2) is True
+    acks.close()
+
+
+class ScriptedCursor:
+    """Cursor answering each execute() from `respond(query, params) -> (rows, rowcount)`."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.rows = []
+        self.rowcount = -1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        self.conn.executed.append((query, params))
+        self.rows, self.rowcount = self.conn.respond(query, params)
+
+    def fetchall(self):
+        return self.rows
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+
+class ScriptedConnection:
+    def __init__(self, respond):
+        self.respond = respond
+        self.executed = []
+        self.commits = self.rollbacks = 0
+
+    def cursor(self, cursor_factory=None, name=None):
+        return ScriptedCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+class ScriptedPool:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def getconn(self):
+        return self.conn
+
+    def putconn(self, conn):
+        pass
+
+    def closeall(self):
+        pass
+
+
+def _scripted_manager(fake_pool, respond, **kwargs):
+    manager = ArtemisWorkload({}, **kwargs)
+    manager.pool = ScriptedPool(ScriptedConnection(respond))
+    return manager
+
+
+def _no_rows(query, params):
+    return [], 0
+
+
+def test_get_next_jobs_restores_priority_order(fake_pool):
+    t0 = dt.datetime(2024, 1, 1)
+    rows = [
+        {"id": 1, "url": "https://a/", "priority_score": 2.0, "source_origin": "x", "retry_count": 0,
+         "discovered_at": t0},
+        {"id": 2, "url": "https://b/", "priority_score": 8.5, "source_origin": "x", "retry_count": 1,
+         "discovered_at": t0 + dt.timedelta(minutes=1)},
+        {"id": 3, "url": "https://c/", "priority_score": 8.5, "source_origin": "x", "retry_count": 0,
+         "discovered_at": t0},
+    ]
+    manager = _scripted_manager(fake_pool, lambda query, params: (rows, len(rows)), lease_seconds=90)
+
+    jobs = manager.get_next_jobs(5)
+
+    assert [job["id"] for job in jobs] == [3, 2, 1]
+    assert all("discovered_at" not in job for job in jobs)
+    query, params = manager.pool.conn.executed[0]
+    assert "FOR UPDATE SKIP LOCKED" in query and params == (5, 90)
+    assert manager.pool.conn.commits == 1
+    with pytest.raises(ValueError):
+        manager.get_next_jobs(0)
+
+
+def test_bulk_enqueue_counts(fake_pool, monkeypatch):
+    existing = {"https://example.com/old"}
+    sent = []
+
+    def fake_execute_values(cur, query, rows, template=None, page_size=100, fetch=False):
+        sent.append((list(rows), page_size))
+        return [(i,) for i, row in enumerate(rows) if row[0] not in existing]
+
+    monkeypatch.setattr(workload_manager, "execute_values", fake_execute_values)
+    manager = _scripted_manager(fake_pool, _no_rows)
+    urls = ["https://example.com/new", "not a url", "HTTPS://EXAMPLE.com/new", "https://example.com/old",
+            "", "https://example.org/page#frag"]
+
+    counts = manager.add_many_to_harvest(urls, origin="test", priority_score=2.5, chunk_size=500)
+
+    assert counts == {"inserted": 2, "duplicates": 2, "invalid": 2}
+    assert sent == [([("https://example.com/new", "test", 2.5, None),
+                      ("https://example.com/old", "test", 2.5, None),
+                      ("https://example.org/page", "test", 2.5, None)], 500)]
+    notify = [params for query, params in manager.pool.conn.executed if "pg_notify" in query]
+    assert notify == [("artemis_harvest_queue", "2")]
+
+
+def test_bulk_enqueue_of_nothing_new_skips_the_database(fake_pool):
+    manager = _scripted_manager(fake_pool, _no_rows)
+    assert manager.add_many_to_harvest(["nope", None]) == {"inserted": 0, "duplicates": 0, "invalid": 2}
+    assert manager.pool.conn.executed == []
+
+
+def test_extend_lease_only_renews_jobs_still_scanning(fake_pool):
+    manager = _scripted_manager(fake_pool, lambda query, params: ([], 2), lease_seconds=300)
+
+    assert manager.extend_lease([1, 2, 3]) == 2
+    query, params = manager.pool.conn.executed[0]
+    assert "status = 'scanning'" in query and "id = ANY(%s)" in query
+    assert params == (300, [1, 2, 3])
+
+    manager.extend_lease([4], lease_seconds=30)
+    assert manager.pool.conn.executed[1][1] == (30, [4])
+    assert manager.extend_lease([]) == 0 and len(manager.pool.conn.executed) == 2
+
+
+def test_reaper_backoff_parameters_and_counts(fake_pool):
+    statuses = [("queued",), ("failed",), ("queued",)]
+    manager = _scripted_manager(fake_pool, lambda query, params: (statuses, len(statuses)))
+
+    assert manager.reap_expired_leases(max_retries=5, backoff_base=10.0, backoff_cap=120.0, limit=50) == \
+        {"requeued": 2, "failed": 1}
+    query, params = manager.pool.conn.executed[0]
+    assert params == {"limit": 50, "max_retries": 5, "base": 10.0, "cap": 120.0}
+    # Backoff doubles per retry up to the cap; past max_retries the job fails
+    assert "LEAST(%(cap)s, %(base)s * power(2, w.retry_count))" in query
+    assert "CASE WHEN w.retry_count >= %(max_retries)s THEN 'failed' ELSE 'queued' END" in query
+    assert "retry_count = w.retry_count + 1" in query
+
+
+def test_reaper_rolls_back_and_raises_on_error(fake_pool):
+    def respond(query, params):
+        raise RuntimeError("deadlock")
+
+    manager = _scripted_manager(fake_pool, respond)
+    with pytest.raises(RuntimeError):
+        manager.reap_expired_leases()
+    assert manager.pool.conn.rollbacks == 1
@@ -0,0 +1,30 @@
+# harvesting/url_utils.py
+"""
+URL helpers shared by the sync and async workload managers.
+"""
+
+from typing import Optional
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+
+def normalize_url(url: str, base: Optional[str] = None) -> Optional[str]:
+    """
+    Resolve `url` against `base` and return a canonical http(s) URL:
+    lowercase scheme and host, "/" for an empty path, no fragment.
+    Returns None for anything that is not a usable web URL, including bare
+    words (e.g. "invalid") that are more often template junk than links.
+    """
+    if not url or not isinstance(url, str):
+        return None
+    url = url.strip()
+
+    if base is not None and not urlsplit(url).scheme:
+        if not url.startswith(("/", ".", "?")) and "/" not in url and "." not in url:
+            return None
+        url = urljoin(base, url)
+
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme not in ("http", "https") or not parts.hostname:
+        return None
+    return urlunsplit((scheme, parts.netloc.lower(), parts.path or "/", parts.query, ""))
@@ -6,13 +6,19 @@ Uses connection pooling for safety in concurrent or serverless environments.
 """
 
 import logging
-from typing import Dict, Optional, Any
-from urllib.parse import urlparse
+import select
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import psycopg2
 from psycopg2 import pool
 from psycopg2.extras import RealDictCursor, execute_values
 
+from seen_filter import BloomFilter
+from url_utils import normalize_url
+
 # Configure logging
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -20,6 +26,9 @@ handler = logging.StreamHandler()
 handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
 logger.addHandler(handler)
 
+# Postgres NOTIFY channel announcing newly queued work
+QUEUE_CHANNEL = "artemis_harvest_queue"
+
 
 class ArtemisWorkload:
     """
@@ -27,7 +36,17 @@ class ArtemisWorkload:
     Uses a threaded connection pool for safe concurrent access.
     """
 
-    def __init__(self, db_config: Dict[str, Any] = None, minconn: int = 1, maxconn: int = 10):
+    def __init__(
+        self,
+        db_config: Dict[str, Any] = None,
+        minconn: int = 1,
+        maxconn: int = 10,
+        seen_filter: Optional[BloomFilter] = None,
+        seen_filter_path: Optional[str] = None,
+        lease_seconds: int = 600,
+        ack_batch_size: int = 100,
+        ack_flush_ms: float = 250.0
+    ):
         """
         Initialize the workload manager with connection pool.
 
@@ -36,17 +55,55 @@ class ArtemisWorkload:
                        If None, reads from environment variables via psycopg2 defaults
             minconn: Minimum connections in pool
             maxconn: Maximum connections in pool
+            seen_filter: Optional Bloom filter of known URLs; URLs it reports as
+                         seen are dropped before reaching the database
+            seen_filter_path: Where close() persists the seen filter (optional)
+            lease_seconds: How long a claimed job stays leased without a heartbeat
+                           before the reaper may requeue it
+            ack_batch_size: complete_later()/fail_later() flush after this many acks...
+            ack_flush_ms: ...or once the oldest buffered ack is this old
         """
         if db_config is None:
             db_config = {}  # Let psycopg2 use env vars (DATABASE_URL, etc.)
 
+        self.db_config = db_config
         self.pool = psycopg2.pool.ThreadedConnectionPool(
             minconn=minconn,
             maxconn=maxconn,
             **db_config
         )
+        self.seen_filter = seen_filter
+        self.seen_filter_path = seen_filter_path
+        self.lease_seconds = lease_seconds
+        self._listener = None
+        self._listener_lock = threading.Lock()
+        self.acks = AckBuffer(self, max_items=ack_batch_size, flush_ms=ack_flush_ms)
         logger.info("Workload manager initialized with connection pool (min=%d, max=%d)", minconn, maxconn)
 
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], **kwargs) -> "ArtemisWorkload":
+        """
+        Build a manager from get_config() output. When config['seen_filter'] is
+        enabled, the filter is loaded from its path (or created and warmed from
+        web_map on first start) and saved back there by close().
+        Extra keyword arguments go to the constructor.
+        """
+        settings = config.get('seen_filter') or {}
+        seen_filter = None
+        loaded = False
+        if settings.get('enabled'):
+            seen_filter, loaded = BloomFilter.load_or_create(
+                settings['path'], settings['capacity'], settings['error_rate']
+            )
+            kwargs.update(seen_filter=seen_filter, seen_filter_path=settings['path'])
+            if loaded:
+                logger.info("Seen filter loaded from %s (%d URLs)", settings['path'], len(seen_filter))
+
+        manager = cls(config['db'], **kwargs)
+        if seen_filter is not None and not loaded:
+            manager.warm_seen_filter()
+        return manager
+
     def _get_connection(self):
         """Get a connection from the pool."""
         return self.pool.getconn()
@@ -56,7 +113,15 @@ class ArtemisWorkload:
         self.pool.putconn(conn)
 
     def close(self):
-        """Close all connections in the pool (call on shutdown)."""
+        """Flush buffered acks and close all connections in the pool (call on shutdown)."""
+        self.acks.close()
+        if self.seen_filter is not None and self.seen_filter_path:
+            self.seen_filter.save(self.seen_filter_path)
+            logger.info("Seen filter saved to %s", self.seen_filter_path)
+        with self._listener_lock:
+            if self._listener is not None:
+                self._listener.close()
+                self._listener = None
         self.pool.closeall()
         logger.info("Connection pool closed")
 
@@ -72,13 +137,10 @@ class ArtemisWorkload:
 
         Returns True if inserted, False if already present.
         """
-        if not url or not isinstance(url, str):
-            raise ValueError("Valid URL string required")
-
-        # Basic normalization
-        parsed = urlparse(url)
-        if not parsed.scheme or not parsed.netloc:
-            raise ValueError(f"Invalid URL format: {url}")
+        url = self._normalize_url(url)
+        if self.seen_filter is not None and url in self.seen_filter:
+            logger.debug("URL %s skipped by seen filter", url)
+            return False
 
         query = """
         INSERT INTO web_map (url, source_origin, priority_score, source_note, status)
@@ -92,7 +154,11 @@ class ArtemisWorkload:
             with conn.cursor() as cur:
                 cur.execute(query, (url, origin, priority_score, source_note))
                 inserted = cur.fetchone() is not None
+                if inserted:
+                    self._notify(cur, 1)
                 conn.commit()
+                if self.seen_filter is not None:
+                    self.seen_filter.add(url)
                 logger.debug("URL %s %s", url, "inserted" if inserted else "already exists")
                 return inserted
         except Exception as e:
@@ -104,43 +170,366 @@ class ArtemisWorkload:
             if conn:
                 self._put_connection(conn)
 
+    def add_many_to_harvest(
+        self,
+        urls: Iterable[str],
+        origin: str = "harvester",
+        priority_score: float = 1.0,
+        source_note: str = None,
+        chunk_size: int = 1000
+    ) -> Dict[str, int]:
+        """
+        Bulk-enqueue URLs with one connection checkout and one commit.
+
+        URLs are validated and normalized in a single pass; invalid entries and
+        in-batch repeats are dropped rather than aborting the whole batch. Rows
+        are sent as multi-row INSERT ... ON CONFLICT DO NOTHING statements of
+        `chunk_size` rows each.
+
+        Returns counts: {"inserted": n, "duplicates": n, "invalid": n}.
+        """
+        rows = []
+        seen = set()
+        invalid = duplicates = 0
+        for url in urls:
+            try:
+                url = self._normalize_url(url)
+            except ValueError:
+                invalid += 1
+                continue
+            if url in seen or (self.seen_filter is not None and url in self.seen_filter):
+                duplicates += 1
+                continue
+            seen.add(url)
+            rows.append((url, origin, priority_score, source_note))
+
+        if not rows:
+            return {"inserted": 0, "duplicates": duplicates, "invalid": invalid}
+
+        query = """
+        INSERT INTO web_map (url, source_origin, priority_score, source_note, status)
+        VALUES %s
+        ON CONFLICT (url) DO NOTHING
+        RETURNING id;
+        """
+        conn = None
+        try:
+            conn = self._get_connection()
+            with conn.cursor() as cur:
+                inserted = len(execute_values(
+                    cur, query, rows,
+                    template="(%s, %s, %s, %s, 'queued')",
+                    page_size=chunk_size,
+                    fetch=True
+                ))
+                if inserted:
+                    self._notify(cur, inserted)
+                conn.commit()
+                if self.seen_filter is not None:
+                    self.seen_filter.update(row[0] for row in rows)
+        except Exception as e:
+            if conn:
+                conn.rollback()
+            logger.error("Bulk enqueue of %d URLs failed: %s", len(rows), e)
+            raise
+        finally:
+            if conn:
+                self._put_connection(conn)
+
+        duplicates += len(rows) - inserted
+        logger.info("Bulk enqueue: %d inserted, %d duplicates, %d invalid",
+                    inserted, duplicates, invalid)
+        return {"inserted": inserted, "duplicates": duplicates, "invalid": invalid}
+
+    @staticmethod
+    def _notify(cur, count: int):
+        """Announce new queued jobs; delivered to listeners when the transaction commits."""
+        cur.execute("SELECT pg_notify(%s, %s);", (QUEUE_CHANNEL, str(count)))
+
+    def wait_for_work(self, timeout: float = 30.0) -> bool:
+        """
+        Block until another session enqueues work or `timeout` seconds pass.
+
+        Uses a dedicated autocommit connection (outside the pool) that LISTENs on
+        QUEUE_CHANNEL. Notifications that arrive between calls stay buffered, so
+        a wakeup is never lost once the first call has subscribed.
+        Returns True if woken by a notification, False on timeout or error.
+        """
+        with self._listener_lock:
+            try:
+                if self._listener is None:
+                    conn = psycopg2.connect(**self.db_config)
+                    conn.set_session(autocommit=True)
+                    with conn.cursor() as cur:
+                        cur.execute(f"LISTEN {QUEUE_CHANNEL};")
+                    self._listener = conn
+
+                conn = self._listener
+                conn.poll()
+                if not conn.notifies and select.select([conn], [], [], timeout) != ([], [], []):
+                    conn.poll()
+                woken = bool(conn.notifies)
+                conn.notifies.clear()
+                return woken
+            except psycopg2.Error as e:
+                logger.warning("Queue listener failed, falling back to polling: %s", e)
+                if self._listener is not None:
+                    self._listener.close()
+                    self._listener = None
+                time.sleep(timeout)
+                return False
+
+    def warm_seen_filter(self, batch_size: int = 10000) -> int:
+        """
+        Load every URL already in web_map into the seen filter.
+        Streams through a server-side cursor so memory stays flat on large tables.
+        Returns the number of URLs loaded.
+        """
+        if self.seen_filter is None:
+            raise RuntimeError("No seen filter configured")
+
+        loaded = 0
+        conn = self._get_connection()
+        try:
+            with conn.cursor(name="artemis_seen_filter_warmup") as cur:
+                cur.itersize = batch_size
+                cur.execute("SELECT url FROM web_map;")
+                for (url,) in cur:
+                    self.seen_filter.add(url)
+                    loaded += 1
+            conn.commit()
+        finally:
+            self._put_connection(conn)
+
+        logger.info("Seen filter warmed with %d URLs (est. false-positive rate %.4f)",
+                    loaded, self.seen_filter.estimated_error_rate)
+        return loaded
+
+    @staticmethod
+    def _normalize_url(url: str) -> str:
+        """Validate and canonicalize a URL. Raises ValueError if unusable."""
+        if not url or not isinstance(url, str):
+            raise ValueError("Valid URL string required")
+
+        normalized = normalize_url(url)
+        if normalized is None:
+            raise ValueError(f"Invalid URL format: {url}")
+        return normalized
+
     def get_next_job(self) -> Optional[Dict[str, Any]]:
         """
         Atomically claim the highest-priority queued job and mark it as scanning.
         Returns job dict or None if no jobs available.
         """
+        jobs = self.get_next_jobs(1)
+        return jobs[0] if jobs else None
+
+    def get_next_jobs(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Atomically claim up to `limit` highest-priority queued jobs in one statement.
+
+        All claimed rows are marked as scanning in a single UPDATE and commit, so a
+        worker pays one round-trip for the whole lease instead of one per URL.
+        Rows locked by other workers are skipped, never waited on, and rows still
+        in retry backoff are not eligible. Each job is leased for lease_seconds;
+        call extend_lease() while working on it or the reaper will requeue it.
+        Returns a list of job dicts ordered by priority (empty if queue is drained).
+        """
+        if limit < 1:
+            raise ValueError("Lease size must be at least 1")
+
         query = """
-        UPDATE web_map 
-        SET status = 'scanning', scanning_started_at = NOW()
-        WHERE id = (
-            SELECT id FROM web_map 
+        WITH claimed AS (
+            SELECT id FROM web_map
             WHERE status = 'queued'
+              AND (next_attempt_at IS NULL OR next_attempt_at <= NOW())
             ORDER BY priority_score DESC, discovered_at ASC
-            LIMIT 1
+            LIMIT %s
             FOR UPDATE SKIP LOCKED
         )
-        RETURNING id, url, priority_score, source_origin;
+        UPDATE web_map AS w
+        SET status = 'scanning',
+            scanning_started_at = NOW(),
+            lease_expires_at = NOW() + make_interval(secs => %s)
+        FROM claimed
+        WHERE w.id = claimed.id
+        RETURNING w.id, w.url, w.priority_score, w.source_origin, w.retry_count, w.discovered_at;
         """
         conn = None
         try:
             conn = self._get_connection()
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                cur.execute(query)
-                job = cur.fetchone()
-                if job:
-                    conn.commit()
-                    logger.info("Claimed job: %s (priority %.1f)", job['url'], job['priority_score'])
-                    return dict(job)
-                return None
+                cur.execute(query, (limit, self.lease_seconds))
+                rows = cur.fetchall()
+                conn.commit()
+        except Exception as e:
+            if conn:
+                conn.rollback()
+            logger.error("Failed to claim jobs: %s", e)
+            raise
+        finally:
+            if conn:
+                self._put_connection(conn)
+
+        # UPDATE ... RETURNING does not preserve the subquery ordering
+        jobs = sorted(
+            (dict(row) for row in rows),
+            key=lambda j: (-j['priority_score'], j['discovered_at'])
+        )
+        for job in jobs:
+            job.pop('discovered_at', None)
+        if jobs:
+            logger.info("Claimed %d job(s), top: %s (priority %.1f)",
+                        len(jobs), jobs[0]['url'], jobs[0]['priority_score'])
+        return jobs
+
+    def iter_jobs(self, lease_size: int = 10) -> Iterator[Dict[str, Any]]:
+        """
+        Yield claimed jobs, draining a local lease of up to `lease_size` jobs
+        before going back to the database for the next batch.
+        Stops when the queue is empty.
+        """
+        while True:
+            lease = self.get_next_jobs(lease_size)
+            if not lease:
+                return
+            yield from lease
+
+    def extend_lease(self, job_ids: Iterable[int], lease_seconds: Optional[int] = None) -> int:
+        """
+        Heartbeat: push the lease expiry of in-flight jobs forward.
+        Accepts many ids so a worker can renew its whole lease in one statement.
+        Returns the number of jobs still held (ones already reaped are not revived).
+        """
+        job_ids = list(job_ids)
+        if not job_ids:
+            return 0
+
+        query = """
+        UPDATE web_map
+        SET lease_expires_at = NOW() + make_interval(secs => %s)
+        WHERE id = ANY(%s) AND status = 'scanning';
+        """
+        seconds = lease_seconds if lease_seconds is not None else self.lease_seconds
+        conn = None
+        try:
+            conn = self._get_connection()
+            with conn.cursor() as cur:
+                cur.execute(query, (seconds, job_ids))
+                extended = cur.rowcount
+                conn.commit()
+        except Exception as e:
+            if conn:
+                conn.rollback()
+            logger.error("Lease extension failed for %d job(s): %s", len(job_ids), e)
+            raise
+        finally:
+            if conn:
+                self._put_connection(conn)
+
+        if extended < len(job_ids):
+            logger.warning("%d of %d leases were lost before renewal", len(job_ids) - extended, len(job_ids))
+        return extended
+
+    def release_jobs(self, job_ids: Iterable[int]) -> int:
+        """
+        Hand claimed-but-unstarted jobs back to the queue immediately
+        (e.g. a worker shutting down with part of its lease undrained).
+        Does not count as a retry. Returns the number of jobs released.
+        """
+        job_ids = list(job_ids)
+        if not job_ids:
+            return 0
+
+        query = """
+        UPDATE web_map
+        SET status = 'queued', scanning_started_at = NULL, lease_expires_at = NULL
+        WHERE id = ANY(%s) AND status = 'scanning';
+        """
+        conn = None
+        try:
+            conn = self._get_connection()
+            with conn.cursor() as cur:
+                cur.execute(query, (job_ids,))
+                released = cur.rowcount
+                if released:
+                    self._notify(cur, released)
+                conn.commit()
+        except Exception as e:
+            if conn:
+                conn.rollback()
+            logger.error("Failed to release %d job(s): %s", len(job_ids), e)
+            raise
+        finally:
+            if conn:
+                self._put_connection(conn)
+
+        logger.info("Released %d job(s) back to the queue", released)
+        return released
+
+    def reap_expired_leases(
+        self,
+        max_retries: int = 3,
+        backoff_base: float = 60.0,
+        backoff_cap: float = 3600.0,
+        limit: int = 1000
+    ) -> Dict[str, int]:
+        """
+        Requeue scanning jobs whose lease ran out (their worker died or stalled).
+
+        Each reaped job gets retry_count + 1 and is held back for
+        min(backoff_cap, backoff_base * 2^retry_count) seconds; jobs that exceed
+        max_retries are marked failed instead. Works through at most `limit`
+        rows per call via the partial lease index, so it stays cheap on large
+        tables and several reapers can run without blocking each other.
+
+        Returns counts: {"requeued": n, "failed": n}.
+        """
+        query = """
+        WITH expired AS (
+            SELECT id FROM web_map
+            WHERE status = 'scanning' AND lease_expires_at < NOW()
+            ORDER BY lease_expires_at
+            LIMIT %(limit)s
+            FOR UPDATE SKIP LOCKED
+        )
+        UPDATE web_map AS w
+        SET status = CASE WHEN w.retry_count >= %(max_retries)s THEN 'failed' ELSE 'queued' END,
+            retry_count = w.retry_count + 1,
+            next_attempt_at = NOW() + make_interval(
+                secs => LEAST(%(cap)s, %(base)s * power(2, w.retry_count))),
+            failed_at = CASE WHEN w.retry_count >= %(max_retries)s THEN NOW() ELSE w.failed_at END,
+            error_message = CASE WHEN w.retry_count >= %(max_retries)s
+                                 THEN 'Lease expired after ' || (w.retry_count + 1) || ' attempts'
+                                 ELSE w.error_message END,
+            lease_expires_at = NULL
+        FROM expired
+        WHERE w.id = expired.id
+        RETURNING w.status;
+        """
+        params = {"limit": limit, "max_retries": max_retries, "base": backoff_base, "cap": backoff_cap}
+        conn = None
+        try:
+            conn = self._get_connection()
+            with conn.cursor() as cur:
+                cur.execute(query, params)
+                statuses = [row[0] for row in cur.fetchall()]
+                conn.commit()
         except Exception as e:
             if conn:
                 conn.rollback()
-            logger.error("Failed to get next job: %s", e)
+            logger.error("Lease reaper failed: %s", e)
             raise
         finally:
             if conn:
                 self._put_connection(conn)
 
+        result = {"requeued": statuses.count("queued"), "failed": statuses.count("failed")}
+        if statuses:
+            logger.warning("Reaped %d expired lease(s): %d requeued, %d failed",
+                           len(statuses), result["requeued"], result["failed"])
+        return result
+
     def mark_complete(self, job_id: int, harvested_count: int = 0) -> bool:
         """Mark a scanning job as complete."""
         query = """
@@ -159,6 +548,62 @@ class ArtemisWorkload:
         """
         return self._update_status(job_id, query, (error_message,))
 
+    def complete_later(self, job_id: int, harvested_count: int = 0) -> "Future[bool]":
+        """
+        Write-behind mark_complete: buffer the ack and return immediately.
+        The future resolves to True once the batched UPDATE applied it.
+        """
+        return self.acks.add(job_id, "complete", harvested_count=harvested_count)
+
+    def fail_later(self, job_id: int, error_message: str = None) -> "Future[bool]":
+        """Write-behind mark_failed; see complete_later()."""
+        return self.acks.add(job_id, "failed", error_message=error_message)
+
+    def flush_acks(self) -> Dict[int, bool]:
+        """Apply all buffered acks now. Returns {job_id: updated}."""
+        return self.acks.flush()
+
+    def _apply_acks(self, acks: List[Tuple[int, str, int, Optional[str]]]) -> Dict[int, bool]:
+        """
+        Apply (job_id, status, harvested_count, error_message) transitions in
+        one UPDATE ... FROM (VALUES ...) statement. Returns {job_id: updated}.
+        """
+        query = """
+        UPDATE web_map AS w
+        SET status = v.status,
+            completed_at = CASE WHEN v.status = 'complete' THEN NOW() ELSE w.completed_at END,
+            harvested_count = CASE WHEN v.status = 'complete' THEN v.harvested_count ELSE w.harvested_count END,
+            error_message = CASE WHEN v.status = 'failed' THEN v.error_message ELSE w.error_message END,
+            failed_at = CASE WHEN v.status = 'failed' THEN NOW() ELSE w.failed_at END
+        FROM (VALUES %s) AS v(id, status, harvested_count, error_message)
+        WHERE w.id = v.id AND w.status = 'scanning'
+        RETURNING w.id;
+        """
+        conn = None
+        try:
+            conn = self._get_connection()
+            with conn.cursor() as cur:
+                updated = {row[0] for row in execute_values(
+                    cur, query, acks,
+                    template="(%s::int, %s::varchar, %s::int, %s::text)",
+                    page_size=len(acks),
+                    fetch=True
+                )}
+                conn.commit()
+        except Exception as e:
+            if conn:
+                conn.rollback()
+            logger.error("Batched status update failed for %d job(s): %s", len(acks), e)
+            return {ack[0]: False for ack in acks}
+        finally:
+            if conn:
+                self._put_connection(conn)
+
+        missing = len(acks) - len(updated)
+        if missing:
+            logger.warning("%d job(s) not found or not in scanning state", missing)
+        return {ack[0]: ack[0] in updated for ack in acks}
+
     def _update_status(self, job_id: int, query: str, params: tuple) -> bool:
         conn = None
         try:
@@ -181,9 +626,20 @@ class ArtemisWorkload:
             if conn:
                 self._put_connection(conn)
 
-    def get_queue_stats(self) -> Dict[str, int]:
-        """Get basic queue statistics."""
-        query = """
+    def get_queue_stats(self, exact: bool = False) -> Dict[str, int]:
+        """
+        Get basic queue statistics.
+
+        Reads the web_map_status_counts rollup maintained by triggers
+        (migration 002), which costs the same at any table size. Pass
+        exact=True, or run before the migration, to scan web_map instead.
+        """
+        counters_query = """
+        SELECT status, SUM(n)::bigint AS n
+        FROM web_map_status_counts
+        GROUP BY status;
+        """
+        scan_query = """
         SELECT 
             COUNT(*) FILTER (WHERE status = 'queued') AS queued,
             COUNT(*) FILTER (WHERE status = 'scanning') AS scanning,
@@ -194,12 +650,112 @@ class ArtemisWorkload:
         conn = self._get_connection()
         try:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                cur.execute(query)
+                if not exact:
+                    try:
+                        cur.execute(counters_query)
+                        counts = {row['status']: row['n'] for row in cur.fetchall()}
+                        conn.commit()
+                        return {status: counts.get(status, 0)
+                                for status in ("queued", "scanning", "complete", "failed")}
+                    except psycopg2.errors.UndefinedTable:
+                        conn.rollback()
+                        logger.warning("Status counters missing (run migration 002); scanning web_map")
+                cur.execute(scan_query)
                 return dict(cur.fetchone())
         finally:
             self._put_connection(conn)
 
 
+class AckBuffer:
+    """
+    Write-behind buffer for job status transitions.
+
+    Acks collect in memory and are applied by ArtemisWorkload._apply_acks in
+    one statement when `max_items` are waiting or the oldest has waited
+    `flush_ms`, whichever comes first. A background thread handles the timed
+    flush; it starts with the first ack. close() flushes what is left.
+    """
+
+    def __init__(self, manager: ArtemisWorkload, max_items: int = 100, flush_ms: float = 250.0):
+        self.manager = manager
+        self.max_items = max(1, max_items)
+        self.flush_interval = flush_ms / 1000.0
+        self._pending: Dict[int, Tuple[Tuple[int, str, int, Optional[str]], List[Future]]] = {}
+        self._oldest: Optional[float] = None
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def add(self, job_id: int, status: str, harvested_count: int = 0, error_message: str = None) -> Future:
+        future: Future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Ack buffer is closed")
+            # A later ack for the same job supersedes the earlier one; both futures share its result
+            futures = self._pending.pop(job_id, (None, []))[1]
+            futures.append(future)
+            self._pending[job_id] = ((job_id, status, harvested_count, error_message), futures)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="artemis-ack-flusher", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return future
+
+    def _take(self):
+        with self._cond:
+            batch, self._pending, self._oldest = self._pending, {}, None
+        return batch
+
+    def flush(self) -> Dict[int, bool]:
+        with self._flush_lock:
+            batch = self._take()
+            if not batch:
+                return {}
+            try:
+                results = self.manager._apply_acks([ack for ack, _ in batch.values()])
+            except Exception as e:
+                for _, futures in batch.values():
+                    for future in futures:
+                        if future.set_running_or_notify_cancel():
+                            future.set_exception(e)
+                raise
+            for job_id, (_, futures) in batch.items():
+                for future in futures:
+                    # False when the waiter cancelled it (e.g. a cancelled asyncio.wrap_future)
+                    if future.set_running_or_notify_cancel():
+                        future.set_result(results.get(job_id, False))
+            return results
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed and (
+                    not self._pending
+                    or (len(self._pending) < self.max_items
+                        and time.monotonic() - self._oldest < self.flush_interval)
+                ):
+                    timeout = None if not self._pending else \
+                        self.flush_interval - (time.monotonic() - self._oldest)
+                    self._cond.wait(timeout)
+                if self._closed:
+                    return
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error("Ack flush failed: %s", e, exc_info=True)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+
+
 # ────────────────────────────────────────────────
 # Example usage / test
 # ────────────────────────────────────────────────
@@ -220,10 +776,13 @@ if __name__ == "__main__":
     # Add some URLs
     manager.add_to_harvest("https://example.com/research", priority_score=8.5)
     manager.add_to_harvest("https://example.org/blog", priority_score=3.0)
+    print("Bulk:", manager.add_many_to_harvest(
+        ["https://example.org/about", "https://example.org/blog", "not-a-url"],
+        origin="example"
+    ))
 
-    # Get and process next job
-    job = manager.get_next_job()
-    if job:
+    # Claim a small lease and drain it locally
+    for job in manager.get_next_jobs(5):
         print(f"Processing: {job['url']} (priority {job['priority_score']})")
         # ... do harvesting ...
         manager.mark_complete(job['id'], harvested_count=12)
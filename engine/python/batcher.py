@@ -0,0 +1,137 @@
+# batcher.py
+"""
+Dynamic micro-batching for model inference.
+Concurrent submit() calls are coalesced: the first waiting item opens a
+batch that closes after max_wait_ms or at max_batch_size items, runs as one
+forward pass in a worker thread, and each caller gets its own result back.
+While one batch runs, the next one fills up.
+"""
+
+import asyncio
+import logging
+import statistics
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class MicroBatcher:
+    def __init__(
+        self,
+        infer: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 10.0,
+        metrics_window: int = 1000
+    ):
+        """
+        Args:
+            infer: Blocking batch function, one result per input in order
+                   (e.g. ml_node.analyze_batch)
+            max_batch_size: Largest batch sent to `infer`
+            max_wait_ms: Longest an item waits for others to join its batch
+            metrics_window: Recent requests/batches kept for the latency and size stats
+        """
+        self.infer = infer
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="micro-batch")
+        self._latencies: Deque[float] = deque(maxlen=metrics_window)
+        self._batch_sizes: Deque[int] = deque(maxlen=metrics_window)
+        self.requests = 0
+        self.batches = 0
+        self.errors = 0
+
+    async def submit(self, item: Any) -> Any:
+        """Queue `item` for the next batch and wait for its result."""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self) -> List[Tuple[Any, asyncio.Future, float]]:
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            items = [item for item, _, _ in batch]
+            try:
+                results = await loop.run_in_executor(self._executor, self.infer, items)
+                if len(results) != len(items):
+                    raise RuntimeError(f"infer returned {len(results)} results for {len(items)} inputs")
+            except Exception as e:
+                logger.error("Batch of %d failed: %s", len(items), e)
+                self.errors += 1
+                results = [e] * len(items)
+
+            self.batches += 1
+            self._batch_sizes.append(len(items))
+            finished = time.perf_counter()
+            for (_, future, queued_at), result in zip(batch, results):
+                self.requests += 1
+                self._latencies.append(finished - queued_at)
+                if future.done():
+                    continue  # caller went away
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        self._executor.shutdown(wait=False)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Request latency percentiles (ms, queueing + inference) and batch-size stats."""
+        latencies = [1000 * latency for latency in self._latencies]
+        sizes = list(self._batch_sizes)
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "errors": self.errors,
+            "latency_ms": {
+                "p50": round(_percentile(latencies, 50), 2) if latencies else None,
+                "p99": round(_percentile(latencies, 99), 2) if latencies else None,
+            },
+            "batch_size": {
+                "mean": round(statistics.mean(sizes), 2) if sizes else None,
+                "max": max(sizes) if sizes else None,
+                "histogram": dict(sorted(Counter(sizes).items())),
+            },
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+        }
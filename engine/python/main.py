@@ -1,10 +1,38 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 import logging
+import os
+import threading
+
+from ..tools import ml_node
+from .batcher import MicroBatcher
+from .model_registry import ModelRegistry
 
 app = FastAPI(title="Artemis AI Matrix", version="1.0.0")
 
+# Models shared by all requests. ARTEMIS_WARM_MODELS (comma-separated, default
+# "sentiment") are loaded in the background at startup; ARTEMIS_MODEL_IDLE_UNLOAD
+# (seconds) unloads models left idle that long. ARTEMIS_SENTIMENT_BACKEND picks
+# the sentiment backend: pytorch (default), int8, onnx or onnx-int8.
+_idle_unload = os.getenv("ARTEMIS_MODEL_IDLE_UNLOAD")
+models = ModelRegistry(idle_unload_seconds=float(_idle_unload) if _idle_unload else None)
+models.register("sentiment", lambda: ml_node.load_classifier(ml_node.DEFAULT_BACKEND))
+WARM_MODELS = [name.strip() for name in os.getenv("ARTEMIS_WARM_MODELS", "sentiment").split(",") if name.strip()]
+
+# Concurrent /analyze/sentiment requests are coalesced into one forward pass of
+# up to ARTEMIS_BATCH_MAX_SIZE texts, waiting at most ARTEMIS_BATCH_MAX_WAIT_MS.
+# Repeated texts are answered from ml_node's result cache without queueing.
+sentiment_cache = ml_node.get_cache()
+SENTIMENT_MODEL_ID = ml_node.model_key()
+sentiment_batcher = MicroBatcher(
+    lambda texts: ml_node.analyze_batch(texts, classifier=models.get("sentiment"), batch_size=len(texts), cache=False),
+    max_batch_size=int(os.getenv("ARTEMIS_BATCH_MAX_SIZE", "16")),
+    max_wait_ms=float(os.getenv("ARTEMIS_BATCH_MAX_WAIT_MS", "10")),
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -28,22 +56,52 @@ class MathPayload(BaseModel):
     operation: str
     params: dict
 
+@app.on_event("startup")
+def warm_models():
+    if WARM_MODELS:
+        threading.Thread(target=models.warm, args=(WARM_MODELS,), name="model-warmup", daemon=True).start()
+    models.start_idle_reaper()
+
+@app.on_event("shutdown")
+async def stop_models():
+    await sentiment_batcher.stop()
+    models.stop()
+
 @app.get("/")
 def read_root():
     return {"status": "Artemis AI Matrix is Online.", "quantum_state": "Superposition"}
 
+@app.get("/ready")
+def readiness():
+    """200 once the warm-up models are loaded, 503 until then."""
+    ready = models.ready(WARM_MODELS)
+    return JSONResponse(status_code=200 if ready else 503, content={"ready": ready, "models": models.status()})
+
 @app.post("/analyze/sentiment")
-def analyze_sentiment(payload: TextPayload):
+async def analyze_sentiment(payload: TextPayload):
     try:
-        from transformers import pipeline
-        classifier = pipeline("sentiment-analysis", model="cardiffnlp/twitter-roberta-base-sentiment-latest")
         safe_text = payload.text[:512]
-        result = classifier(safe_text)[0]
+        # Cache lookups may hit the SQLite tier, so they run off the event loop
+        result = None
+        if sentiment_cache is not None:
+            result = await run_in_threadpool(sentiment_cache.get, SENTIMENT_MODEL_ID, safe_text)
+        if result is None:
+            result = await sentiment_batcher.submit(safe_text)
+            if "error" in result:
+                raise RuntimeError(result["error"])
+            if sentiment_cache is not None:
+                await run_in_threadpool(sentiment_cache.put, SENTIMENT_MODEL_ID, safe_text,
+                                        {"label": result["label"], "score": result["score"]})
         return {"success": True, "label": result["label"], "score": round(float(result["score"]), 4)}
     except Exception as e:
         logging.error(f"Sentiment Analysis Failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/metrics/sentiment")
+def sentiment_metrics():
+    """Micro-batching stats (request latency p50/p99, batch sizes) and result-cache hit rates."""
+    return {**sentiment_batcher.metrics(), "cache": sentiment_cache.stats() if sentiment_cache is not None else None}
+
 @app.post("/quantum/simulate")
 def quantum_simulate(payload: QuantumPayload):
     try:
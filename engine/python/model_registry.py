@@ -0,0 +1,129 @@
+# model_registry.py
+"""
+Process-wide registry of inference models for the AI Matrix API.
+Each model is loaded once – at startup via warm() or on first get() – and
+shared by every request. status() reports readiness, and an optional idle
+policy unloads models nobody has used for a while to free memory on small
+boxes (the next request loads them again).
+"""
+
+import gc
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRegistry:
+    def __init__(self, idle_unload_seconds: Optional[float] = None):
+        """
+        Args:
+            idle_unload_seconds: Unload models unused for this long (None = keep loaded)
+        """
+        self.idle_unload_seconds = idle_unload_seconds
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._models: Dict[str, Any] = {}
+        self._last_used: Dict[str, float] = {}
+        self._load_seconds: Dict[str, float] = {}
+        self._errors: Dict[str, str] = {}
+        self._model_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._reaper: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def register(self, name: str, loader: Callable[[], Any]):
+        """Register `loader` (a zero-argument callable returning the model) under `name`."""
+        with self._lock:
+            self._loaders[name] = loader
+            self._model_locks.setdefault(name, threading.Lock())
+
+    def get(self, name: str) -> Any:
+        """The loaded model, loading it first if needed. Concurrent callers share one load."""
+        model = self._models.get(name)
+        if model is None:
+            if name not in self._loaders:
+                raise KeyError(f"Unknown model: {name}")
+            with self._model_locks[name]:
+                model = self._models.get(name)
+                if model is None:
+                    model = self._load(name)
+        self._last_used[name] = time.monotonic()
+        return model
+
+    def _load(self, name: str) -> Any:
+        logger.info("Loading model %s...", name)
+        started = time.perf_counter()
+        try:
+            model = self._loaders[name]()
+        except Exception as e:
+            self._errors[name] = str(e)
+            logger.error("Loading model %s failed: %s", name, e)
+            raise
+        self._load_seconds[name] = time.perf_counter() - started
+        self._errors.pop(name, None)
+        self._models[name] = model
+        logger.info("Model %s loaded in %.1fs", name, self._load_seconds[name])
+        return model
+
+    def warm(self, names: Optional[Iterable[str]] = None):
+        """Load `names` (default: every registered model). Failures are recorded in status()."""
+        for name in list(names or self._loaders):
+            try:
+                self.get(name)
+            except Exception:
+                pass
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._models
+
+    def ready(self, names: Optional[Iterable[str]] = None) -> bool:
+        return all(self.is_loaded(name) for name in (names or self._loaders))
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        now = time.monotonic()
+        return {
+            name: {
+                "loaded": name in self._models,
+                "load_seconds": round(self._load_seconds[name], 2) if name in self._load_seconds else None,
+                "idle_seconds": round(now - self._last_used[name], 1) if name in self._last_used else None,
+                "error": self._errors.get(name),
+            }
+            for name in self._loaders
+        }
+
+    def unload(self, name: str):
+        with self._model_locks[name]:
+            if self._models.pop(name, None) is not None:
+                gc.collect()
+                logger.info("Unloaded model %s", name)
+
+    def unload_idle(self) -> List[str]:
+        """Unload models idle longer than idle_unload_seconds. Returns their names."""
+        if not self.idle_unload_seconds:
+            return []
+        cutoff = time.monotonic() - self.idle_unload_seconds
+        idle = [name for name in list(self._models) if self._last_used.get(name, 0) < cutoff]
+        for name in idle:
+            self.unload(name)
+        return idle
+
+    def start_idle_reaper(self, interval: Optional[float] = None):
+        """Check for idle models every `interval` seconds in a daemon thread."""
+        if not self.idle_unload_seconds or self._reaper is not None:
+            return
+        interval = interval or max(1.0, self.idle_unload_seconds / 4)
+
+        def run():
+            while not self._stop.wait(interval):
+                self.unload_idle()
+
+        self._reaper = threading.Thread(target=run, name="model-idle-reaper", daemon=True)
+        self._reaper.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._reaper is not None:
+            self._reaper.join(timeout=5)
+            self._reaper = None
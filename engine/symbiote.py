@@ -45,6 +45,17 @@ Rules:
 STEWARDSHIP_DIR = "creator-creation/stewardship"
 LOG_FILE = os.path.join(STEWARDSHIP_DIR, "symbiote_log.jsonl")
 
+# Re-harvests revalidate pages instead of re-downloading them
+HTTP_CACHE_PATH = os.getenv("ARTEMIS_HTTP_CACHE", "data/http_cache.sqlite3")
+_http_cache = None
+
+def get_http_cache():
+    global _http_cache
+    if _http_cache is None:
+        from harvesting.http_cache import HttpCache
+        _http_cache = HttpCache(HTTP_CACHE_PATH)
+    return _http_cache
+
 def log_symbiote(event_type, details):
     """Append log entry to shared JSONL file"""
     os.makedirs(STEWARDSHIP_DIR, exist_ok=True)
@@ -138,14 +149,14 @@ def ping_council(prompt="Symbiote test ping"):
 
 def basic_harvest(url):
     try:
-        response = requests.get(url, timeout=10)
+        from harvesting.http_cache import cached_get
+        response = cached_get(requests, url, get_http_cache(), timeout=10)
         if response.status_code == 200:
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(response.text, "html.parser")
-            title = soup.title.string.strip() if soup.title else "Untitled"
-            desc = soup.find("meta", attrs={"name": "description"})
-            desc = desc["content"].strip() if desc else "No description"
-            emails = [a["href"].replace("mailto:", "").strip() for a in soup.find_all("a", href=lambda h: h and h.startswith("mailto:"))]
+            from harvesting.parsed_page import ParsedPage
+            page = ParsedPage(response.text, url)
+            title = page.title or "Untitled"
+            desc = page.meta.get("description") or "No description"
+            emails = page.emails
             result = {"url": url, "title": title, "description": desc, "emails": emails}
             print("Basic harvest:", result)
             log_symbiote("basic_harvest", result)
@@ -0,0 +1,50 @@
+# engine/tests/test_batcher.py
+import asyncio
+
+from engine.python.batcher import MicroBatcher
+
+
+def test_concurrent_requests_share_batches_and_get_their_own_results():
+    calls = []
+
+    def infer(texts):
+        calls.append(list(texts))
+        return [text.upper() for text in texts]
+
+    async def scenario():
+        batcher = MicroBatcher(infer, max_batch_size=4, max_wait_ms=50)
+        results = await asyncio.gather(*(batcher.submit(f"t{i}") for i in range(10)))
+        await batcher.stop()
+        return results, batcher.metrics()
+
+    results, metrics = asyncio.run(scenario())
+    assert results == [f"T{i}" for i in range(10)]
+    assert [len(batch) for batch in calls] == [4, 4, 2]
+    assert metrics["requests"] == 10 and metrics["batches"] == 3
+    assert metrics["batch_size"]["histogram"] == {2: 1, 4: 2}
+    assert metrics["latency_ms"]["p99"] >= metrics["latency_ms"]["p50"] > 0
+
+
+def test_lone_request_waits_at_most_max_wait():
+    async def scenario():
+        batcher = MicroBatcher(lambda texts: texts, max_batch_size=64, max_wait_ms=5)
+        result = await asyncio.wait_for(batcher.submit("x"), timeout=1)
+        await batcher.stop()
+        return result
+
+    assert asyncio.run(scenario()) == "x"
+
+
+def test_failed_batch_raises_in_every_caller():
+    def infer(texts):
+        raise ValueError("model crashed")
+
+    async def scenario():
+        batcher = MicroBatcher(infer, max_batch_size=8, max_wait_ms=20)
+        results = await asyncio.gather(batcher.submit("a"), batcher.submit("b"), return_exceptions=True)
+        await batcher.stop()
+        return results, batcher.metrics()
+
+    results, metrics = asyncio.run(scenario())
+    assert all(isinstance(r, ValueError) for r in results)
+    assert metrics["errors"] == 1
@@ -0,0 +1,68 @@
+# engine/tests/test_ml_node.py
+import json
+
+from engine.tools.ml_node import analyze_batch, analyze_stream, iter_input, run_stream
+from engine.tools.sentiment_cache import SentimentCache
+
+
+class LengthClassifier:
+    """Pipeline-compatible callable: labels by length, fails on texts containing 'boom'."""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, texts, **kwargs):
+        texts = [texts] if isinstance(texts, str) else texts
+        self.batches.append(list(texts))
+        if any("boom" in t for t in texts):
+            raise RuntimeError("bad input")
+        return [{"label": "positive" if len(t) > 3 else "negative", "score": 0.9} for t in texts]
+
+
+def test_stream_keeps_input_order_and_buckets_by_length():
+    classifier = LengthClassifier()
+    texts = ["aaaaaaaa", "b", "cccccc", "dd", "eeeeeee", "f"]
+    results = list(analyze_stream(texts, classifier=classifier, batch_size=2, window=6, cache=False))
+    assert [r["index"] for r in results] == list(range(6))
+    assert [r["input_preview"] for r in results] == texts
+    assert classifier.batches == [["b", "f"], ["dd", "cccccc"], ["eeeeeee", "aaaaaaaa"]]
+
+
+def test_bad_item_only_fails_itself():
+    results = analyze_batch(["good text", "boom", "", "fine"], classifier=LengthClassifier(), batch_size=4, cache=False)
+    assert [("error" in r) for r in results] == [False, True, True, False]
+    assert results[0]["label"] == "positive"
+
+
+def test_only_cache_misses_reach_the_model():
+    classifier = LengthClassifier()
+    cache = SentimentCache(max_entries=100)
+    analyze_batch(["hello there", "boom"], classifier=classifier, cache=cache, model_id="m")
+    classifier.batches.clear()
+
+    results = analyze_batch(["hello  there ", "new text", "boom"], classifier=classifier, cache=cache, model_id="m")
+    assert classifier.batches == [["boom", "new text"], ["boom"], ["new text"]]  # errors are never cached
+    assert results[0]["label"] == "positive" and "error" in results[2]
+    assert cache.stats()["hits"] == 1
+
+
+def test_iter_input_reads_jsonl_lazily(tmp_path):
+    path = tmp_path / "dump.jsonl"
+    path.write_text('{"id": 7, "text": "hello"}\n"plain"\nnot json\n\n', encoding="utf-8")
+    items = iter_input(path)
+    assert next(items) == (7, "hello")
+    assert list(items) == ["plain", ""]
+
+
+def test_run_stream_writes_jsonl_and_summarizes(tmp_path):
+    source = tmp_path / "in.txt"
+    source.write_text("a long positive text\nno\nboom\nanother long one\n", encoding="utf-8")
+    output = tmp_path / "out.jsonl"
+
+    report = run_stream(source, str(output), batch_size=2, window=4, classifier=LengthClassifier(),
+                        model_id="test-run-stream")
+
+    lines = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+    assert [r["index"] for r in lines] == [0, 1, 2, 3]
+    assert report["count"] == 4 and report["errors"] == 1
+    assert report["summary"] == {"positive": 2, "negative": 1, "neutral": 0}
@@ -0,0 +1,47 @@
+# engine/tests/test_model_registry.py
+import threading
+import time
+
+from engine.python.model_registry import ModelRegistry
+
+
+def test_model_loads_once_and_is_shared():
+    loads = []
+    registry = ModelRegistry()
+    registry.register("m", lambda: loads.append(1) or object())
+    assert not registry.ready()
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get("m"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(loads) == 1 and len({id(r) for r in results}) == 1
+    assert registry.ready() and registry.status()["m"]["loaded"]
+
+
+def test_failed_load_is_reported_and_retried():
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise OSError("weights missing")
+        return "model"
+
+    registry = ModelRegistry()
+    registry.register("m", flaky)
+    registry.warm()
+    assert registry.status()["m"]["error"] == "weights missing"
+    assert registry.get("m") == "model" and registry.status()["m"]["error"] is None
+
+
+def test_idle_models_are_unloaded_and_reload_on_demand():
+    registry = ModelRegistry(idle_unload_seconds=0.01)
+    registry.register("m", object)
+    first = registry.get("m")
+    time.sleep(0.02)
+    assert registry.unload_idle() == ["m"] and not registry.is_loaded("m")
+    assert registry.get("m") is not first
@@ -0,0 +1,29 @@
+# engine/tests/test_sentiment_cache.py
+from engine.tools.sentiment_cache import SentimentCache, cache_key
+
+
+def test_key_normalizes_whitespace_but_not_case_and_includes_model():
+    assert cache_key("m", "  Great   show\n") == cache_key("m", "Great show")
+    assert cache_key("m", "GREAT show") != cache_key("m", "Great show")
+    assert cache_key("m:onnx", "Great show") != cache_key("m:pytorch", "Great show")
+
+
+def test_lru_evicts_least_recently_used():
+    cache = SentimentCache(max_entries=2)
+    cache.put("m", "a", {"label": "positive", "score": 0.9})
+    cache.put("m", "b", {"label": "negative", "score": 0.8})
+    assert cache.get("m", "a")  # a is now most recent
+    cache.put("m", "c", {"label": "neutral", "score": 0.7})
+    assert cache.get("m", "b") is None and cache.get("m", "a") and len(cache) == 2
+    assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 1
+
+
+def test_sqlite_tier_survives_restart(tmp_path):
+    path = tmp_path / "sentiment.sqlite3"
+    cache = SentimentCache(max_entries=10, path=path)
+    cache.put_many("m", ["a", "b"], [{"label": "positive", "score": 0.9}, {"error": "boom"}])
+    cache.close()
+
+    reopened = SentimentCache(max_entries=10, path=path)
+    assert reopened.get_many("m", ["a", "b"]) == [{"label": "positive", "score": 0.9}, None]
+    assert reopened.stats()["disk_hits"] == 1
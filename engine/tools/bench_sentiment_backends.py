@@ -0,0 +1,124 @@
+# bench_sentiment_backends.py
+"""
+Benchmark: sentiment inference backends against the FP32 pytorch pipeline.
+
+For each backend (see ml_node.BACKENDS) reports load time, throughput in
+texts/s through ml_node.analyze_stream, and parity with the FP32 reference:
+top-label agreement and the mean / max absolute difference of the per-label
+probabilities. Exits 1 if any backend agrees with the reference on fewer
+than --min-agreement of the texts, so it doubles as the parity check to run
+before switching a node's ARTEMIS_SENTIMENT_BACKEND.
+
+Run: python engine/tools/bench_sentiment_backends.py --backends int8 onnx onnx-int8 --file sample.txt
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from itertools import cycle, islice
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import ml_node  # noqa: E402
+
+SAMPLE_TEXTS = [
+    "This is the best album I've heard all year, every track is a gem.",
+    "Terrible customer service. I waited two hours and nobody answered.",
+    "The meeting has been moved to Thursday at 3pm.",
+    "Not bad at all, though the ending felt rushed.",
+    "I can't believe how much they charged for a broken product.",
+    "Our new release is out now – stream it on all platforms!",
+    "The weather today is cloudy with light rain in the afternoon.",
+    "Absolutely love the vibe of this venue, can't wait to come back.",
+    "The update broke login for half of our users and support is silent.",
+    "Tickets go on sale Friday. Limited capacity.",
+    "Honestly it was fine. Nothing special, nothing awful.",
+    "What a disappointing performance from a band I used to adore.",
+    "Thanks to everyone who came out last night, you were incredible!",
+    "Shipping took longer than expected but the quality is great.",
+    "Please read the terms and conditions before subscribing.",
+    "Worst. Gig. Ever. Sound was muddy and they played for 20 minutes.",
+]
+
+
+def load_texts(path: str, n: int) -> List[str]:
+    if path:
+        with open(path, encoding="utf-8") as f:
+            texts = [line.strip() for line in f if line.strip()]
+    else:
+        texts = SAMPLE_TEXTS
+    return list(islice(cycle(texts), n))
+
+
+def probabilities(classifier, texts: List[str], batch_size: int) -> List[Dict[str, float]]:
+    outputs = classifier(texts, truncation=True, max_length=512, batch_size=batch_size, top_k=None)
+    return [{entry["label"].lower(): float(entry["score"]) for entry in output} for output in outputs]
+
+
+def parity(reference: List[Dict[str, float]], candidate: List[Dict[str, float]]) -> Dict[str, float]:
+    agree = sum(max(r, key=r.get) == max(c, key=c.get) for r, c in zip(reference, candidate))
+    diffs = [abs(r[label] - c.get(label, 0.0)) for r, c in zip(reference, candidate) for label in r]
+    return {"agreement": agree / len(reference), "mean_abs": statistics.mean(diffs), "max_abs": max(diffs)}
+
+
+def throughput(classifier, texts: List[str], batch_size: int) -> float:
+    # The result cache is off: texts repeat, and hits would time the cache, not the backend.
+    list(ml_node.analyze_stream(texts[:batch_size], classifier=classifier, batch_size=batch_size, cache=False))
+    started = time.perf_counter()
+    for _ in ml_node.analyze_stream(texts, classifier=classifier, batch_size=batch_size, cache=False):
+        pass
+    return len(texts) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sentiment backends against FP32 pytorch")
+    parser.add_argument("--backends", nargs="+", choices=ml_node.BACKENDS[1:], default=list(ml_node.BACKENDS[1:]))
+    parser.add_argument("--file", type=str, help="Texts to use, one per line (default: built-in samples)")
+    parser.add_argument("--n", type=int, default=512, help="Texts timed per backend")
+    parser.add_argument("--parity-n", type=int, default=256, help="Texts compared against the reference")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--min-agreement", type=float, default=0.98,
+                        help="Fail if top-label agreement with FP32 is below this")
+    args = parser.parse_args()
+
+    texts = load_texts(args.file, args.n)
+    parity_texts = texts[:args.parity_n]
+
+    print(f"\n=== Sentiment backends ({ml_node.MODEL_NAME}, {len(texts)} texts, batch {args.batch_size}) ===")
+    print(f"{'backend':>10} {'load s':>8} {'texts/s':>9} {'speedup':>8} {'agree':>7} {'mean |dp|':>10} {'max |dp|':>9}")
+
+    started = time.perf_counter()
+    reference = ml_node.load_classifier("pytorch")
+    load_s = time.perf_counter() - started
+    reference_probs = probabilities(reference, parity_texts, args.batch_size)
+    base_tps = throughput(reference, texts, args.batch_size)
+    print(f"{'pytorch':>10} {load_s:>8.1f} {base_tps:>9.1f} {1.0:>7.2f}x {'ref':>7} {'-':>10} {'-':>9}")
+    del reference
+
+    failed = []
+    for backend in args.backends:
+        try:
+            started = time.perf_counter()
+            classifier = ml_node.load_classifier(backend)
+            load_s = time.perf_counter() - started
+        except ImportError as e:
+            print(f"{backend:>10} skipped: {e.name} not installed")
+            continue
+        match = parity(reference_probs, probabilities(classifier, parity_texts, args.batch_size))
+        tps = throughput(classifier, texts, args.batch_size)
+        print(f"{backend:>10} {load_s:>8.1f} {tps:>9.1f} {tps / base_tps:>7.2f}x {match['agreement']:>7.1%} "
+              f"{match['mean_abs']:>10.4f} {match['max_abs']:>9.4f}")
+        if match["agreement"] < args.min_agreement:
+            failed.append(backend)
+        del classifier
+
+    if failed:
+        print(f"\nParity check FAILED (agreement < {args.min_agreement:.0%}): {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
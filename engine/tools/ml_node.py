@@ -5,52 +5,136 @@
 #   python ml_node.py "This text is amazing!"
 #   python ml_node.py --file path/to/harvested.txt
 #   python ml_node.py --batch path/to/json_list_of_texts.json
+#   python ml_node.py --stream --file dump.jsonl --output results.jsonl
+#   python ml_node.py --backend onnx-int8 "Faster on CPU-only nodes"
 
 import json
+import os
 import sys
 import argparse
 import logging
 from pathlib import Path
-from typing import List, Dict, Any
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 try:
-    from transformers import pipeline
-except ImportError:
-    print(json.dumps({"error": "transformers library not installed. Run: pip install transformers torch"}))
-    sys.exit(1)
-
-# Setup logging (compatible with repo's ethics/morality logging style)
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    handlers=[logging.StreamHandler(sys.stdout)]
-)
+    from .sentiment_cache import SentimentCache
+except ImportError:  # run as a script
+    from sentiment_cache import SentimentCache
+
 logger = logging.getLogger(__name__)
 
-# Load model once (cached after first run)
 # Using a more robust model for web/social/harvested text (POS/NEG/NEU)
-try:
-    logger.info("Loading sentiment analysis model...")
-    classifier = pipeline(
-        "sentiment-analysis",
-        model="cardiffnlp/twitter-roberta-base-sentiment-latest",
-        tokenizer="cardiffnlp/twitter-roberta-base-sentiment-latest",
-        device=0 if torch.cuda.is_available() else -1  # GPU if available
-    )
-    logger.info("Model loaded successfully.")
-except Exception as e:
-    logger.error(f"Failed to load model: {e}")
-    print(json.dumps({"error": f"Model loading failed: {str(e)}"}))
-    sys.exit(1)
-
-def analyze_sentiment(text: str) -> Dict[str, Any]:
-    """Analyze single text snippet."""
+MODEL_NAME = "cardiffnlp/twitter-roberta-base-sentiment-latest"
+
+# Inference backends:
+#   pytorch    transformers FP32 (reference)
+#   int8       torch dynamic int8 quantization of the Linear layers (CPU)
+#   onnx       ONNX export run by ONNX Runtime (needs optimum[onnxruntime])
+#   onnx-int8  ONNX export with dynamic int8 quantization, ONNX Runtime
+BACKENDS = ("pytorch", "int8", "onnx", "onnx-int8")
+DEFAULT_BACKEND = os.getenv("ARTEMIS_SENTIMENT_BACKEND", "pytorch")
+
+# Exported ONNX models are kept here so only the first load pays for the export
+ONNX_CACHE_DIR = Path(os.getenv("ARTEMIS_ONNX_CACHE", Path.home() / ".cache" / "artemis" / "onnx"))
+
+# Result cache: ARTEMIS_SENTIMENT_CACHE_SIZE results in memory (0 disables caching),
+# plus a persistent SQLite tier at ARTEMIS_SENTIMENT_CACHE if set
+CACHE_SIZE = int(os.getenv("ARTEMIS_SENTIMENT_CACHE_SIZE", "100000"))
+CACHE_PATH = os.getenv("ARTEMIS_SENTIMENT_CACHE")
+
+_classifiers: Dict[str, Any] = {}
+_cache: Optional[SentimentCache] = None
+
+def get_cache() -> Optional[SentimentCache]:
+    """Process-wide result cache (None if disabled)."""
+    global _cache
+    if _cache is None and CACHE_SIZE > 0:
+        _cache = SentimentCache(CACHE_SIZE, CACHE_PATH)
+    return _cache
+
+def model_key(backend: Optional[str] = None) -> str:
+    """Cache namespace: results from different models or backends never mix."""
+    return f"{MODEL_NAME}:{backend or DEFAULT_BACKEND}"
+
+def _resolve_cache(cache: Union[bool, SentimentCache]) -> Optional[SentimentCache]:
+    if cache is True:
+        return get_cache()
+    return cache if isinstance(cache, SentimentCache) else None
+
+def _onnx_model(model_name: str, quantize: bool):
+    from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+    export_dir = ONNX_CACHE_DIR / model_name.replace("/", "__")
+    if not (export_dir / "model.onnx").exists():
+        logger.info(f"Exporting {model_name} to ONNX in {export_dir}...")
+        ORTModelForSequenceClassification.from_pretrained(model_name, export=True).save_pretrained(export_dir)
+    if not quantize:
+        return ORTModelForSequenceClassification.from_pretrained(export_dir)
+
+    quantized_dir = export_dir.with_name(export_dir.name + "__int8")
+    if not (quantized_dir / "model_quantized.onnx").exists():
+        logger.info(f"Quantizing ONNX model to int8 in {quantized_dir}...")
+        quantizer = ORTQuantizer.from_pretrained(export_dir)
+        quantizer.quantize(save_dir=quantized_dir, quantization_config=AutoQuantizationConfig.avx2(is_static=False))
+    return ORTModelForSequenceClassification.from_pretrained(quantized_dir, file_name="model_quantized.onnx")
+
+def load_classifier(backend: str = "pytorch", model_name: str = MODEL_NAME):
+    """Build a fresh sentiment pipeline on `backend` (see BACKENDS). Callers cache it."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}; choose from {', '.join(BACKENDS)}")
+    from transformers import AutoTokenizer, pipeline
+
+    logger.info(f"Loading sentiment analysis model ({backend})...")
+    if backend in ("onnx", "onnx-int8"):
+        model = _onnx_model(model_name, quantize=backend == "onnx-int8")
+        return pipeline("sentiment-analysis", model=model, tokenizer=AutoTokenizer.from_pretrained(model_name))
+
+    import torch
+
+    if backend == "int8":
+        from transformers import AutoModelForSequenceClassification
+        model = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        return pipeline("sentiment-analysis", model=model, tokenizer=AutoTokenizer.from_pretrained(model_name))
+
+    device = 0 if torch.cuda.is_available() else -1  # GPU if available
+    return pipeline("sentiment-analysis", model=model_name, tokenizer=model_name, device=device)
+
+def get_classifier(backend: Optional[str] = None):
+    """Load the sentiment pipeline on first use (importing this module stays cheap)."""
+    backend = backend or DEFAULT_BACKEND
+    if backend not in _classifiers:
+        _classifiers[backend] = load_classifier(backend)
+        logger.info("Model loaded successfully.")
+    return _classifiers[backend]
+
+def analyze_sentiment(
+    text: str,
+    classifier=None,
+    cache: Union[bool, SentimentCache] = True,
+    model_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Analyze single text snippet.
+    cache: True = process-wide cache, False = none, or a SentimentCache; results
+    are keyed by model_id (default: model_key() of the default backend).
+    """
     if not text or not text.strip():
         return {"error": "Empty or missing text"}
     
+    cache = _resolve_cache(cache)
+    model_id = model_id or model_key()
+    cached = cache.get(model_id, text) if cache is not None else None
+    if cached:
+        return _result(cached, text)
+
     try:
         # Truncate to model's max length to avoid errors
-        result = classifier(text, truncation=True, max_length=512)[0]
+        result = (classifier or get_classifier())(text, truncation=True, max_length=512)[0]
+        if cache is not None:
+            cache.put(model_id, text, {"label": result["label"], "score": float(result["score"])})
         # Normalize score to 0-1 range (already is, but explicit)
         return {
             "label": result["label"],           # e.g. POSITIVE, NEGATIVE, NEUTRAL
@@ -61,37 +145,208 @@ def analyze_sentiment(text: str) -> Dict[str, Any]:
         logger.error(f"Inference error on text: {str(e)}")
         return {"error": str(e), "input_preview": text[:80] + "..."}
 
-def analyze_batch(texts: List[str]) -> List[Dict[str, Any]]:
-    """Batch analyze list of texts (more efficient)."""
+def _result(prediction: Dict[str, Any], text: str) -> Dict[str, Any]:
+    return {
+        "label": prediction["label"],
+        "score": round(float(prediction["score"]), 4),
+        "input_preview": text[:120] + "..." if len(text) > 120 else text
+    }
+
+def _predict(texts: List[str], classifier, batch_size: int) -> List[Dict[str, Any]]:
+    """One batch; if it fails, each text is retried alone so only bad items error."""
+    try:
+        predictions = classifier(texts, truncation=True, max_length=512, batch_size=batch_size)
+        return [_result(p, t) for p, t in zip(predictions, texts)]
+    except Exception as e:
+        logger.error(f"Batch inference failed, retrying {len(texts)} items one by one: {str(e)}")
+        return [analyze_sentiment(t, classifier, cache=False) for t in texts]
+
+def analyze_stream(
+    items: Iterable[Union[str, Tuple[Any, str]]],
+    classifier=None,
+    batch_size: int = 16,
+    window: int = 1024,
+    cache: Union[bool, SentimentCache] = True,
+    model_id: Optional[str] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Analyze an iterable of texts (or (id, text) pairs) lazily, yielding results in input order.
+    Up to `window` items are read at a time and sorted by length, so each batch holds
+    texts of similar length and pads little. Memory is bounded by the window.
+    Cached texts (see analyze_sentiment) are answered without the model; only misses are batched.
+    """
+    cache = _resolve_cache(cache)
+    model_id = model_id or model_key()
+    numbered = enumerate(item if isinstance(item, tuple) else (None, item) for item in items)
+    while True:
+        chunk = list(islice(numbered, window))
+        if not chunk:
+            return
+        results: Dict[int, Dict[str, Any]] = {}
+        valid = []
+        for index, (item_id, text) in chunk:
+            if isinstance(text, str) and text.strip():
+                valid.append((index, text))
+            else:
+                results[index] = {"error": "Empty or missing text"}
+        if cache is not None and valid:
+            misses = []
+            for (index, text), hit in zip(valid, cache.get_many(model_id, [t for _, t in valid])):
+                if hit:
+                    results[index] = _result(hit, text)
+                else:
+                    misses.append((index, text))
+            valid = misses
+        if valid and classifier is None:
+            classifier = get_classifier()  # loaded only once something misses the cache
+        valid.sort(key=lambda entry: len(entry[1]))
+        for start in range(0, len(valid), batch_size):
+            batch = valid[start:start + batch_size]
+            texts = [t for _, t in batch]
+            predictions = _predict(texts, classifier, batch_size)
+            for (index, _), result in zip(batch, predictions):
+                results[index] = result
+            if cache is not None:
+                cache.put_many(model_id, texts, [
+                    p if "error" in p else {"label": p["label"], "score": p["score"]} for p in predictions
+                ])
+        for index, (item_id, _) in chunk:
+            result = {"index": index, **results[index]}
+            if item_id is not None:
+                result["id"] = item_id
+            yield result
+
+def analyze_batch(
+    texts: List[str],
+    classifier=None,
+    batch_size: int = 8,
+    cache: Union[bool, SentimentCache] = True,
+    model_id: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Batch analyze list of texts (more efficient).
+    Returns one result per text, in order; a failing text only fails its own entry.
+    """
     if not texts:
         return [{"error": "No texts provided in batch"}]
     
+    results = analyze_stream(texts, classifier=classifier, batch_size=batch_size, window=max(len(texts), 1),
+                             cache=cache, model_id=model_id)
+    return [{k: v for k, v in r.items() if k != "index"} for r in results]
+
+def iter_input(path: Path) -> Iterator[Union[str, Tuple[Any, str]]]:
+    """
+    Lazily read texts from `path`: JSONL/NDJSON (strings or {"text": ..., "id": ...}
+    objects) or plain text, one entry per line. Unparseable JSONL lines yield
+    an empty entry, which is reported as an error for that line only.
+    """
+    jsonl = path.suffix.lower() in (".jsonl", ".ndjson")
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if not jsonl:
+                yield line
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                yield ""
+                continue
+            if isinstance(record, dict):
+                yield (record.get("id"), record.get("text", ""))
+            else:
+                yield record if isinstance(record, str) else ""
+
+def _label_summary(results: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+    summary = {"positive": 0, "negative": 0, "neutral": 0}
+    for r in results:
+        label = str(r.get("label", "")).lower()
+        if label in summary:
+            summary[label] += 1
+    return summary
+
+def run_stream(
+    path: Path,
+    output: Optional[str],
+    batch_size: int,
+    window: int,
+    classifier=None,
+    model_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """Analyze `path` lazily, writing one JSON result per line to `output` (default stdout)."""
+    out = open(output, "w", encoding="utf-8") if output else sys.stdout
+    count = errors = 0
+
+    def written(results):
+        nonlocal count, errors
+        for result in results:
+            out.write(json.dumps(result) + "\n")
+            count += 1
+            errors += "error" in result
+            if count % window == 0:
+                out.flush()
+            yield result
+
     try:
-        results = classifier(
-            texts,
-            truncation=True,
-            max_length=512,
-            batch_size=8  # adjust based on memory
-        )
-        return [
-            {
-                "label": r["label"],
-                "score": round(float(r["score"]), 4),
-                "input_preview": t[:120] + "..." if len(t) > 120 else t
-            }
-            for r, t in zip(results, texts)
-        ]
-    except Exception as e:
-        logger.error(f"Batch inference failed: {str(e)}")
-        return [{"error": str(e)}]
+        results = analyze_stream(iter_input(path), classifier=classifier, batch_size=batch_size, window=window,
+                                 model_id=model_id)
+        summary = _label_summary(written(results))
+    finally:
+        if output:
+            out.close()
+    cache = get_cache()
+    return {"count": count, "errors": errors, "summary": summary, "cache": cache.stats() if cache is not None else None}
 
 def main():
     parser = argparse.ArgumentParser(description="Artemis ML Node: Sentiment Analyst")
     parser.add_argument("text", nargs="?", help="Single text to analyze")
-    parser.add_argument("--file", type=str, help="Path to text file (one entry per line)")
-    parser.add_argument("--batch", type=str, help="Path to JSON file containing list of strings")
+    parser.add_argument("--file", type=str, help="Path to text file (one entry per line, or .jsonl)")
+    parser.add_argument("--batch", type=str, help="Path to JSON file containing list of strings (or .jsonl)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Read --file/--batch lazily and write results as JSONL (bounded memory)")
+    parser.add_argument("--output", type=str, help="JSONL output path for --stream (default: stdout)")
+    parser.add_argument("--batch-size", type=int, default=16, help="Texts per forward pass in --stream mode")
+    parser.add_argument("--window", type=int, default=1024,
+                        help="Items read and length-sorted together in --stream mode")
+    parser.add_argument("--backend", choices=BACKENDS, default=DEFAULT_BACKEND,
+                        help="Inference backend (default: $ARTEMIS_SENTIMENT_BACKEND or pytorch)")
     
     args = parser.parse_args()
+
+    # Setup logging (compatible with repo's ethics/morality logging style);
+    # streamed JSONL owns stdout, so logs go to stderr there
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(message)s",
+        handlers=[logging.StreamHandler(sys.stderr if args.stream and not args.output else sys.stdout)]
+    )
+
+    try:
+        classifier = get_classifier(args.backend)
+        model_id = model_key(args.backend)
+    except ImportError as e:
+        hint = "pip install optimum[onnxruntime]" if args.backend.startswith("onnx") else "pip install transformers torch"
+        print(json.dumps({"error": f"Missing dependency ({e.name}). Run: {hint}"}))
+        sys.exit(1)
+    except Exception as e:
+        logger.error(f"Failed to load model: {e}")
+        print(json.dumps({"error": f"Model loading failed: {str(e)}"}))
+        sys.exit(1)
+
+    if args.stream:
+        source = args.file or args.batch
+        if not source or not Path(source).exists():
+            print(json.dumps({"error": f"Input file not found: {source}"}))
+            return
+        if Path(source).suffix.lower() == ".json":
+            print(json.dumps({"error": "--stream reads JSONL or plain lines; convert JSON lists to .jsonl"}))
+            return
+        stats = run_stream(Path(source), args.output, args.batch_size, args.window, classifier, model_id)
+        logger.info(f"Streamed {stats['count']} results ({stats['errors']} errors): {stats['summary']}, "
+                    f"cache: {stats['cache']}")
+        return
     
     if args.batch:
         path = Path(args.batch)
@@ -103,7 +358,7 @@ def main():
                 texts = json.load(f)
             if not isinstance(texts, list):
                 raise ValueError("Batch JSON must be a list of strings")
-            results = analyze_batch(texts)
+            results = analyze_batch(texts, classifier, model_id=model_id)
         except Exception as e:
             print(json.dumps({"error": f"Batch load failed: {str(e)}"}))
             return
@@ -116,13 +371,13 @@ def main():
         try:
             with open(path, "r", encoding="utf-8") as f:
                 texts = [line.strip() for line in f if line.strip()]
-            results = analyze_batch(texts)
+            results = analyze_batch(texts, classifier, model_id=model_id)
         except Exception as e:
             print(json.dumps({"error": f"File read failed: {str(e)}"}))
             return
     
     elif args.text:
-        result = analyze_sentiment(args.text)
+        result = analyze_sentiment(args.text, classifier, model_id=model_id)
         print(json.dumps(result, indent=2))
         return
     
@@ -134,11 +389,7 @@ def main():
     print(json.dumps({
         "results": results,
         "count": len(results),
-        "summary": {
-            "positive": sum(1 for r in results if r.get("label") == "POSITIVE"),
-            "negative": sum(1 for r in results if r.get("label") == "NEGATIVE"),
-            "neutral": sum(1 for r in results if r.get("label") == "NEUTRAL")
-        }
+        "summary": _label_summary(results)
     }, indent=2))
 
 if __name__ == "__main__":
@@ -0,0 +1,120 @@
+# sentiment_cache.py
+# Sentiment result cache for Architect-Artemis.
+# Harvested text repeats (boilerplate, re-crawls, syndication), so results are
+# cached under a hash of model id + normalized text: a bounded in-memory LRU,
+# optionally backed by SQLite so hits survive restarts and are shared by processes.
+
+import hashlib
+import json
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+
+def normalize_text(text: str) -> str:
+    """NFC, trimmed, whitespace runs collapsed. Case is kept – the model is cased."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def cache_key(model_id: str, text: str) -> bytes:
+    return hashlib.blake2b(f"{model_id}\0{normalize_text(text)}".encode("utf-8"), digest_size=16).digest()
+
+
+class SentimentCache:
+    def __init__(self, max_entries: int = 100_000, path: Optional[Union[str, Path]] = None):
+        """
+        max_entries: results kept in the in-memory LRU
+        path: optional SQLite file for the persistent tier (unbounded; memory misses fall through to it)
+        """
+        self.max_entries = max(1, max_entries)
+        self._lru: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.disk_hits = self.misses = 0
+        self._db = None
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(path), timeout=30, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS sentiment (key BLOB PRIMARY KEY, result TEXT NOT NULL)")
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def __len__(self) -> int:
+        return len(self._lru)
+
+    def _remember(self, key: bytes, result: Dict[str, Any]):
+        self._lru[key] = result
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    def get_many(self, model_id: str, texts: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Cached result (or None) for each text."""
+        keys = [cache_key(model_id, text) for text in texts]
+        found: List[Optional[Dict[str, Any]]] = [None] * len(keys)
+        with self._lock:
+            missing = []
+            for i, key in enumerate(keys):
+                if key in self._lru:
+                    self._lru.move_to_end(key)
+                    found[i] = self._lru[key]
+                else:
+                    missing.append(i)
+            if missing and self._db is not None:
+                wanted = list({keys[i] for i in missing})
+                stored = {}
+                for start in range(0, len(wanted), 500):
+                    part = wanted[start:start + 500]
+                    stored.update(self._db.execute(
+                        f"SELECT key, result FROM sentiment WHERE key IN ({','.join('?' * len(part))})", part
+                    ).fetchall())
+                for i in missing:
+                    if keys[i] in stored:
+                        found[i] = json.loads(stored[keys[i]])
+                        self._remember(keys[i], found[i])
+                        self.disk_hits += 1
+            hits = sum(result is not None for result in found)
+            self.hits += hits
+            self.misses += len(found) - hits
+        return found
+
+    def get(self, model_id: str, text: str) -> Optional[Dict[str, Any]]:
+        return self.get_many(model_id, [text])[0]
+
+    def put_many(self, model_id: str, texts: List[str], results: List[Dict[str, Any]]):
+        """Cache successful results (entries carrying an "error" are skipped)."""
+        rows = [(cache_key(model_id, text), result) for text, result in zip(texts, results) if "error" not in result]
+        if not rows:
+            return
+        with self._lock:
+            for key, result in rows:
+                self._remember(key, result)
+            if self._db is not None:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO sentiment (key, result) VALUES (?, ?)",
+                    [(key, json.dumps(result)) for key, result in rows]
+                )
+                self._db.commit()
+
+    def put(self, model_id: str, text: str, result: Dict[str, Any]):
+        self.put_many(model_id, [text], [result])
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "entries": len(self._lru),
+            "max_entries": self.max_entries,
+            "persistent": self._db is not None,
+        }
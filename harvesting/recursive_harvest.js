@@ -245,9 +245,25 @@ module.exports = {
   CONFIG, // for testing/tuning
 };
 
-// Standalone test (uncomment to run)
-// (async () => {
-//   await fs.ensureDir(CONFIG.harvestDir);
-//   const result = await recursiveHarvest('https://example.com');
-//   console.log('Final stats:', result.stats);
-// })();
+// CLI: node recursive-harvest.js <url>
+// Prints one JSON summary line on stdout for the harvest scheduler,
+// e.g. {"harvested_count":12,"stats":{...},"reason":null}
+if (require.main === module) {
+  const startUrl = process.argv[2];
+  if (!startUrl) {
+    console.error('Usage: node recursive-harvest.js <url>');
+    process.exit(2);
+  }
+  (async () => {
+    await fs.ensureDir(CONFIG.harvestDir);
+    const result = await recursiveHarvest(startUrl);
+    console.log(JSON.stringify({
+      harvested_count: result.stats.pages,
+      stats: result.stats,
+      reason: result.reason,
+    }));
+  })().catch(err => {
+    console.error(`Harvest failed: ${err.message}`);
+    process.exit(1);
+  });
+}